@@ -1,3 +1,20 @@
 """aviewpy contains python tools to be used in adams view
+
+Submodules are imported the first time they are accessed (e.g. `aviewpy.sim.submit(...)` after
+`import aviewpy`), so importing the package does not pull in numpy, pandas, scipy or matplotlib.
 """
+import importlib
+
+SUBMODULES = ['commands', 'contact', 'cs', 'expressions', 'files', 'jobs', 'model', 'move', 'objects',
+              'profiler', 'references', 'results', 'sim', 'solver', 'sweep', 'ui', 'utils', 'variables', 'worker']
+"""Submodules that are imported lazily on attribute access"""
+
+
+def __getattr__(name: str):
+    if name in SUBMODULES:
+        return importlib.import_module(f'.{name}', __name__)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
 
+def __dir__():
+    return sorted([*globals(), *SUBMODULES])
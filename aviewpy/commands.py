@@ -0,0 +1,243 @@
+"""Execute many Adams View commands with a single call to `Adams.execute_cmd`.
+
+Each call to `Adams.execute_cmd` has a fixed overhead, so helpers that issue one command per
+object are slow on large models. A `CommandBatch` collects commands and executes them together
+from a temporary command file.
+
+Example
+-------
+>>> with CommandBatch() as batch:
+...     for name in names:
+...         batch.add(f'group object add group=select_list objects={name}')
+"""
+import logging
+import os
+import re
+from pathlib import Path
+from tempfile import mkstemp
+from typing import Iterable, List, Tuple, Union
+
+import Adams  # type: ignore
+
+from .expressions import evaluate_uncached
+
+LOG = logging.getLogger(__name__)
+
+PROGRESS_VARIABLE = '.aviewpy_command_batch_progress'
+"""Adams View variable that records the index of the last command of a batch that was read"""
+
+SESSION_LOG_FILE: Union[Path, None] = None
+"""Session log of Adams View. Every command (including those read from command files) is logged,
+followed by its errors as `! ERROR: ...` comment lines. By default (None) `aview.log` in the
+current working directory, which is looked up each time a batch is executed."""
+
+_PROGRESS_PATTERN = re.compile(rf'^\s*var\w*\s+set\s+var\w*\s*=\s*{re.escape(PROGRESS_VARIABLE)}\s+'
+                               r'int\w*\s*=\s*(-?\d+)', re.IGNORECASE)
+_ERROR_PATTERN = re.compile(r'^\s*!\s*ERROR\b', re.IGNORECASE)
+
+_ACTIVE_BATCHES: List['CommandBatch'] = []
+
+
+class CommandBatchError(Exception):
+    """Raised when a command in a `CommandBatch` fails
+
+    Attributes
+    ----------
+    index : int
+        Index of the failed command in the batch
+    command : str
+        The failed command
+    remaining : List[str]
+        Commands after the failed command that were not executed (empty if Adams View read the
+        rest of the command file)
+    """
+
+    def __init__(self, index: int, command: str, remaining: List[str] = None):
+        self.index = index
+        self.command = command
+        self.remaining = remaining or []
+        super().__init__(f'Command {index} of the batch failed: {command}')
+
+
+class CommandBatch():
+    """Collects Adams View commands and executes them together when the batch is flushed.
+
+    The commands are written to a temporary command file, and an Adams View variable is set after
+    each one. Whether Adams View stops reading a command file at the first command that fails
+    depends on the session (e.g. an interactive session may offer to continue), so it is not
+    assumed:
+
+    - If it stopped, the variable tells which command failed and the commands after it were not
+      executed.
+    - If it read the whole file, the errors in `SESSION_LOG_FILE` since the file was read tell
+      which commands failed, and the commands after them were executed.
+
+    A batch of a single command is executed directly, and its errors are found the same way.
+
+    Batches flush when the `with` block exits without an exception. Entering a batch flushes the
+    batch that is already active, so commands run in the order they were added.
+
+    Note
+    ----
+    Commands are not executed until the batch is flushed, so do not add commands whose effect is
+    needed (e.g. by `Adams.evaluate_exp`) before the batch exits.
+
+    Parameters
+    ----------
+    on_error : str, optional
+        'raise' to raise a `CommandBatchError` for the first failed command and skip the remaining
+        commands (unless Adams View already executed them), or 'continue' to skip the failed
+        command, run the remaining ones and record the error in `errors`. By default 'raise'
+    max_size : int, optional
+        Number of commands after which the batch flushes automatically, by default None (only
+        when it exits)
+    """
+
+    def __init__(self, on_error='raise', max_size: int = None):
+        if on_error not in ('raise', 'continue'):
+            raise ValueError(f'on_error must be "raise" or "continue", not {on_error!r}')
+
+        self.on_error = on_error
+        self.max_size = max_size
+        self.commands: List[str] = []
+        self.errors: List[CommandBatchError] = []
+        self.executed = 0
+        """Number of commands executed by this batch so far"""
+
+    def add(self, cmd: str):
+        """Adds a command to the batch"""
+        self.commands.append(cmd)
+        if self.max_size is not None and len(self.commands) >= self.max_size:
+            self.flush()
+
+    def extend(self, cmds: Iterable[str]):
+        """Adds several commands to the batch"""
+        for cmd in cmds:
+            self.add(cmd)
+
+    def flush(self):
+        """Executes the collected commands"""
+        commands, self.commands = self.commands, []
+        offset = self.executed
+        while commands:
+            failed, stopped = _execute_commands(commands)
+            if not failed:
+                self.executed += len(commands)
+                return
+
+            if not stopped:
+                # Adams View read the whole file, so only the failed commands were not executed
+                errors = [CommandBatchError(offset + idx, commands[idx]) for idx in failed]
+                for error in errors:
+                    LOG.error(str(error))
+                self.executed += len(commands) - len(failed)
+                if self.on_error == 'raise':
+                    raise errors[0]
+
+                self.errors.extend(errors)
+                return
+
+            failed = failed[0]
+            error = CommandBatchError(offset + failed, commands[failed], commands[failed + 1:])
+            LOG.error(str(error))
+            self.executed += failed
+            if self.on_error == 'raise':
+                raise error
+
+            self.errors.append(error)
+            offset += failed + 1
+            commands = commands[failed + 1:]
+
+    def __enter__(self):
+        if _ACTIVE_BATCHES:
+            _ACTIVE_BATCHES[-1].flush()
+        _ACTIVE_BATCHES.append(self)
+        return self
+
+    def __exit__(self, exc_type, *_):
+        _ACTIVE_BATCHES.remove(self)
+        if exc_type is None:
+            self.flush()
+
+
+def execute_cmds(cmds: Iterable[str], on_error='raise'):
+    """Executes several Adams View commands as a single batch. See `CommandBatch`."""
+    with CommandBatch(on_error=on_error) as batch:
+        batch.extend(cmds)
+
+    return batch
+
+
+def _execute_commands(commands: List[str]) -> Tuple[List[int], bool]:
+    """Executes `commands` from a command file. Returns the indices of the failed commands and
+    whether Adams View stopped reading the file at the first of them."""
+    log_file = get_session_log_file()
+    log_size = _file_size(log_file)
+    if len(commands) == 1:
+        # Not worth a command file
+        try:
+            Adams.execute_cmd(commands[0])
+        except Exception:  # pylint: disable=broad-except
+            return [0], True
+        return _logged_failures(log_file, log_size, 1), False
+
+    fid, file_name = mkstemp(prefix='aviewpy_batch_', suffix='.cmd')
+    try:
+        with os.fdopen(fid, 'w') as cmd_file:
+            cmd_file.write(f'variable set variable_name = {PROGRESS_VARIABLE} integer_value = -1\n')
+            for idx, cmd in enumerate(commands):
+                cmd_file.write(f'{cmd}\n')
+                cmd_file.write(f'variable set variable_name = {PROGRESS_VARIABLE} integer_value = {idx}\n')
+
+        try:
+            Adams.execute_cmd(f'file command read file_name = "{Path(file_name).as_posix()}"')
+        except Exception:  # pylint: disable=broad-except
+            LOG.debug('Reading the batch command file raised an exception', exc_info=True)
+
+        progress = int(evaluate_uncached(PROGRESS_VARIABLE))
+        Adams.execute_cmd(f'variable delete variable_name = {PROGRESS_VARIABLE}')
+
+    finally:
+        os.remove(file_name)
+
+    if progress + 1 < len(commands):
+        return [progress + 1], True
+
+    return _logged_failures(log_file, log_size, len(commands)), False
+
+
+def get_session_log_file() -> Path:
+    """Returns `SESSION_LOG_FILE`, or `aview.log` in the current working directory if it is None"""
+    if SESSION_LOG_FILE is not None:
+        return Path(SESSION_LOG_FILE)
+    return Path('aview.log').absolute()
+
+
+def _logged_failures(log_file: Path, offset: int, count: int) -> List[int]:
+    """Returns the indices of the batch commands (out of `count`) with errors in `log_file` after
+    `offset`. Errors are logged after the command that caused them, so they belong to the command
+    after the last progress variable that was set."""
+    try:
+        with open(log_file, 'rb') as fid:
+            fid.seek(offset)
+            lines = fid.read().decode(errors='ignore').splitlines()
+    except OSError:
+        return []
+
+    failed = []
+    progress = -1
+    for line in lines:
+        match = _PROGRESS_PATTERN.match(line)
+        if match:
+            progress = int(match.group(1))
+        elif _ERROR_PATTERN.match(line) and progress + 1 < count and progress + 1 not in failed:
+            failed.append(progress + 1)
+
+    return failed
+
+
+def _file_size(file: Path) -> int:
+    try:
+        return file.stat().st_size
+    except OSError:
+        return 0
@@ -1,10 +1,9 @@
 from collections import namedtuple
 from itertools import product
-from typing import List
+from typing import TYPE_CHECKING, List
 
 import numpy as np
 from numpy.typing import NDArray
-import pandas as pd
 
 import Adams  # type: ignore # noqa
 from Analysis import Analysis  # type: ignore # noqa
@@ -16,10 +15,16 @@ from Part import Part  # type: ignore # noqa
 
 from .cs import CS, MarkerCS
 from .objects import get_parent_model
-from .ui.progressbar import progress_bar
+from .references import ReferenceGraph
+
+if TYPE_CHECKING:
+    # pandas is only needed by `get_contact_data`, which imports it
+    import pandas as pd
 
 TESTING = False
 
+GEOMETRY_ATTRS = ['i_geometry', 'j_geometry']
+
 
 TrackData = namedtuple('TrackData', ['normal',
                                      'normal_unit',
@@ -118,7 +123,7 @@ class Track():
                          np.array(penetration))
 
 
-def all_tracks_on_geometry(geom: Geometry, ans: Analysis) -> List[Track]:
+def all_tracks_on_geometry(geom: Geometry, ans: Analysis, graph: ReferenceGraph = None) -> List[Track]:
     """Returns a list of all the `Tracks` on a given `Geometry`.
 
     Parameters
@@ -127,6 +132,8 @@ def all_tracks_on_geometry(geom: Geometry, ans: Analysis) -> List[Track]:
         An Adams Geometry object to return tracks for
     ans : Analysis
         An Adams Analysis object 
+    graph : ReferenceGraph, optional
+        References of the contacts in the model, by default they are read from the model
 
     Returns
     -------
@@ -134,10 +141,11 @@ def all_tracks_on_geometry(geom: Geometry, ans: Analysis) -> List[Track]:
         List of Tracks that involve `geom`
     """
     mod: Model = ans.parent
+    graph = graph if graph is not None else ReferenceGraph(mod.Contacts.values(), GEOMETRY_ATTRS)
+    contacts = {ref.source.full_name: ref.source for ref in graph.referrers(geom, GEOMETRY_ATTRS)}
+
     tracks: List[Track] = []
-    for cont in (c for c in mod.Contacts.values()
-                 if geom in c.i_geometry + c.j_geometry
-                 and c.name in ans.results):
+    for cont in (c for c in contacts.values() if c.name in ans.results):
         Adams.execute_cmd(
             f'analysis collate_contacts analysis={ans.full_name} contact={cont.full_name}'
         )
@@ -219,7 +227,7 @@ def get_track_data(ans: Analysis, track_name: str, mkr: Marker, I_part=True) ->
                      np.array(penetration))
 
 
-def get_contact_data(geom: Geometry, ans: Analysis, ref_mkr: Marker) -> pd.DataFrame:
+def get_contact_data(geom: Geometry, ans: Analysis, ref_mkr: Marker) -> 'pd.DataFrame':
     """Gets a DataFrame of contact data needed for calculating wear.
 
     Parameters
@@ -236,6 +244,8 @@ def get_contact_data(geom: Geometry, ans: Analysis, ref_mkr: Marker) -> pd.DataF
     pd.DataFrame
         A DataFrame of contact data needed for calculating wear
     """
+    import pandas as pd  # pylint: disable=import-outside-toplevel
+
     tracks = all_tracks_on_geometry(geom, ans)
 
     dfs = [pd.DataFrame({
@@ -1,7 +1,6 @@
 from __future__ import annotations
-from typing import Tuple
+from typing import TYPE_CHECKING, Tuple
 
-from scipy.spatial.transform import Rotation as R
 import numpy as np
 
 import Adams  # type: ignore # noqa # isort: skip
@@ -11,6 +10,10 @@ from Part import Part # type: ignore # noqa
 
 from numpy.typing import ArrayLike, NDArray
 
+if TYPE_CHECKING:
+    # scipy is imported where rotations are needed so that importing this module is cheap
+    from scipy.spatial.transform import Rotation as R
+
 class CS():
     def __init__(self, loc, ori=None, design_loc=None, design_ori=None):
         self.loc = loc
@@ -49,10 +52,12 @@ class CS():
 
     @property
     def rot(self) -> R:
+        from scipy.spatial.transform import Rotation as R  # pylint: disable=import-outside-toplevel
         return R.from_euler('ZXZ', self.ori, degrees=True) if self.ori is not None else None
 
     @property
     def design_rot(self) -> R:
+        from scipy.spatial.transform import Rotation as R  # pylint: disable=import-outside-toplevel
         return R.from_euler('ZXZ', self.design_ori, degrees=True) if self.design_ori is not None else None
 
 
@@ -84,6 +89,7 @@ class MarkerCS(CS):
 
         rel_loc = design_loc-part_gcs.design_loc
         loc = part_gcs.loc+rel_loc
+        from scipy.spatial.transform import Rotation as R  # pylint: disable=import-outside-toplevel
         rot: R = part_gcs.rot * R.from_euler('ZXZ', mkr.orientation, degrees=True)
         ori = rot.as_euler('ZXZ', degrees=True)
 
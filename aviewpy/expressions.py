@@ -0,0 +1,214 @@
+"""Opt-in caching of `Adams.evaluate_exp` results.
+
+Helpers such as `MarkerCS`, `get_dv` and `temp_sim_prefs` evaluate the same expressions many
+times. While an `expression_cache` is active, `Adams.evaluate_exp` answers repeated expressions
+from a cache that is cleared whenever `Adams.execute_cmd` runs a command that may modify the
+database or `Adams.read_command_file` reads a command file.
+
+Example
+-------
+>>> with expression_cache() as cache:
+...     cs = [MarkerCS(mkr) for mkr in markers]
+>>> print(cache.report())
+
+In a `query_batch` every lookup is cached, even if commands are executed, which suits read only
+post-processing scripts.
+
+>>> with query_batch() as cache:
+...     forces = {f.name: get_dv(f, 'max_force') for f in mod.Forces.values()}
+"""
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+import Adams  # type: ignore
+
+LOG = logging.getLogger(__name__)
+
+RE_QUOTED = re.compile(r'("[^"]*"|\'[^\']*\')')
+RE_UNCACHEABLE = re.compile(r'\b(?:unique_\w+|rand\w*|date|time_of_day)\s*\(', flags=re.IGNORECASE)
+"""Expression functions whose value changes between calls without the database changing"""
+
+READ_ONLY_COMMANDS = ('list_info', 'info', 'interface message', 'interface dialog_box display',
+                      'interface plot window page_display', 'view activate', 'view center',
+                      'view zoom', 'view orient', 'view fit', 'view refresh')
+"""Commands that do not modify the database, so do not invalidate the cache"""
+
+
+class ExpressionCache():
+    """Cache of `Adams.evaluate_exp` results keyed on the normalized expression.
+
+    Attributes
+    ----------
+    read_only : bool
+        If True, commands do not invalidate the cache
+    hits : int
+        Number of lookups answered from the cache
+    misses : int
+        Number of lookups evaluated by Adams View
+    uncacheable : int
+        Number of lookups of expressions that are never cached (e.g. `unique_name`)
+    invalidations : int
+        Number of times the cache was cleared by a command
+    """
+
+    def __init__(self, read_only=False):
+        self.read_only = read_only
+        self.values: Dict[str, Any] = {}
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+        self.invalidations = 0
+        self.expression_hits = Counter()
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache"""
+        lookups = self.hits + self.misses + self.uncacheable
+        return self.hits / lookups if lookups else 0.0
+
+    def evaluate(self, exp: str) -> Any:
+        """Returns the value of `exp`, from the cache if possible"""
+        if RE_UNCACHEABLE.search(exp):
+            self.uncacheable += 1
+            return _ORIGINALS['evaluate_exp'](exp)
+
+        key = normalize_expression(exp)
+        if key in self.values:
+            self.hits += 1
+            self.expression_hits[key] += 1
+            return _copy(self.values[key])
+
+        self.misses += 1
+        value = _ORIGINALS['evaluate_exp'](exp)
+        self.values[key] = value
+        return _copy(value)
+
+    def invalidate(self):
+        """Clears the cached values (e.g. after changing the model through the object API)"""
+        if self.values:
+            self.invalidations += 1
+        self.values.clear()
+
+    def stats(self) -> Dict[str, float]:
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'uncacheable': self.uncacheable,
+                'invalidations': self.invalidations,
+                'hit_rate': self.hit_rate}
+
+    def report(self, top: int = 10) -> str:
+        """Returns a summary of the cache statistics and the most frequently cached expressions"""
+        lines = [f'Expression cache: {self.hits} hits, {self.misses} misses, '
+                 f'{self.uncacheable} uncacheable, {self.invalidations} invalidations '
+                 f'({self.hit_rate:.1%} hit rate)']
+        lines += [f'{count:>8d}  {exp}' for exp, count in self.expression_hits.most_common(top)]
+        return '\n'.join(lines)
+
+
+def normalize_expression(exp: str) -> str:
+    """Returns `exp` in lower case without whitespace, except inside quoted strings"""
+    return ''.join(part if idx % 2 else re.sub(r'\s+', '', part).lower()
+                   for idx, part in enumerate(RE_QUOTED.split(exp)))
+
+
+def is_read_only_command(cmd: str) -> bool:
+    """Returns True if `cmd` is one of the `READ_ONLY_COMMANDS`"""
+    cmd = ' '.join(cmd.split()).lower()
+    return any(cmd == c or cmd.startswith(c + ' ') for c in READ_ONLY_COMMANDS)
+
+
+_ORIGINALS: Dict[str, Any] = {}
+"""Adams functions replaced by the cache wrappers. Entries are kept while their wrapper is still
+installed (e.g. inside a `Profiler` wrapper that was installed after it)."""
+_ACTIVE: List[ExpressionCache] = []
+
+
+def _evaluate_exp(exp: str):
+    if not _ACTIVE:
+        return _ORIGINALS['evaluate_exp'](exp)
+    return _ACTIVE[-1].evaluate(exp)
+
+
+def _execute_cmd(cmd: str):
+    try:
+        return _ORIGINALS['execute_cmd'](cmd)
+    finally:
+        if not is_read_only_command(cmd):
+            _invalidate_active()
+
+
+def _read_command_file(file_name: str):
+    try:
+        return _ORIGINALS['read_command_file'](file_name)
+    finally:
+        _invalidate_active()
+
+
+def _invalidate_active():
+    for cache in _ACTIVE:
+        if not cache.read_only:
+            cache.invalidate()
+
+
+@contextmanager
+def expression_cache(read_only=False):
+    """Context manager that caches the results of `Adams.evaluate_exp`.
+
+    The cache is cleared whenever `Adams.execute_cmd` runs a command that may modify the
+    database (anything but the `READ_ONLY_COMMANDS`) or `Adams.read_command_file` reads a command
+    file, unless `read_only` is True.
+
+    Note
+    ----
+    Changes made through the object API (e.g. `part.mass = 1.0`) do not go through
+    `Adams.execute_cmd`. Call `ExpressionCache.invalidate` after making them.
+
+    Parameters
+    ----------
+    read_only : bool, optional
+        If True, commands do not clear the cache, by default False
+
+    Yields
+    ------
+    ExpressionCache
+        The cache, for its statistics
+    """
+    cache = ExpressionCache(read_only=read_only)
+    for name, wrapper in _WRAPPERS.items():
+        if name not in _ORIGINALS:
+            _ORIGINALS[name] = getattr(Adams, name)
+            setattr(Adams, name, wrapper)
+
+    _ACTIVE.append(cache)
+    try:
+        yield cache
+    finally:
+        _ACTIVE.remove(cache)
+        if not _ACTIVE:
+            for name, wrapper in _WRAPPERS.items():
+                # If something else wrapped ours since, restoring would remove its wrapper. Ours
+                # stays in its call chain and passes calls through while no cache is active.
+                if getattr(Adams, name) is wrapper:
+                    setattr(Adams, name, _ORIGINALS.pop(name))
+        LOG.debug(cache.report())
+
+
+_WRAPPERS = {'evaluate_exp': _evaluate_exp, 'execute_cmd': _execute_cmd, 'read_command_file': _read_command_file}
+
+
+def evaluate_uncached(exp: str):
+    """Evaluates `exp` with Adams View, bypassing any active expression cache"""
+    return _ORIGINALS.get('evaluate_exp', Adams.evaluate_exp)(exp)
+
+
+def query_batch():
+    """Context manager in which every `Adams.evaluate_exp` lookup is cached, for read only
+    scripts. See `expression_cache`."""
+    return expression_cache(read_only=True)
+
+
+def _copy(value):
+    return list(value) if isinstance(value, list) else value
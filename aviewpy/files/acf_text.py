@@ -0,0 +1,103 @@
+"""Functions on the text of Adams Command (.acf) files. They do not need Adams View, so they can
+be used where the solver runs (e.g. by `aviewpy.worker`)."""
+from pathlib import Path
+from typing import Dict, Union
+
+
+def get_output_prefix(acf_file: Union[Path, str]) -> str:
+    """Returns the output file prefix of an Adams Command (.acf) file. This is the second line of
+    the file, or the stem of `acf_file` if the line is blank.
+
+    Parameters
+    ----------
+    acf_file : Union[Path, str]
+        Path to an Adams Command (.acf) File
+
+    Returns
+    -------
+    str
+        Output file prefix (relative to the directory of `acf_file`)
+    """
+    with Path(acf_file).open('r') as fid:
+        fid.readline()
+        prefix = fid.readline().strip()
+
+    return prefix or Path(acf_file).stem
+
+
+def get_model_file(acf_file: Union[Path, str]) -> Path:
+    """Returns the model (.adm) file of an Adams Command (.acf) file. This is the first line of
+    the file, with the .adm extension added if it has none.
+
+    Parameters
+    ----------
+    acf_file : Union[Path, str]
+        Path to an Adams Command (.acf) File
+
+    Returns
+    -------
+    Path
+        Model file (relative paths are resolved against the directory of `acf_file`)
+    """
+    with Path(acf_file).open('r') as fid:
+        model_file = Path(fid.readline().strip().strip('"\''))
+
+    if not model_file.suffix:
+        model_file = model_file.with_suffix('.adm')
+
+    return Path(acf_file).parent / model_file
+
+
+def patch_acf(text: str,
+              model_file: str = None,
+              output_prefix: str = None,
+              commands: Dict[str, str] = None) -> str:
+    """Returns the text of an Adams Command (.acf) file with the model file, output prefix and/or
+    solver commands replaced.
+
+    Parameters
+    ----------
+    text : str
+        Text of the base .acf file
+    model_file : str, optional
+        New model (.adm) file name (first line), by default None
+    output_prefix : str, optional
+        New output file prefix (second line), by default None
+    commands : Dict[str, str], optional
+        Solver commands keyed by command name (e.g. {'INTEGRATOR': 'INTEGRATOR/HHT, ERROR=1e-5'}).
+        Commands with the same name in `text` are replaced. Others are inserted before the first
+        SIMULATE command (or at the end). By default None
+
+    Returns
+    -------
+    str
+        Patched .acf text
+    """
+    lines = text.splitlines()
+    while len(lines) < 2:
+        lines.append('')
+
+    if model_file is not None:
+        lines[0] = str(model_file)
+    if output_prefix is not None:
+        lines[1] = str(output_prefix)
+
+    for name, command in (commands or {}).items():
+        idxs = [i for i, line in enumerate(lines[2:], start=2) if _is_acf_command(line, name)]
+        if idxs:
+            lines[idxs[0]] = command
+            for idx in reversed(idxs[1:]):
+                del lines[idx]
+        else:
+            idx = next((i for i, line in enumerate(lines[2:], start=2)
+                        if _is_acf_command(line, 'SIMULATE') or _is_acf_command(line, 'STOP')),
+                       len(lines))
+            lines.insert(idx, command)
+
+    return '\n'.join(lines) + '\n'
+
+
+def _is_acf_command(line: str, name: str) -> bool:
+    """Returns True if `line` is the solver command `name` (which may be abbreviated in `line`)"""
+    cmd = line.split('/')[0].split(',')[0].strip().upper()
+    return cmd == name.upper() or (len(cmd) >= 3 and name.upper().startswith(cmd))
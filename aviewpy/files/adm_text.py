@@ -0,0 +1,207 @@
+"""Functions on the text of Adams Dataset (.adm) files. They do not need Adams View, so they can
+be used where the solver runs (e.g. by `aviewpy.worker`)."""
+import re
+from numbers import Number
+from pathlib import Path
+from typing import Any, Dict, Generator, List, NamedTuple, Tuple, Union
+
+RE_ADM_STATEMENT = re.compile(r'([A-Za-z_]+)\s*/\s*(\d+)?')
+RE_ADM_VIEW_NAME = re.compile(r'adams_view_name\s*=\s*\'([^\']*)\'', flags=re.IGNORECASE)
+RE_ADM_NEXT_ARG = re.compile(r',\s*(?:,\s*)?[A-Za-z_]\w*\s*(?:=|,|$)', flags=re.MULTILINE)
+RE_ADM_FILE = re.compile(r'\bFILE(?:_NAME|/\w+)?\s*=\s*("[^"]*"|\'[^\']*\'|[^\s,]+)',
+                         flags=re.IGNORECASE)
+
+
+class AdmStatement(NamedTuple):
+    """Location of a statement in the text of an Adams Dataset (.adm) file"""
+    type: str
+    """Upper case statement type (e.g. 'PART')"""
+    id: int
+    view_name: str
+    """Adams View name from the preceding `adams_view_name` comment (or None)"""
+    start: int
+    end: int
+
+
+class AdmPatcher():
+    """Generates variants of an Adams Dataset (.adm) file by replacing argument values in its text.
+
+    The text is parsed once. The location of each patched argument is found the first time it is
+    used and reused after that, so generating a variant is a single string join.
+
+    Example
+    -------
+    >>> patcher = AdmPatcher(Path('base.adm').read_text())
+    >>> text = patcher.patch({('PART', 'PART_2', 'MASS'): 2.5,
+    ...                       ('SPLINE', 3, 'Y'): [0, 1, 4, 9]})
+
+    Parameters
+    ----------
+    text : str
+        Text of the base .adm file
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.statements: List[AdmStatement] = list(iter_adm_statements(text))
+        self._spans: Dict[Tuple[str, Union[int, str], str], Tuple[int, int, bool]] = {}
+
+    def find_statement(self, statement: str, id_or_name: Union[int, str]) -> AdmStatement:
+        """Returns the statement of type `statement` with the given adams id or Adams View name"""
+        statement = statement.upper()
+        for stmt in self.statements:
+            if stmt.type == statement and (stmt.id == id_or_name
+                                           or (isinstance(id_or_name, str)
+                                               and stmt.view_name is not None
+                                               and stmt.view_name.lower() == id_or_name.lower())):
+                return stmt
+
+        raise KeyError(f'No {statement} statement with id or name {id_or_name!r}')
+
+    def locate(self, statement: str, id_or_name: Union[int, str], argument: str) -> Tuple[int, int, bool]:
+        """Returns the start and end of the value of `argument` in the text and whether the argument
+        is missing (in which case it is inserted at the end of the statement)."""
+        key = (statement.upper(), id_or_name, argument.upper())
+        if key not in self._spans:
+            stmt = self.find_statement(statement, id_or_name)
+            span = find_argument(self.text, stmt.start, stmt.end, argument)
+            self._spans[key] = (*span, False) if span is not None else (stmt.end, stmt.end, True)
+
+        return self._spans[key]
+
+    def patch(self, values: Dict[Tuple[str, Union[int, str], str], Any]) -> str:
+        """Returns the text with the given argument values replaced.
+
+        Parameters
+        ----------
+        values : Dict[Tuple[str, Union[int, str], str], Any]
+            New values keyed by (statement type, adams id or Adams View name, argument). Values
+            can be numbers, strings (inserted verbatim) or sequences of numbers.
+
+        Returns
+        -------
+        str
+            Patched .adm text
+        """
+        spans = sorted(((*self.locate(*key), key[2], value) for key, value in values.items()),
+                       key=lambda span: span[0])
+
+        pieces = []
+        position = 0
+        for start, end, missing, argument, value in spans:
+            pieces.append(self.text[position:start])
+            if missing:
+                pieces.append(f'\n, {argument} = ')
+            pieces.append(format_adm_value(value))
+            position = end
+
+        pieces.append(self.text[position:])
+        return ''.join(pieces)
+
+
+def get_dataset_dependencies(filename: Union[Path, str]) -> List[Path]:
+    """Returns the files referenced by the `FILE` arguments (e.g. of GRAPHICS and SPLINE
+    statements, or `FILE/COMMAND` commands) of an Adams Dataset (.adm) or Command (.acf) file.
+
+    Note
+    ----
+    User subroutine libraries are not included.
+
+    Parameters
+    ----------
+    filename : Union[Path, str]
+        Adams Dataset (.adm) or Command (.acf) file
+
+    Returns
+    -------
+    List[Path]
+        Referenced files in the order they are first found. Relative paths are resolved against
+        the directory of `filename`.
+    """
+    filename = Path(filename)
+    files = []
+    for line in filename.read_text(errors='ignore').splitlines():
+        if line.lstrip().startswith('!'):
+            continue
+        for match in RE_ADM_FILE.finditer(line):
+            file = filename.parent / match.group(1).strip('"\'')
+            if file not in files:
+                files.append(file)
+
+    return files
+
+
+def iter_adm_statements(text: str) -> Generator[AdmStatement, None, None]:
+    """Yields the location of each statement in the text of an .adm file"""
+    view_name = None
+    current = None
+
+    # The first line is the title
+    lines = text.splitlines(keepends=True)
+    position = len(lines[0]) if lines else 0
+    for line in lines[1:]:
+        stripped = line.strip()
+        line_end = position + len(line.rstrip('\r\n'))
+
+        if stripped.startswith('!'):
+            match = RE_ADM_VIEW_NAME.search(stripped)
+            if match:
+                view_name = match.group(1)
+
+        elif stripped.startswith(','):
+            if current is not None:
+                current[4] = line_end
+
+        elif stripped:
+            if current is not None:
+                yield AdmStatement(*current)
+                current = None
+
+            match = RE_ADM_STATEMENT.match(stripped)
+            if match:
+                current = [match.group(1).upper(), int(match.group(2) or 0), view_name, position, line_end]
+            view_name = None
+
+        position += len(line)
+
+    if current is not None:
+        yield AdmStatement(*current)
+
+
+def find_argument(text: str, start: int, end: int, argument: str) -> Union[Tuple[int, int], None]:
+    """Returns the start and end of the value of `argument` in the statement spanning
+    `text[start:end]`, or None if the statement does not have the argument."""
+    match = re.compile(rf'[,/]\s*{re.escape(argument)}\s*=\s*', flags=re.IGNORECASE).search(text, start, end)
+    if match is None:
+        return None
+
+    # The value ends at the first comma (outside of parentheses) that starts another argument
+    depth = 0
+    idx = match.end()
+    while idx < end:
+        char = text[idx]
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0 and RE_ADM_NEXT_ARG.match(text, idx, end):
+            break
+        idx += 1
+
+    value_end = idx
+    while value_end > match.end() and text[value_end - 1].isspace():
+        value_end -= 1
+
+    return match.end(), value_end
+
+
+def format_adm_value(value: Any, per_line: int = 5) -> str:
+    """Formats a value for an .adm file. Sequences are split over continuation lines."""
+    if isinstance(value, str):
+        return value
+    elif isinstance(value, Number):
+        return f'{value:.10g}' if isinstance(value, float) else str(value)
+
+    values = [format_adm_value(v) for v in value]
+    lines = [', '.join(values[i:i + per_line]) for i in range(0, len(values), per_line)]
+    return '\n, '.join(lines)
@@ -1,13 +1,19 @@
-
+import json
 import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 import re
-from typing import Union
+from typing import Dict, Iterable, List, Tuple, Union
 import unicodedata
 
 import Adams  # type: ignore # noqa
 from Object import ObjectBase  # type: ignore # noqa
 
+BIN_HEADER_SIZE = 512
+"""Number of bytes read from the start of a .bin file to find the version string"""
+
+BIN_CATALOG_FILE = '.bin_catalog.json'
+
 
 def write_bin_file(filename: Path, entity: Union[ObjectBase, str] = None, alert=False):
     cmd = 'file bin write file="{}" alert={}'.format(filename, 'yes' if alert else 'no')
@@ -29,12 +35,32 @@ def read_bin_file(filename: Path, entity_name: str = None, alert=False):
     Adams.execute_cmd(cmd)
 
 
-def get_bin_version(filename: Union[Path, str]):
+def read_bin_header(filename: Union[Path, str], size: int = BIN_HEADER_SIZE) -> str:
+    """Returns the printable text of the first line of a .bin file without reading more than
+    `size` bytes.
+
+    Parameters
+    ----------
+    filename : Union[Path, str]
+        Path to the .bin file
+    size : int, optional
+        Maximum number of bytes to read, by default BIN_HEADER_SIZE
+
+    Returns
+    -------
+    str
+        Header text with control characters removed
+    """
     with Path(filename).open('rb') as fid:
-        line = fid.readline()
+        data = fid.read(size)
 
-    text = ''.join([ch for ch in line.decode('ascii', errors='ignore')
+    line = data.split(b'\n', 1)[0]
+    return ''.join([ch for ch in line.decode('ascii', errors='ignore')
                     if unicodedata.category(ch)[0] != "C"])
+
+
+def get_bin_version(filename: Union[Path, str]):
+    text = read_bin_header(filename)
     comps = re.findall('version\\s([\\d\\.]*)', text, flags=re.IGNORECASE)[0].split('.')
     year = int(comps[0])
 
@@ -58,7 +84,7 @@ def get_bin_version(filename: Union[Path, str]):
 
     # Store any other components in a list
     if len(comps) > 3:
-        other = (int(comp) for comp in comps[3:] if len(comp) <= 2)
+        other = tuple(int(comp) for comp in comps[3:] if len(comp) <= 2)
     else:
         other = ()
 
@@ -67,11 +93,189 @@ def get_bin_version(filename: Union[Path, str]):
 
 
 def is_compatible(filename: Union[Path, str]):
-    bin_ver = get_bin_version(filename)
-    adams_ver = os.environ['VERSION']
+    return is_version_compatible(get_bin_version(filename), os.environ['VERSION'])
+
+
+def is_version_compatible(bin_ver: str, adams_ver: str) -> bool:
+    """Returns True if a .bin file written by `bin_ver` can be read by `adams_ver`
 
+    Parameters
+    ----------
+    bin_ver : str
+        Version string as returned by `get_bin_version`
+    adams_ver : str
+        Adams version string (e.g. the `VERSION` environment variable)
+    """
     for bv, av in zip(bin_ver.split('_'), adams_ver.split('_')):
-        if bv > av:
-            return False
+        if not (bv.isdigit() and av.isdigit()):
+            if bv > av:
+                return False
+        elif int(bv) != int(av):
+            return int(bv) < int(av)
 
     return True
+
+
+class BinCatalog():
+    """Catalog of the versions of the .bin files in one or more directory trees.
+
+    Entries are keyed by absolute path and store the version, size and modification time of each
+    file. Files whose size and modification time have not changed since the last scan are not
+    re-read, so rescanning a directory only reads the headers of new or modified files.
+
+    Example
+    -------
+    >>> catalog = BinCatalog.load('bin_catalog.json')
+    >>> catalog.scan('models')
+    >>> catalog.save()
+    >>> loadable = catalog.compatible()
+
+    Parameters
+    ----------
+    filename : Path, optional
+        File the catalog is persisted to, by default None
+    entries : Dict[str, dict], optional
+        Existing catalog entries, by default None
+    """
+
+    def __init__(self, filename: Path = None, entries: Dict[str, dict] = None):
+        self.filename = Path(filename) if filename is not None else None
+        self.entries: Dict[str, dict] = entries if entries is not None else {}
+
+    @classmethod
+    def load(cls, filename: Path):
+        """Loads a catalog from `filename`. Returns an empty catalog if the file does not exist
+        or can not be read."""
+        filename = Path(filename)
+        try:
+            entries = json.loads(filename.read_text())
+        except (OSError, ValueError):
+            entries = {}
+
+        return cls(filename, entries)
+
+    def save(self, filename: Path = None):
+        """Writes the catalog to `filename` (or the file it was loaded from)"""
+        filename = Path(filename) if filename is not None else self.filename
+        if filename is None:
+            raise ValueError('No filename given for the bin catalog!')
+
+        tmp_file = filename.with_name(filename.name + '.tmp')
+        tmp_file.write_text(json.dumps(self.entries, indent=1))
+        os.replace(tmp_file, filename)
+        self.filename = filename
+
+    def scan(self, directories: Union[Path, str, Iterable[Union[Path, str]]], max_workers: int = None):
+        """Scans `directories` recursively for .bin files and updates the catalog.
+
+        Parameters
+        ----------
+        directories : Path or str or Iterable of Path or str
+            Directory tree(s) to scan
+        max_workers : int, optional
+            Number of threads used to list directories and read headers, by default None which
+            uses the `ThreadPoolExecutor` default
+
+        Returns
+        -------
+        List[str]
+            Paths of the entries that were added or updated
+        """
+        if isinstance(directories, (str, Path)):
+            directories = [directories]
+        directories = [Path(d).absolute() for d in directories]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+
+            # Each directory is listed in its own task so that large trees are walked in parallel
+            stats = {}
+            pending = {pool.submit(_scan_dir, d) for d in directories}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    found, subdirs = future.result()
+                    stats.update(found)
+                    pending |= {pool.submit(_scan_dir, d) for d in subdirs}
+
+            # Drop entries under the scanned directories whose file no longer exists
+            for path in [p for p in self.entries
+                         if p not in stats and any(d in Path(p).parents for d in directories)]:
+                del self.entries[path]
+
+            changed = [path for path, (size, mtime) in stats.items()
+                       if self.entries.get(path, {}).get('size') != size
+                       or self.entries.get(path, {}).get('mtime') != mtime]
+
+            for path, version in zip(changed, pool.map(_try_get_bin_version, changed)):
+                size, mtime = stats[path]
+                self.entries[path] = {'version': version, 'size': size, 'mtime': mtime}
+
+        return changed
+
+    def compatible(self, adams_ver: str = None) -> List[Path]:
+        """Returns the cataloged files that can be read by `adams_ver`
+
+        Parameters
+        ----------
+        adams_ver : str, optional
+            Adams version, by default the `VERSION` environment variable
+        """
+        adams_ver = adams_ver if adams_ver is not None else os.environ['VERSION']
+        return [Path(path) for path, entry in self.entries.items()
+                if entry['version'] is not None
+                and is_version_compatible(entry['version'], adams_ver)]
+
+
+def build_bin_catalog(directories: Union[Path, str, Iterable[Union[Path, str]]],
+                      catalog_file: Path = None,
+                      max_workers: int = None) -> BinCatalog:
+    """Scans `directories` for .bin files, updating and saving the catalog in `catalog_file`.
+
+    Parameters
+    ----------
+    directories : Path or str or Iterable of Path or str
+        Directory tree(s) to scan
+    catalog_file : Path, optional
+        Catalog file, by default `BIN_CATALOG_FILE` in the first directory
+    max_workers : int, optional
+        Number of threads used for scanning, by default None
+
+    Returns
+    -------
+    BinCatalog
+        The updated catalog
+    """
+    if catalog_file is None:
+        first = directories if isinstance(directories, (str, Path)) else next(iter(directories))
+        catalog_file = Path(first) / BIN_CATALOG_FILE
+
+    catalog = BinCatalog.load(catalog_file)
+    catalog.scan(directories, max_workers=max_workers)
+    catalog.save()
+
+    return catalog
+
+
+def _scan_dir(directory: Union[Path, str]) -> Tuple[Dict[str, tuple], List[str]]:
+    """Returns the size and modification time of the .bin files directly in `directory` and a
+    list of its subdirectories"""
+    found, subdirs = {}, []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.lower().endswith('.bin'):
+                    st = entry.stat()
+                    found[entry.path] = (st.st_size, st.st_mtime)
+    except OSError:
+        pass
+
+    return found, subdirs
+
+
+def _try_get_bin_version(filename: Path):
+    try:
+        return get_bin_version(filename)
+    except (OSError, IndexError, ValueError):
+        return None
@@ -1,40 +1,423 @@
 import os
+import re
+from array import array
 from pathlib import Path
+from typing import Dict, Generator, List, NamedTuple, Tuple, Union
 
-from .bin import get_bin_version, read_bin_file, write_bin_file
+from ..utils.cache import CACHE_DIR, evict_lru, hash_files, touch
+from .bin import read_bin_file, write_bin_file
 
 import Adams # type: ignore # isort: skip # pylint: disable=wrong-import-order
 
-def cached_model_import(cmd_file: Path, mod_name: str = None, alert=False):
+MODEL_CACHE_DIR = CACHE_DIR / 'models'
+MODEL_CACHE_MAX_SIZE = 5 * 2**30
+"""Maximum total size of the model cache in bytes"""
+
+RE_CMD_ARG = re.compile(r'(?<![\w.])([A-Za-z_]\w*)\s*=(?!=)')
+RE_CMD_QUOTED = re.compile(r'"[^"]*"|\'[^\']*\'')
+RE_CMD_COMMENT = re.compile(r'"[^"]*"|\'[^\']*\'|!')
+RE_CMD_CONTINUATION = re.compile(r'&[ \t\r]*(?:![^\n]*)?\n')
+RE_CMD_NEEDS_TOKENIZER = re.compile(r'["\'(<>]|==')
+
+CMD_CHUNK_SIZE = 1 << 22
+
+FILE_ARGS = ('file_name', 'file', 'property_file', 'shell_file')
+"""Command arguments whose values are file names"""
+
+NAME_ARGS = ('model_name', 'part_name', 'marker_name', 'joint_name', 'i_marker_name', 'j_marker_name',
+             'variable_name', 'spline_name', 'array_name', 'geometry_name', 'force_name', 'motion_name',
+             'contact_name', 'group_name', 'analysis_name', 'shell_name', 'curve_name', 'equation_name',
+             'differential_equation_name', 'general_state_equation_name', 'matrix_name', 'string_name',
+             'i_part_name', 'j_part_name', 'i_geometry_name', 'j_geometry_name', 'i_curve_name', 'j_curve_name',
+             'flexible_body_name', 'sensor_name', 'request_name', 'measure_name')
+"""Entity name arguments that are also recognized abbreviated down to the entity (e.g. `part` or
+`i_marker`). Other arguments are only recognized by their full `*_name` form."""
+
+
+def cached_model_import(cmd_file: Path,
+                        mod_name: str = None,
+                        alert=False,
+                        cache_dir: Path = None,
+                        max_cache_size: int = MODEL_CACHE_MAX_SIZE):
     """Imports a model from a cmd file and caches it in a binary file. Imports from the binary
-    file if it already exists and is newer than the cmd file.
+    file if the cmd file, the files it includes and the Adams version match a cached model.
+
+    Note
+    ----
+    Cache entries are keyed on a hash of the contents of `cmd_file` and every command, shell and
+    property file it references (recursively), so touching a file does not invalidate the cache
+    but editing an included file does.
 
     Parameters
     ----------
     cmd_file : Path
         Adams View Command (.cmd) file containing a single model.
+    mod_name : str, optional
+        Name to give the model when it is read from the cache, by default None
+    alert : bool, optional
+        Whether to show alerts when reading the cached file, by default False
+    cache_dir : Path, optional
+        Directory to store the cached models in, by default `MODEL_CACHE_DIR`
+    max_cache_size : int, optional
+        Maximum total size of the cache in bytes, by default `MODEL_CACHE_MAX_SIZE`. The least
+        recently used models are deleted when the cache grows beyond this size.
     """
     cmd_file = Path(cmd_file)
-    cached_file = cmd_file.with_suffix('.cached')
+    cache_dir = Path(cache_dir) if cache_dir is not None else MODEL_CACHE_DIR
+    version = os.environ['VERSION']
+
+    key = hash_files([cmd_file, *get_cmd_dependencies(cmd_file)], version)
+    cached_file = cache_dir / f'{version}_{key}.bin'
 
-    existing_models = Adams.Models.values()
+    existing_models = list(Adams.Models.values())
 
-    # Check
-    if (cached_file.exists()
-            and cached_file.stat().st_mtime > cmd_file.stat().st_mtime
-            and get_bin_version(cached_file) == os.environ['VERSION']):
+    if cached_file.exists():
 
-        # If the cache file exists and it is newer than the cmd file and uses the same version,
-        # Read in the cached file
+        # If a model with the same contents was cached by this version, read the cached file
+        touch(cached_file)
         read_bin_file(cached_file, mod_name, alert=alert)
-    
+
     else:
 
-        # If the cached file does not exist or it is older than the cmd file
-        # Read in the cmd file
-        Adams.read_command_file(cmd_file)
-        
+        # Otherwise read in the cmd file
+        Adams.read_command_file(str(cmd_file))
+
         # Write the cached file
+        cache_dir.mkdir(parents=True, exist_ok=True)
         mod = next(m for m in Adams.Models.values() if m not in existing_models)
-        write_bin_file(cached_file, mod)
-    
+        tmp_file = cache_dir / f'tmp_{os.getpid()}_{cached_file.name}'
+        write_bin_file(tmp_file, mod)
+        if tmp_file.exists():
+            os.replace(tmp_file, cached_file)
+
+        evict_lru(cache_dir, max_cache_size, pattern='*.bin')
+
+
+def get_cmd_dependencies(cmd_file: Union[Path, str]) -> List[Path]:
+    """Returns the files referenced by `cmd_file`, including the files referenced by any command
+    files it reads.
+
+    Relative paths are resolved against the directory of the referencing file first and the
+    current working directory second. Command files given without an extension are looked up with
+    the `.cmd` extension Adams View adds. Files that can not be found are returned as given.
+
+    Parameters
+    ----------
+    cmd_file : Union[Path, str]
+        Adams View Command (.cmd) file
+
+    Returns
+    -------
+    List[Path]
+        Referenced files in the order they are first found
+    """
+    cmd_file = Path(os.path.abspath(cmd_file))
+    found: List[Path] = []
+    pending = [cmd_file]
+    visited = set()
+    while pending:
+        current = pending.pop(0)
+        if current in visited or not current.is_file():
+            continue
+        visited.add(current)
+
+        for dependency in index_cmd_file(current).dependencies:
+            default_suffix = '.cmd' if dependency.kind == 'command' else ''
+            dep = _resolve(dependency.file_name, current.parent, default_suffix)
+            if dep not in found and dep != cmd_file:
+                found.append(dep)
+                if dep.suffix.lower() == '.cmd':
+                    pending.append(dep)
+
+    return found
+
+
+def _resolve(name: str, parent_dir: Path, default_suffix: str = '') -> Path:
+    """Resolves a file name found in a command file. `default_suffix` is tried as well if the name
+    has no extension."""
+    path = Path(name.replace('\\\\', '/').replace('\\', '/'))
+    candidates = [path]
+    if default_suffix and not path.suffix:
+        candidates.append(path.with_suffix(default_suffix))
+
+    if path.is_absolute():
+        return next((c for c in candidates if c.exists()), candidates[-1])
+
+    for directory in (parent_dir, Path.cwd()):
+        for candidate in candidates:
+            if (directory / candidate).exists():
+                return Path(os.path.abspath(directory / candidate))
+
+    return path
+
+
+class CmdStatement(NamedTuple):
+    """A single (possibly continued) Adams View command"""
+    keyword: str
+    """Lower case command words (e.g. 'part create rigid_body name_and_position')"""
+    args: Dict[str, str]
+    """Argument values keyed by lower case argument name. Quotes are not removed."""
+    line: int
+    """Line number the statement starts on (1-based)"""
+
+
+class CmdDependency(NamedTuple):
+    """A file referenced by a command file"""
+    file_name: str
+    kind: str
+    """'command', 'shell', 'spline', 'property' or 'file'"""
+    line: int
+
+
+class CmdIndex():
+    """Index of the statements in an Adams View command file
+
+    Attributes
+    ----------
+    file : Path
+        The indexed file
+    statements : Dict[str, array]
+        Line numbers of the statements, keyed by command keyword
+    definitions : Dict[str, Tuple[str, int]]
+        Keyword and line number of the create statement of each entity, keyed by lower case name
+    references : Dict[str, int]
+        Number of times each entity is referenced, keyed by lower case name
+    dependencies : List[CmdDependency]
+        Files read by the command file (excluding files it writes)
+    """
+
+    def __init__(self, file: Path = None):
+        self.file = file
+        self.statements: Dict[str, array] = {}
+        self.definitions: Dict[str, Tuple[str, int]] = {}
+        self.references: Dict[str, int] = {}
+        self.dependencies: List[CmdDependency] = []
+        self._keyword_info: Dict[str, Tuple[List[str], bool, bool]] = {}
+        self._name_args: Dict[str, bool] = {}
+
+    def add(self, stmt: CmdStatement):
+        """Adds a statement to the index"""
+        if stmt.keyword not in self.statements:
+            self.statements[stmt.keyword] = array('l')
+        self.statements[stmt.keyword].append(stmt.line)
+
+        if stmt.keyword not in self._keyword_info:
+            words = stmt.keyword.split()
+            self._keyword_info[stmt.keyword] = (
+                words,
+                any(_is_abbrev(w, 'create') for w in words[1:]),
+                any(_is_abbrev(w, 'write') or _is_abbrev(w, 'export') for w in words[1:]),
+            )
+        words, is_create, is_write = self._keyword_info[stmt.keyword]
+
+        defined = None
+        for name, value in stmt.args.items():
+            if name in FILE_ARGS:
+                if not is_write:
+                    self.dependencies.append(CmdDependency(_unquote(value),
+                                                           _dependency_kind(words, name),
+                                                           stmt.line))
+
+            elif self._is_name_arg(name):
+                if is_create and defined is None:
+                    defined = _unquote(value).lower()
+                    self.definitions[defined] = (stmt.keyword, stmt.line)
+                    continue
+
+                for ref in value.split(','):
+                    ref = _unquote(ref.strip()).lower()
+                    if ref and not ref.startswith('('):
+                        self.references[ref] = self.references.get(ref, 0) + 1
+
+    def _is_name_arg(self, name: str) -> bool:
+        """Returns True if argument `name` takes entity names"""
+        if name not in self._name_args:
+            self._name_args[name] = not name.startswith('new_') and (
+                name.endswith('_name')
+                or any(_is_abbrev(name, full) and len(name) >= len(full) - len('_name') for full in NAME_ARGS)
+            )
+        return self._name_args[name]
+
+    def find(self, keyword: str) -> List[str]:
+        """Returns the names of the entities defined by statements matching `keyword`.
+
+        Each word of `keyword` may be abbreviated in the indexed file (e.g. 'part create' matches
+        'part cre rigid_body name_and_position').
+        """
+        words = keyword.lower().split()
+        return [name for name, (kw, _) in self.definitions.items()
+                if all(_is_abbrev(w, f) for w, f in zip(kw.split(), words))
+                and len(kw.split()) >= len(words)]
+
+    @property
+    def models(self) -> List[str]:
+        return self.find('model create')
+
+    @property
+    def parts(self) -> List[str]:
+        return self.find('part create')
+
+    @property
+    def external_references(self) -> List[str]:
+        """Referenced names with absolute paths that are not defined in the file"""
+        return [name for name in self.references
+                if name.startswith('.') and name not in self.definitions]
+
+
+def iter_cmd_statements(cmd_file: Union[Path, str]) -> Generator[CmdStatement, None, None]:
+    """Yields the statements in an Adams View command file one at a time.
+
+    Handles comments (`!`), continuation lines (`&`) and quoted strings. The file is read in
+    chunks of about `CMD_CHUNK_SIZE` characters, so arbitrarily large files can be processed with
+    bounded memory.
+
+    Parameters
+    ----------
+    cmd_file : Union[Path, str]
+        Adams View Command (.cmd) file
+
+    Yields
+    ------
+    CmdStatement
+        The statements in the file
+    """
+    line_no = 1
+    carry = ''
+    with Path(cmd_file).open('r', errors='ignore') as fid:
+        while True:
+            lines = fid.readlines(CMD_CHUNK_SIZE)
+            if not lines:
+                break
+
+            # Mark continued line breaks (and drop their trailing comments) so they are not split
+            chunk = RE_CMD_CONTINUATION.sub('\x01', carry + ''.join(lines))
+
+            # The text after the last line break is the start of a continued statement
+            *pieces, carry = chunk.split('\n')
+            for piece in pieces:
+                n_lines = 1
+                if '\x01' in piece:
+                    n_lines += piece.count('\x01')
+                    piece = piece.replace('\x01', ' ')
+
+                if '!' in piece:
+                    piece = _strip_comment(piece)
+
+                text = piece.strip()
+                if text:
+                    yield parse_cmd_statement(text, line_no)
+                line_no += n_lines
+
+    text = _strip_comment(carry.replace('\x01', ' ')).strip()
+    if text:
+        yield parse_cmd_statement(text, line_no)
+
+
+def parse_cmd_statement(text: str, line: int = 0) -> CmdStatement:
+    """Splits a single Adams View command (without comments or continuation characters) into
+    its keyword and arguments"""
+    if not RE_CMD_NEEDS_TOKENIZER.search(text):
+
+        # Fast path for the common case of plain `name = value` arguments
+        segments = text.split('=')
+        head = segments[0].rsplit(None, 1)
+        keyword = ' '.join(head[0].lower().split()) if len(head) > 1 else ''
+        name = head[-1] if head else ''
+        args = {}
+        try:
+            for segment in segments[1:-1]:
+                value, next_name = segment.rsplit(None, 1)
+                args[name.lower()] = value.strip()
+                name = next_name
+        except ValueError:
+            pass
+        else:
+            if len(segments) == 1:
+                return CmdStatement(' '.join(text.lower().split()), {}, line)
+
+            args[name.lower()] = segments[-1].strip()
+            return CmdStatement(keyword, args, line)
+
+    # Blank out quoted strings so that `=` inside strings is not mistaken for an argument
+    masked = text
+    if '"' in text or "'" in text:
+        masked = RE_CMD_QUOTED.sub(lambda m: '"' + ' ' * (len(m.group()) - 2) + '"', text)
+
+    matches = list(RE_CMD_ARG.finditer(masked))
+    if not matches:
+        return CmdStatement(' '.join(text.lower().split()), {}, line)
+
+    keyword = ' '.join(text[:matches[0].start()].lower().split())
+    args = {}
+    for match, next_match in zip(matches, matches[1:] + [None]):
+        end = next_match.start() if next_match is not None else len(text)
+        args[match.group(1).lower()] = text[match.end():end].strip()
+
+    return CmdStatement(keyword, args, line)
+
+
+def index_cmd_file(cmd_file: Union[Path, str]) -> CmdIndex:
+    """Builds a `CmdIndex` of an Adams View command file without loading it into Adams View.
+
+    Example
+    -------
+    >>> index = index_cmd_file('model.cmd')
+    >>> index.models
+    ['.model_1']
+    >>> [dep.file_name for dep in index.dependencies if dep.kind == 'shell']
+    ['geometry/tooth.shl']
+
+    Parameters
+    ----------
+    cmd_file : Union[Path, str]
+        Adams View Command (.cmd) file
+
+    Returns
+    -------
+    CmdIndex
+        Index of the statements, entities and file dependencies in `cmd_file`
+    """
+    index = CmdIndex(Path(cmd_file))
+    for stmt in iter_cmd_statements(cmd_file):
+        index.add(stmt)
+
+    return index
+
+
+def _strip_comment(line: str) -> str:
+    """Removes a `!` comment that is not inside a quoted string"""
+    if '!' not in line:
+        return line
+    elif '"' not in line and "'" not in line:
+        return line[:line.index('!')]
+
+    for match in RE_CMD_COMMENT.finditer(line):
+        if match.group() == '!':
+            return line[:match.start()]
+
+    return line
+
+
+def _is_abbrev(word: str, full: str) -> bool:
+    """Returns True if `word` is `full` or an abbreviation of it"""
+    return bool(word) and full.startswith(word)
+
+
+def _unquote(value: str) -> str:
+    value = value.strip()
+    if len(value) > 1 and value[0] == value[-1] and value[0] in '"\'':
+        return value[1:-1]
+    return value
+
+
+def _dependency_kind(words: List[str], arg: str) -> str:
+    if arg == 'property_file':
+        return 'property'
+    elif len(words) > 1 and _is_abbrev(words[0], 'file') and _is_abbrev(words[1], 'command'):
+        return 'command'
+    elif any(_is_abbrev(w, 'shell') for w in words[1:]) or arg == 'shell_file':
+        return 'shell'
+    elif any(_is_abbrev(w, 'spline') for w in words[1:]):
+        return 'spline'
+
+    return 'file'
@@ -1,7 +1,12 @@
 import re
 from pathlib import Path
+from typing import Union
 
 PROCESS_ID_PATTERN = re.compile('^[^\\w]*Process ID:\\s*(\\d+)[^\\w]*$', flags=re.MULTILINE | re.IGNORECASE)
+COMMAND_PATTERN = re.compile(r'^\s*command:\s*(.*)$', flags=re.MULTILINE | re.IGNORECASE)
+STATIC_COMMAND_PATTERN = re.compile(r'^sim\w*\s*/\s*stat', flags=re.IGNORECASE)
+ERROR_PATTERN = re.compile(r'START:\s*(?:ERROR|FAULT)|failed\s+to\s+converge|analysis\s+(?:has\s+)?failed',
+                           flags=re.IGNORECASE)
 
 
 def get_process_id(filename: Path):
@@ -19,3 +24,36 @@ def get_process_id(filename: Path):
 
     """
     return next(int(p) for p in PROCESS_ID_PATTERN.findall(Path(filename).read_text()))
+
+
+def get_failed_static_step(filename: Path) -> Union[int, None]:
+    """Returns the index of the first static simulation (`simulate/static` command) that failed
+    in the given message file.
+
+    The message file is split into the sections following each echoed command. A static
+    simulation failed if its section contains an error.
+
+    Parameters
+    ----------
+    filename : Path
+        Path to the message file.
+
+    Returns
+    -------
+    int or None
+        Zero based index of the failed static simulation, or None if none failed.
+    """
+    text = Path(filename).read_text(errors='ignore')
+    commands = list(COMMAND_PATTERN.finditer(text))
+
+    step = 0
+    for command, next_command in zip(commands, commands[1:] + [None]):
+        if not STATIC_COMMAND_PATTERN.match(command.group(1).strip()):
+            continue
+
+        end = next_command.start() if next_command is not None else len(text)
+        if ERROR_PATTERN.search(text, command.end(), end):
+            return step
+        step += 1
+
+    return None
@@ -1,14 +1,13 @@
 from itertools import product
 from pathlib import Path
-from typing import List, Tuple
+from typing import TYPE_CHECKING, List, Tuple
 import pickle as pkl
 
-import matplotlib.pyplot as plt
-import numpy as np
-import pandas as pd
-import stl
-from mpl_toolkits import mplot3d
-from scipy.spatial import KDTree
+# numpy, pandas, scipy, numpy-stl and matplotlib are imported by the functions that use them so that
+# importing this module inside Adams View is cheap
+if TYPE_CHECKING:
+    import pandas as pd
+    import stl
 
 
 CACH_SUFFIX = '.bshl'
@@ -47,6 +46,8 @@ def write_shell_file(points: List[Tuple[float, float, float]],
 
 def drop_duplicates(points: List[Tuple[float, float, float]],
                     facets: List[Tuple[int, int, int]]):
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    import pandas as pd  # pylint: disable=import-outside-toplevel
 
     df_points = pd.DataFrame(points, columns=['x', 'y', 'z'])
     df_points['duplicated'] = df_points.duplicated()
@@ -139,7 +140,7 @@ def is_number(s):
         return False
 
 
-def get_shell_diff_vectors(file_1: Path, file_2: Path):
+def get_shell_diff_vectors(file_1: Path, file_2: Path) -> 'pd.DataFrame':
     """Get a vector of the differences between two (.shl) files
 
     Parameters
@@ -154,6 +155,9 @@ def get_shell_diff_vectors(file_1: Path, file_2: Path):
     bool
         True if the two files are the same
     """
+    import pandas as pd  # pylint: disable=import-outside-toplevel
+    from scipy.spatial import KDTree  # pylint: disable=import-outside-toplevel
+
     points_1, _ = read_shell_file(file_1)
     points_2, _ = read_shell_file(file_2)
 
@@ -188,7 +192,7 @@ def get_shell_volume(points: List[Tuple[float, float, float]], facets: List[Tupl
     return abs(volume)
 
 
-def to_stl_mesh(points, facets):
+def to_stl_mesh(points, facets) -> 'stl.mesh.Mesh':
     """Converts a shell to an stl mesh
 
     Parameters
@@ -203,6 +207,9 @@ def to_stl_mesh(points, facets):
     stl.mesh.Mesh
         Mesh
     """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    import stl  # pylint: disable=import-outside-toplevel
+
     points = np.array(points)
     facets = np.array(facets)
 
@@ -221,6 +228,9 @@ def to_stl_mesh(points, facets):
 
 
 def plot_shell(points, facets):
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    from mpl_toolkits import mplot3d  # pylint: disable=import-outside-toplevel
 
     fig = plt.figure()
     ax = fig.add_subplot(projection='3d')
@@ -1,7 +1,6 @@
 import re
 from pathlib import Path
 from typing import Any, Dict
-import thornpy
 TO_BLOCK_HEADER_PATTERN = re.compile('^\\[[_0-9a-zA-Z]+\\]\\s*$') 
 TO_SUBBLOCK_HEADER_PATTERN = re.compile('^\\([_0-9a-zA-Z]+\\)\\s*$') 
 TO_TABLE_HEADER_PATTERN = re.compile('^\\{(\\s*[_0-9a-zA-Z])+\\s*\\}\\s*$')
@@ -44,6 +43,7 @@ def read_TO_file(filename: Path)->Dict[str, Any]:
         Raised if the Tiem Orbit syntax is not recognized
         
     """    
+    import thornpy  # Imports numpy, pandas and scipy, so not imported with the module
     if not filename.exists():
         raise FileNotFoundError(f'{filename} does not exist!')
     
@@ -0,0 +1,610 @@
+"""Run many Adams Solver jobs in parallel on the local machine, or queue them on a shared
+filesystem for `aviewpy.worker` processes on other machines to run.
+
+Example
+-------
+>>> with JobScheduler(max_workers=8) as scheduler:
+...     futures = scheduler.map(Path('load_cases').glob('*.acf'), timeout=3600, retries=1)
+>>> failed = [f.result().acf_file for f in futures if not f.result().succeeded]
+
+>>> queue = JobQueue('//cluster/share/queue')
+>>> job_ids = [queue.put(acf_file, timeout=3600) for acf_file in Path('load_cases').glob('*.acf')]
+>>> results = queue.wait(job_ids)
+"""
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, wait
+from itertools import count
+from pathlib import Path
+from typing import Dict, Iterable, List, Union
+
+from .files.acf_text import patch_acf
+from .solver import JobResult, get_output_files, solve
+from .utils.process import CpuAllocator
+
+LOG = logging.getLogger(__name__)
+
+
+class Job():
+    """A queued solver job. Jobs with a higher `priority` are started first.
+
+    If `retry_commands` is given, retries solve a copy of the .acf (`<stem>_retry<n>.acf`) with
+    those solver commands replaced or inserted (see `patch_acf`). It is either a single dict of
+    commands, or a list with one dict per retry (the last one is reused for further retries).
+    """
+
+    _counter = count()
+
+    def __init__(self,
+                 acf_file: Path,
+                 priority: int = 0,
+                 timeout: float = None,
+                 retries: int = 0,
+                 use_adams_car=False,
+                 telemetry=False,
+                 threads: int = None,
+                 stall_timeout: float = None,
+                 retry_commands: Union[Dict[str, str], List[Dict[str, str]]] = None):
+        self.acf_file = Path(acf_file).absolute()
+        self.priority = priority
+        self.timeout = timeout
+        self.stall_timeout = stall_timeout
+        self.retries = retries
+        self.retry_commands = retry_commands
+        self.use_adams_car = use_adams_car
+        self.telemetry = telemetry
+        self.threads = max(1, threads) if threads is not None else None
+        self.cpus: List[int] = None
+        """Cpus the job is pinned to while it runs"""
+        self.attempts = 0
+        self.future: Future = Future()
+        self._order = next(self._counter)
+
+    def __lt__(self, other: 'Job'):
+        return (-self.priority, self._order) < (-other.priority, other._order)
+
+    def run(self) -> JobResult:
+        """Runs the job once and waits for it to finish"""
+        self.attempts += 1
+        acf_file = self._get_acf_file()
+        start = time.time()
+        proc = solve(acf_file,
+                     wait=False,
+                     use_adams_car=self.use_adams_car,
+                     telemetry=self.telemetry,
+                     cpus=self.cpus,
+                     threads=self.threads,
+                     wall_time=self.timeout,
+                     stall_time=self.stall_timeout)
+
+        returncode = proc.wait()
+        timeout_reason = None
+        for monitor in ['telemetry', 'watchdog']:
+            if hasattr(proc, monitor):
+                getattr(proc, monitor).join()
+        if hasattr(proc, 'watchdog') and proc.watchdog.reason is not None:
+            timeout_reason = proc.watchdog.reason
+            returncode = None
+
+        return JobResult(acf_file,
+                         returncode,
+                         time.time() - start,
+                         get_output_files(acf_file, since=start),
+                         self.attempts,
+                         timeout_reason=timeout_reason)
+
+    def _get_acf_file(self) -> Path:
+        """Returns the .acf file to solve in the current attempt"""
+        if self.attempts <= 1 or not self.retry_commands:
+            return self.acf_file
+
+        retry = self.attempts - 1
+        if isinstance(self.retry_commands, dict):
+            commands = self.retry_commands
+        else:
+            commands = self.retry_commands[min(retry, len(self.retry_commands)) - 1]
+
+        acf_file = self.acf_file.with_name(f'{self.acf_file.stem}_retry{retry}.acf')
+        acf_file.write_text(patch_acf(self.acf_file.read_text(), commands=commands))
+        return acf_file
+
+
+class JobScheduler():
+    """Runs Adams Solver jobs using at most `max_workers` cores at once.
+
+    Each job declares the number of threads it uses (counted as 1 if not given). Jobs are started
+    in priority order while their threads fit in the free cores. When the next job does not fit,
+    no further jobs are started until enough cores are released for it, so a stream of small jobs
+    cannot keep a large high priority job waiting indefinitely.
+
+    Each running job is waited on in its own thread, so submitting jobs does not block the
+    caller (e.g. the Adams View session).
+
+    Parameters
+    ----------
+    max_workers : int, optional
+        Maximum number of cores used by concurrent solver processes, by default the number of
+        cores (or the number of `cpus` if `pin_cpus` is True)
+    use_adams_car : bool, optional
+        Whether to use Adams/Car to solve the jobs, by default False
+    telemetry : bool, optional
+        Whether to record the resource usage of each job. See `solve`. By default False
+    pin_cpus : bool, optional
+        Whether to pin each job to its own set of cpus (Linux only), by default False
+    numa : bool, optional
+        Whether to keep the cpus of each pinned job on a single NUMA node where possible, so its
+        memory is allocated on that node. By default True
+    cpus : Iterable[int], optional
+        Cpus to pin jobs to, by default all cpus this process may run on
+    """
+
+    def __init__(self,
+                 max_workers: int = None,
+                 use_adams_car=False,
+                 telemetry=False,
+                 pin_cpus=False,
+                 numa=True,
+                 cpus: Iterable[int] = None):
+        self.allocator = CpuAllocator(cpus, numa=numa) if pin_cpus else None
+        self.max_workers = max_workers or (len(self.allocator.cpus) if pin_cpus else os.cpu_count()) or 1
+        self.use_adams_car = use_adams_car
+        self.telemetry = telemetry
+        self._queue: List[Job] = []
+        self._running: List[Job] = []
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    def submit(self,
+               acf_file: Union[Path, str],
+               priority: int = 0,
+               timeout: float = None,
+               retries: int = 0,
+               threads: int = None,
+               stall_timeout: float = None,
+               retry_commands: Union[Dict[str, str], List[Dict[str, str]]] = None) -> Future:
+        """Queues an Adams Command (.acf) file to be solved.
+
+        Parameters
+        ----------
+        acf_file : Union[Path, str]
+            Path to an Adams Command (.acf) File
+        priority : int, optional
+            Jobs with a higher priority are started first, by default 0
+        timeout : float, optional
+            Wall clock time limit in seconds after which the solver is killed, by default None
+        retries : int, optional
+            Number of times to rerun the job if it fails or times out, by default 0
+        threads : int, optional
+            Number of threads the solver uses (e.g. `PREFERENCES/NTHREADS`). The job occupies this
+            many cores and the thread environment variables of the solver are set to it (see
+            `solve`). By default None, which occupies one core and leaves the environment as is.
+        stall_timeout : float, optional
+            Time in seconds without growth of the .msg and .out files after which the solver is
+            considered hung and killed, by default None
+        retry_commands : Union[Dict[str, str], List[Dict[str, str]]], optional
+            Solver commands to change for retries (e.g. `{'INTEGRATOR': 'INTEGRATOR/HHT'}`). See
+            `Job`. By default None
+
+        Returns
+        -------
+        Future
+            Future resolving to a `JobResult`
+        """
+        job = Job(acf_file,
+                  priority,
+                  timeout,
+                  retries,
+                  self.use_adams_car,
+                  self.telemetry,
+                  threads,
+                  stall_timeout,
+                  retry_commands)
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError('Cannot submit jobs after shutdown')
+            heapq.heappush(self._queue, job)
+
+        self._dispatch()
+        return job.future
+
+    def map(self, acf_files: Iterable[Union[Path, str]], **kwargs) -> List[Future]:
+        """Queues several Adams Command (.acf) files. `kwargs` are passed to `submit`."""
+        return [self.submit(acf_file, **kwargs) for acf_file in acf_files]
+
+    def wait(self, futures: Iterable[Future] = None) -> List[JobResult]:
+        """Waits for `futures` (by default all queued and running jobs) and returns their results"""
+        if futures is None:
+            with self._lock:
+                futures = [job.future for job in self._queue + self._running]
+        futures = list(futures)
+        wait(futures)
+        return [f.result() for f in futures if not f.cancelled()]
+
+    def shutdown(self, wait=True, cancel_pending=False):
+        """Stops accepting jobs and optionally cancels queued jobs and waits for running ones"""
+        with self._lock:
+            self._shutdown = True
+            if cancel_pending:
+                for job in self._queue:
+                    job.future.cancel()
+                self._queue.clear()
+
+        if wait:
+            self.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.shutdown(wait=True)
+
+    def _dispatch(self):
+        """Starts queued jobs in priority order while the next job's threads fit in the free cores"""
+        with self._lock:
+            free = self.max_workers - sum(self._cores(job) for job in self._running)
+
+            # Stop at the first job that does not fit, which reserves the cores released by
+            # running jobs for it instead of handing them to smaller jobs behind it
+            while self._queue and self._cores(self._queue[0]) <= free:
+                job = self._queue[0]
+                if self.allocator is not None:
+                    job.cpus = self.allocator.allocate(self._cores(job))
+                    if job.cpus is None:
+                        break
+
+                heapq.heappop(self._queue)
+                if job.attempts == 0 and not job.future.set_running_or_notify_cancel():
+                    self._release(job)
+                    continue
+
+                free -= self._cores(job)
+                self._running.append(job)
+                threading.Thread(target=self._run, args=(job,), daemon=True).start()
+
+    def _cores(self, job: Job) -> int:
+        """Number of cores `job` occupies. Jobs with more threads than cores run on their own."""
+        return min(job.threads or 1, self.max_workers)
+
+    def _release(self, job: Job):
+        if self.allocator is not None and job.cpus is not None:
+            self.allocator.release(job.cpus)
+            job.cpus = None
+
+    def _run(self, job: Job):
+        try:
+            result = job.run()
+        except Exception as err:  # pylint: disable=broad-except
+            result = err
+
+        with self._lock:
+            self._running.remove(job)
+            self._release(job)
+            retry = (not isinstance(result, JobResult) or not result.succeeded) and job.attempts <= job.retries
+            if retry:
+                LOG.info(f'Retrying {job.acf_file.name} (attempt {job.attempts + 1})')
+                heapq.heappush(self._queue, job)
+
+        if not retry:
+            if isinstance(result, JobResult):
+                job.future.set_result(result)
+            else:
+                job.future.set_exception(result)
+
+        self._dispatch()
+
+
+JOB_STATES = ['pending', 'running', 'done', 'failed']
+
+
+class QueuedJob():
+    """A job claimed from a `JobQueue`
+
+    Attributes
+    ----------
+    id : str
+        Job id
+    spec : dict
+        The job as queued by `JobQueue.put` (acf_file, priority, timeout, retries, ...)
+    file : Path
+        The claimed job file in the running directory
+    """
+
+    def __init__(self, spec: dict, file: Path):
+        self.id: str = spec['id']
+        self.spec = spec
+        self.file = file
+
+    @property
+    def acf_file(self) -> Path:
+        return Path(self.spec['acf_file'])
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.id!r}, {self.acf_file.name!r})'
+
+
+class JobQueue():
+    """A durable queue of solver jobs that only uses the filesystem, so it can be shared by
+    several machines over a network filesystem.
+
+    Each job is a JSON file that moves between the `pending`, `running`, `done` and `failed`
+    subdirectories of `root` by atomic renames. A worker claims a job by renaming it into
+    `running` with its worker id in the name, so only one worker can win. Workers touch a
+    heartbeat file in `workers` while they are alive, and jobs claimed by a worker whose
+    heartbeat stops are moved back to `pending` by `recover`.
+
+    Note
+    ----
+    The .acf paths are stored as absolute paths, so the shared filesystem must be mounted at the
+    same path on every machine.
+
+    Parameters
+    ----------
+    root : Path
+        Directory of the queue. Created if it does not exist.
+    """
+
+    def __init__(self, root: Union[Path, str]):
+        self.root = Path(root)
+        for name in [*JOB_STATES, 'workers']:
+            (self.root / name).mkdir(parents=True, exist_ok=True)
+
+        self._heartbeats: Dict[str, tuple] = {}
+
+    def put(self,
+            acf_file: Union[Path, str],
+            priority: int = 0,
+            timeout: float = None,
+            retries: int = 0,
+            use_adams_car=False,
+            threads: int = None,
+            stall_timeout: float = None,
+            retry_commands: Union[Dict[str, str], List[Dict[str, str]]] = None) -> str:
+        """Queues an Adams Command (.acf) file to be solved by a worker.
+
+        Parameters
+        ----------
+        acf_file : Union[Path, str]
+            Path to an Adams Command (.acf) File on the shared filesystem
+        priority : int, optional
+            Jobs with a higher priority are claimed first, by default 0
+        timeout : float, optional
+            Wall clock time limit in seconds after which the solver is killed, by default None
+        retries : int, optional
+            Number of times to requeue the job if it fails or times out, by default 0
+        use_adams_car : bool, optional
+            Whether to use Adams/Car to solve the job, by default False
+        threads : int, optional
+            Number of threads the solver uses. See `JobScheduler.submit`. By default None
+        stall_timeout : float, optional
+            Time in seconds without growth of the .msg and .out files after which the solver is
+            considered hung and killed, by default None
+        retry_commands : Union[Dict[str, str], List[Dict[str, str]]], optional
+            Solver commands to change for retries. See `Job`. By default None
+
+        Returns
+        -------
+        str
+            Job id
+        """
+        job_id = uuid.uuid4().hex
+        priority = max(-999999, min(999999, int(priority)))
+        spec = {'id': job_id,
+                'acf_file': str(Path(acf_file).absolute()),
+                'priority': priority,
+                'timeout': timeout,
+                'retries': retries,
+                'use_adams_car': use_adams_car,
+                'threads': threads,
+                'stall_timeout': stall_timeout,
+                'retry_commands': retry_commands,
+                'attempts': 0,
+                'submitted': time.time()}
+
+        # Names sort by priority, then by submission time
+        stem = f'{1000000 - priority:07d}_{time.time_ns():016x}_{job_id}'
+        self._write(self.root / 'pending' / f'{stem}.json', spec)
+        return job_id
+
+    def claim(self, worker_id: str) -> Union[QueuedJob, None]:
+        """Claims the next pending job for `worker_id`, or returns None if there are none"""
+        for file in sorted((self.root / 'pending').glob('*.json')):
+            running_file = self.root / 'running' / f'{file.stem}@{worker_id}.json'
+            try:
+                os.rename(file, running_file)
+            except OSError:
+                # Claimed by another worker
+                continue
+
+            try:
+                return QueuedJob(json.loads(running_file.read_text()), running_file)
+            except (OSError, ValueError):
+                LOG.warning(f'Discarding unreadable job file {file.name}', exc_info=True)
+                os.replace(running_file, self.root / 'failed' / file.name)
+
+        return None
+
+    def complete(self, job: QueuedJob, result: JobResult, worker_id: str = None):
+        """Records the result of a claimed job. Failed jobs with retries left are requeued.
+
+        Nothing is recorded if the job is no longer claimed by this worker (e.g. `recover` gave it
+        to another worker because this one missed its heartbeats).
+        """
+        # Take the job file out of `running` first, so that `recover` cannot requeue the job while
+        # its result is written
+        completing_file = job.file.with_suffix('.completing')
+        try:
+            os.rename(job.file, completing_file)
+        except FileNotFoundError:
+            LOG.warning(f'Discarding the result of {job.acf_file.name} because it was recovered '
+                        f'from {worker_id or "this worker"}')
+            return
+
+        spec = {**job.spec, 'attempts': job.spec['attempts'] + 1}
+        stem = job.file.stem.split('@')[0]
+
+        if not result.succeeded and spec['attempts'] <= spec['retries']:
+            LOG.info(f'Requeueing {job.acf_file.name} (attempt {spec["attempts"] + 1})')
+            self._write(self.root / 'pending' / f'{stem}.json', spec)
+        else:
+            spec.update({'worker': worker_id,
+                         'returncode': result.returncode,
+                         'wall_time': result.wall_time,
+                         'timed_out': result.timed_out,
+                         'timeout_reason': result.timeout_reason,
+                         'files': [str(f) for f in result.files],
+                         'finished': time.time()})
+            state = 'done' if result.succeeded else 'failed'
+            self._write(self.root / state / f'{stem}.json', spec)
+
+        completing_file.unlink()
+
+    def heartbeat(self, worker_id: str):
+        """Marks `worker_id` as alive"""
+        file = self.root / 'workers' / worker_id
+        try:
+            os.utime(file)
+        except FileNotFoundError:
+            file.touch()
+
+    def remove_worker(self, worker_id: str):
+        """Deletes the heartbeat file of a worker that is shutting down"""
+        try:
+            (self.root / 'workers' / worker_id).unlink()
+        except FileNotFoundError:
+            pass
+
+    def recover(self, stale_after: float = 300.0) -> List[str]:
+        """Moves jobs claimed by dead workers back to pending.
+
+        A worker is dead if its heartbeat file has not changed for `stale_after` seconds, as
+        measured by the calling process. Only modification times reported by the filesystem
+        are compared with each other, so the clocks of the machines need not agree. Each recovery
+        counts as an attempt, so a job that keeps killing its worker is moved to failed once its
+        retries are used up.
+
+        Parameters
+        ----------
+        stale_after : float, optional
+            Seconds without a heartbeat after which a worker is considered dead, by default 300
+
+        Returns
+        -------
+        List[str]
+            Ids of the recovered jobs (including those moved to failed)
+        """
+        now = time.monotonic()
+        recovered = []
+        for file in (self.root / 'running').glob('*.json'):
+            stem, _, worker_id = file.stem.partition('@')
+            try:
+                mtime = (self.root / 'workers' / worker_id).stat().st_mtime
+            except OSError:
+                mtime = None
+
+            last_mtime, seen = self._heartbeats.get(worker_id, (None, None))
+            if seen is None or mtime != last_mtime:
+                self._heartbeats[worker_id] = (mtime, now)
+                continue
+
+            if now - seen < stale_after:
+                continue
+
+            # Take the job file out of `running` first, so only one process recovers the job and a
+            # worker that is still alive cannot complete it as well
+            recovering_file = file.with_suffix('.recovering')
+            try:
+                os.rename(file, recovering_file)
+            except OSError:
+                continue
+
+            try:
+                spec = json.loads(recovering_file.read_text())
+            except (OSError, ValueError):
+                LOG.warning(f'Discarding unreadable job file {file.name}', exc_info=True)
+                os.replace(recovering_file, self.root / 'failed' / f'{stem}.json')
+                continue
+
+            spec['attempts'] += 1
+            if spec['attempts'] <= spec['retries']:
+                LOG.warning(f'Recovered job {stem} from dead worker {worker_id}')
+                self._write(self.root / 'pending' / f'{stem}.json', spec)
+            else:
+                LOG.error(f'Job {stem} failed because worker {worker_id} died while running it')
+                spec.update({'worker': worker_id, 'returncode': None, 'finished': time.time()})
+                self._write(self.root / 'failed' / f'{stem}.json', spec)
+
+            recovering_file.unlink()
+            recovered.append(stem.split('_')[-1])
+
+        return recovered
+
+    def status(self, job_id: str) -> Union[str, None]:
+        """Returns the state of a job ('pending', 'running', 'done' or 'failed'), or None if it
+        is not in the queue"""
+        for state in reversed(JOB_STATES):
+            if next((self.root / state).glob(f'*_{job_id}*.json'), None) is not None:
+                return state
+
+        return None
+
+    def result(self, job_id: str) -> Union[JobResult, None]:
+        """Returns the result of a finished job, or None if it has not finished"""
+        for state in ['done', 'failed']:
+            for file in (self.root / state).glob(f'*_{job_id}.json'):
+                spec = json.loads(file.read_text())
+                return JobResult(Path(spec['acf_file']),
+                                 spec.get('returncode'),
+                                 spec.get('wall_time', 0.0),
+                                 [Path(f) for f in spec.get('files', [])],
+                                 spec['attempts'],
+                                 spec.get('timed_out', False),
+                                 spec.get('timeout_reason'))
+
+        return None
+
+    def wait(self,
+             job_ids: Iterable[str],
+             timeout: float = None,
+             poll_interval: float = 5.0) -> Dict[str, JobResult]:
+        """Waits for jobs to finish.
+
+        Parameters
+        ----------
+        job_ids : Iterable[str]
+            Ids of the jobs to wait for
+        timeout : float, optional
+            Maximum time to wait in seconds, by default None (no limit)
+        poll_interval : float, optional
+            Time between checks of the queue in seconds, by default 5.0
+
+        Returns
+        -------
+        Dict[str, JobResult]
+            Results of the jobs that finished, keyed by job id
+        """
+        pending = list(job_ids)
+        results = {}
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            for job_id in list(pending):
+                result = self.result(job_id)
+                if result is not None:
+                    results[job_id] = result
+                    pending.remove(job_id)
+
+            if not pending or (deadline is not None and time.monotonic() >= deadline):
+                return results
+
+            time.sleep(poll_interval)
+
+    @staticmethod
+    def _write(file: Path, data: dict):
+        """Writes a JSON file so that it appears complete or not at all"""
+        tmp_file = file.with_name(f'.{file.name}.tmp')
+        tmp_file.write_text(json.dumps(data))
+        os.replace(tmp_file, file)
@@ -4,6 +4,9 @@ import Adams  # type: ignore # noqa # isort: skip
 from Object import Object # type: ignore # noqa # isort: skip
 from Group import Group # type: ignore # noqa # isort: skip
 
+from .commands import execute_cmds
+
+
 def translate(objects: List[Object], vector: List[float], csentity: Object = None):
     """Move objects by a vector.
 
@@ -18,12 +21,6 @@ def translate(objects: List[Object], vector: List[float], csentity: Object = Non
     """
     if not isinstance(objects, Iterable):
         objects = [objects]
-        
-    select_list: Group = Adams.Groups['SELECT_LIST']
-    select_list.empty()
-    
-    for obj in objects:
-        select_list.append(obj)
 
     vec_str = ' '.join([f'c{i+1}={v}' for i, v in enumerate(vector)])
 
@@ -31,6 +28,7 @@ def translate(objects: List[Object], vector: List[float], csentity: Object = Non
     if csentity is not None:
         cmd += f' csentity_name={csentity.full_name}'
 
-    Adams.execute_cmd(cmd)
-
-    select_list.empty()
+    execute_cmds(['group empty group=SELECT_LIST',
+                  *[f'group object add group=SELECT_LIST objects={obj.full_name}' for obj in objects],
+                  cmd,
+                  'group empty group=SELECT_LIST'])
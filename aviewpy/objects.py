@@ -1,14 +1,161 @@
-from typing import Generator, Iterable, List, Union
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Generator, Iterable, Iterator, List, Optional, Set, Tuple, Type, Union
 
 import Adams  # type: ignore # noqa
+from Constraint import Constraint  # type: ignore # noqa
+from Contact import Contact  # type: ignore # noqa
 from DataElement import DataElement  # type: ignore # noqa
 from DBAccess import find_by_full_name  # type: ignore # noqa
+from Force import Force  # type: ignore # noqa
 from Manager import AdamsManager  # type: ignore # noqa
+from Marker import Marker  # type: ignore # noqa
 from Model import Model  # type: ignore # noqa
-from Object import DuplicateAttributeError  # type: ignore # noqa
 from Object import ObjectBase as Object  # type: ignore # noqa
+from Part import Part  # type: ignore # noqa
 from UDE import UserDefinedElement, UserDefinedInstance  # type: ignore # noqa
 
+from .commands import execute_cmds
+
+
+class ObjectIndex():
+    """Index of the objects in a model keyed on their lower case full names
+
+    The index is built by a single traversal of the model the first time it is used. Entries are
+    checked against the database (`find_by_full_name`) when they are looked up, so objects that have
+    been renamed or destroyed since they were indexed are never returned. Objects created after the
+    index was built are added by traversing only the child of their nearest indexed ancestor (or of
+    the model) that contains them. Names that exist in the database but cannot be reached through
+    the managers are remembered in `missing` until the index is rebuilt or invalidated.
+
+    Parameters
+    ----------
+    mod : Model
+        Model to index
+    """
+
+    def __init__(self, mod: Model):
+        self.mod = mod
+        self.prefix = mod.full_name.lower() + '.'
+        self.objects: Dict[str, Object] = None
+        self.missing: Set[str] = set()
+        """Lower case full names that exist but are not reachable through the managers"""
+
+    def rebuild(self):
+        """Indexes every object in the model"""
+        self.objects = {}
+        self.missing = set()
+        self._add_descendants(self.mod)
+
+    def invalidate(self):
+        """Empties the index so that it is rebuilt on the next lookup"""
+        self.objects = None
+        self.missing = set()
+
+    def discard(self, *full_names: str):
+        """Removes the objects `full_names` and their descendants from the index"""
+        if self.objects is None:
+            return
+        keys = tuple(name.lower() for name in full_names)
+        prefixes = tuple(key + '.' for key in keys)
+        for key in [key for key in self.objects if key in keys or key.startswith(prefixes)]:
+            del self.objects[key]
+
+    def get(self, full_name: str) -> Optional[Object]:
+        """Returns the object with the given full name, or None if it is not in the model
+
+        Parameters
+        ----------
+        full_name : str
+            Full name of the object to return
+
+        Returns
+        -------
+        Object, None
+            Object with the given full name, or None if no object with the given full name is found.
+        """
+        if self.objects is None:
+            self.rebuild()
+
+        key = full_name.lower()
+        obj = self._get_indexed(key)
+        if (obj is None and key.startswith(self.prefix) and key not in self.missing
+                and Adams.evaluate_exp(f'db_exists("{full_name}")')):
+            self._add_missing(key)
+            obj = self._get_indexed(key)
+            if obj is None:
+                self.missing.add(key)
+
+        return obj
+
+    def get_objects(self, full_names: Iterable[str]) -> List[Optional[Object]]:
+        """Returns the objects with the given full names (None for those not in the model)"""
+        return [self.get(name) for name in full_names]
+
+    def _get_indexed(self, key: str) -> Optional[Object]:
+        obj = self.objects.get(key)
+        if obj is None:
+            return None
+
+        if obj.full_name.lower() != key:
+            # Renamed since it was indexed
+            self.discard(key)
+            return None
+
+        current = find_by_full_name(key)
+        if current is None:
+            # Destroyed since it was indexed
+            self.discard(key)
+        elif current is not obj:
+            # Destroyed and replaced by a new object with the same name
+            self.objects[key] = current
+        return current
+
+    def _add_missing(self, key: str):
+        """Indexes the child of the nearest indexed ancestor of `key` that contains `key`"""
+        ancestor_key = key
+        while len(ancestor_key) >= len(self.prefix):
+            child_key, ancestor_key = ancestor_key, ancestor_key.rsplit('.', 1)[0]
+            ancestor = self.mod if ancestor_key + '.' == self.prefix else self._get_indexed(ancestor_key)
+            if ancestor is not None:
+                break
+        else:
+            return
+
+        # Direct children of the ancestor, including the objects of a UDE instance
+        for child in iter_descendants(ancestor, prune=lambda obj: True):
+            if child.full_name.lower() == child_key:
+                self.objects[child_key] = child
+                self._add_descendants(child)
+                return
+
+    def _add_descendants(self, obj: Object):
+        for descendant in all_descendants(obj):
+            self.objects[descendant.full_name.lower()] = descendant
+
+
+INDEXES: Dict[str, ObjectIndex] = {}
+"""Object indexes used by `get_object`, keyed on the lower case full name of the model"""
+
+
+def get_index(mod: Model) -> ObjectIndex:
+    """Returns the object index of `mod`, creating it if necessary.
+
+    Parameters
+    ----------
+    mod : Model
+        Adams model
+
+    Returns
+    -------
+    ObjectIndex
+        Index of the objects in `mod`
+    """
+    key = mod.full_name.lower()
+    if key not in INDEXES or INDEXES[key].mod is not mod:
+        INDEXES[key] = ObjectIndex(mod)
+    return INDEXES[key]
+
 
 def get_object(full_name: str, mod: Model):
     """Returns the object with the given full name in the given model.
@@ -26,10 +173,25 @@ def get_object(full_name: str, mod: Model):
         Object with the given full name in the given model, or None if no object with the given
         full name is found.
     """
-    for obj in all_descendants(mod):
-        if obj.full_name.lower() == full_name.lower():
-            return obj
-    return None
+    return get_index(mod).get(full_name)
+
+
+def get_objects(full_names: Iterable[str], mod: Model) -> List[Optional[Object]]:
+    """Returns the objects with the given full names in the given model.
+
+    Parameters
+    ----------
+    full_names : Iterable[str]
+        Full names of the objects to return
+    mod : Model
+        Model to search for the objects
+
+    Returns
+    -------
+    List[Optional[Object]]
+        Objects with the given full names, with None for each name that is not found
+    """
+    return get_index(mod).get_objects(full_names)
 
 
 def delete_objects(objects: Union[str, Object, List[str], List[Object]]):
@@ -48,23 +210,101 @@ def delete_objects(objects: Union[str, Object, List[str], List[Object]]):
             *[f'group object add group=select_list objects = {name}' for name in names],
             'mdi delete_macro']
 
-    for cmd in cmds:
-        Adams.execute_cmd(cmd)
+    execute_cmds(cmds)
+
+    for index in INDEXES.values():
+        index.discard(*names)
+    for name in names:
+        INDEXES.pop(name.lower(), None)
 
 
 def all_descendants(obj: Object) -> Generator[Object, None, None]:
-    for mgr in get_managers(obj):
-        for descendant in mgr.values():
+    """Yields every descendant of `obj` (see `iter_descendants`)"""
+    yield from iter_descendants(obj)
+
+
+def iter_descendants(obj: Object,
+                     obj_type: Union[Type[Object], Tuple[Type[Object], ...]] = None,
+                     prune: Callable[[Object], bool] = None) -> Generator[Object, None, None]:
+    """Yields the descendants of `obj` depth first, without recursion.
+
+    The objects of UDE instances (`objects`) are yielded after the descendants of the instance, but
+    their own descendants are not visited.
+
+    Parameters
+    ----------
+    obj : Object
+        Object whose descendants are yielded
+    obj_type : Union[Type[Object], Tuple[Type[Object], ...]], optional
+        Only yield descendants of this type (or these types), by default all descendants are yielded
+    prune : Callable[[Object], bool], optional
+        Called with each descendant. If it returns True, the descendants of that object are skipped
+        (the object itself is still yielded if it matches `obj_type`). The `objects` of a pruned
+        UDE instance are still yielded.
+
+    Yields
+    ------
+    Object
+        Descendants of `obj`
+    """
+    # Each entry is an iterator over sibling objects and whether to visit their descendants
+    stack: List[Tuple[Iterator[Object], bool]] = [(_iter_children(obj), True)]
+    while stack:
+        siblings, expand = stack[-1]
+        descendant = next(siblings, None)
+        if descendant is None:
+            stack.pop()
+            continue
+
+        if obj_type is None or isinstance(descendant, obj_type):
             yield descendant
-            yield from all_descendants(descendant)
 
+        if expand:
             if hasattr(descendant, 'objects'):
                 descendant: Union[UserDefinedElement, UserDefinedInstance]
-                yield from (obj for obj in descendant.objects if obj is not None)
+                stack.append((iter([o for o in descendant.objects if o is not None]), False))
+            if prune is None or not prune(descendant):
+                stack.append((_iter_children(descendant), True))
+
+
+def _iter_children(obj: Object) -> Iterator[Object]:
+    return (child for mgr in get_managers(obj) for child in mgr.values())
+
 
+def descendant_names(obj: Object, obj_type: str = 'all') -> List[str]:
+    """Returns the full names of the descendants of `obj` from a single `DB_DESCENDANTS` evaluation.
 
-def get_managers(parent: Object):
-    return [mgr for mgr in parent.__dict__.values() if isinstance(mgr, AdamsManager)]
+    Cheaper than `iter_descendants` when the objects themselves are not needed, because no python
+    objects are created for them.
+
+    Parameters
+    ----------
+    obj : Object
+        Object whose descendants are returned
+    obj_type : str, optional
+        Adams type of the descendants to return (e.g. "marker"), by default "all"
+
+    Returns
+    -------
+    List[str]
+        Full names of the descendants of `obj`
+    """
+    names = Adams.evaluate_exp(f'DB_DESCENDANTS({obj.full_name} , "{obj_type}" , 0 , 2 )')
+    if isinstance(names, str):
+        names = [names] if names else []
+    return list(names or [])
+
+
+MANAGER_NAMES: Dict[type, List[str]] = {}
+"""Names of the manager attributes of each object class, found the first time `get_managers` is
+called with an object of that class"""
+
+
+def get_managers(parent: Object) -> List[AdamsManager]:
+    cls = type(parent)
+    if cls not in MANAGER_NAMES:
+        MANAGER_NAMES[cls] = [attr for attr, value in parent.__dict__.items() if isinstance(value, AdamsManager)]
+    return [parent.__dict__[attr] for attr in MANAGER_NAMES[cls] if attr in parent.__dict__]
 
 
 def get_parent_model(entity: Object) -> Model:
@@ -86,33 +326,168 @@ def get_parent_model(entity: Object) -> Model:
         return get_parent_model(entity.parent)
 
 
-def set_unique_adams_id(entity):
-    if isinstance(entity, DataElement):
+ID_CLASSES = (Part, Marker, Constraint, Force, Contact, DataElement)
+"""Classes of entities with adams ids. Ids are kept unique among all entities of each class in a model
+(e.g. a spline and an array never share an id)."""
 
-        # Get the model object
-        mod = Adams.Models[Adams.evaluate_exp(f'db_ancestor({entity.full_name}, "model")')]
-        adams_id = entity.adams_id
 
-        # Get an available adams id
-        ents = [ent for ent in mod.DataElements.values() if entity != ent]
-        while adams_id == 0 or adams_id in [ent.adams_id for ent in ents]:
-            adams_id += 1
+class AdamsIdAllocator():
+    """Hands out unique adams ids to the entities of a model
 
-    else:
-        raise NotImplementedError(f'This function is not implemented for type {type(entity)}')
+    The ids used by the entities of each class in `ID_CLASSES` are collected by a single traversal
+    of the model the first time an entity of that class is allocated an id.
 
-    try:
-        entity.adams_id = adams_id
-    except DuplicateAttributeError as err:
-        ents = [e for e in mod.DataElements.values() if e.adams_id == adams_id if e != entity]
-        if ents != []:
-            custom_err = DuplicateAttributeError(f'An adams id of {adams_id} was found while '
-                                                 f'looking for a unique id for {entity.name} '
-                                                 'However, this id is already taken by '
-                                                 '{}!'.format(','.join([e.name for e in ents])))
-            raise custom_err from err
+    Parameters
+    ----------
+    mod : Model
+        Model whose entities are allocated ids
+    """
+
+    def __init__(self, mod: Model):
+        self.mod = mod
+        self.owners: Dict[type, Dict[int, List[str]]] = {}
+        self.next_free: Dict[type, int] = {}
+
+    def used_ids(self, id_class: type) -> Dict[int, List[str]]:
+        """Returns the lower case full names of the entities of `id_class` keyed on their adams ids"""
+        if id_class not in self.owners:
+            owners: Dict[int, List[str]] = {}
+            for ent in iter_descendants(self.mod, id_class, prune=lambda obj: isinstance(obj, id_class)):
+                if ent.adams_id:
+                    owners.setdefault(ent.adams_id, []).append(ent.full_name.lower())
+            self.owners[id_class] = owners
+            self.next_free[id_class] = 1
+
+        return self.owners[id_class]
+
+    def allocate(self, entities: Iterable[Object]) -> List[int]:
+        """Returns a unique adams id for each of `entities` without applying them.
+
+        An entity keeps its id unless it is 0 or is also used by an entity that is not in
+        `entities` or that comes before it in `entities`. Other entities get the lowest ids that
+        are not used by any entity of the same class, so the ids can be applied in any order. The
+        allocator is not changed, so allocating the same entities again returns the same ids.
+
+        Parameters
+        ----------
+        entities : Iterable[Object]
+            Entities to allocate ids to. All must be in `self.mod`.
+
+        Returns
+        -------
+        List[int]
+            Adams id of each entity in `entities`
+
+        Raises
+        ------
+        NotImplementedError
+            If an entity is not an instance of one of `ID_CLASSES`
+        """
+        entities = list(entities)
+        return self._allocate(entities, [ent.adams_id for ent in entities])[0]
+
+    def assign(self, entities: Iterable[Object]) -> List[int]:
+        """Allocates unique adams ids to `entities` (see `allocate`) and applies those that changed
+        with a single batch of commands. The allocator records the applied ids, so it can be
+        reused for later assignments as long as no other ids in the model are changed.
+
+        Parameters
+        ----------
+        entities : Iterable[Object]
+            Entities to renumber. All must be in `self.mod`.
+
+        Returns
+        -------
+        List[int]
+            Adams id of each entity in `entities`
+        """
+        entities = list(entities)
+        current_ids = [ent.adams_id for ent in entities]
+        ids, next_free = self._allocate(entities, current_ids)
+        execute_cmds([f'entity modify entity_name = {ent.full_name} adams_id = {adams_id}'
+                      for ent, current_id, adams_id in zip(entities, current_ids, ids) if current_id != adams_id])
+
+        # Record the applied ids
+        self.next_free.update(next_free)
+        for ent, current_id, adams_id in zip(entities, current_ids, ids):
+            name = ent.full_name.lower()
+            owners = self.owners[get_id_class(ent)]
+            if name in owners.get(current_id, []) and current_id != adams_id:
+                owners[current_id].remove(name)
+                if not owners[current_id]:
+                    del owners[current_id]
+            if name not in owners.setdefault(adams_id, []):
+                owners[adams_id].append(name)
+
+        return ids
+
+    def _allocate(self, entities: List[Object], current_ids: List[int]) -> Tuple[List[int], Dict[type, int]]:
+        """Returns the allocated ids and the next free id of each class after the allocation"""
+        batch = {ent.full_name.lower() for ent in entities}
+        next_free: Dict[type, int] = {}
+
+        ids: List[int] = []
+        claimed = set()
+        for ent, current_id in zip(entities, current_ids):
+            id_class = get_id_class(ent)
+            owners = self.used_ids(id_class)
+            if (current_id and (id_class, current_id) not in claimed
+                    and all(owner in batch for owner in owners.get(current_id, []))):
+                adams_id = current_id
+            else:
+                adams_id = next_free.get(id_class, self.next_free[id_class])
+                while adams_id in owners or (id_class, adams_id) in claimed:
+                    adams_id += 1
+                next_free[id_class] = adams_id + 1
+
+            claimed.add((id_class, adams_id))
+            ids.append(adams_id)
+
+        return ids, next_free
+
+
+def get_id_class(entity: Object) -> type:
+    """Returns the class in `ID_CLASSES` that `entity` is an instance of.
+
+    Raises
+    ------
+    NotImplementedError
+        If `entity` is not an instance of any of `ID_CLASSES`
+    """
+    for id_class in ID_CLASSES:
+        if isinstance(entity, id_class):
+            return id_class
+
+    raise NotImplementedError(f'This function is not implemented for type {type(entity)}')
 
-    return adams_id
+
+def set_unique_adams_id(entity: Object, allocator: AdamsIdAllocator = None) -> int:
+    """Gives `entity` an adams id that no other entity of the same class in its model uses.
+
+    This is meant for one-off changes: without an `allocator`, the ids of all entities of the
+    class are read from the model on every call. Use `AdamsIdAllocator.assign` to renumber many
+    entities at once, or pass the same allocator to repeated calls.
+
+    Parameters
+    ----------
+    entity : Object
+        Entity with an adams id (see `ID_CLASSES`)
+    allocator : AdamsIdAllocator, optional
+        Allocator of the model of `entity` to reuse, by default a new one is created
+
+    Returns
+    -------
+    int
+        The adams id of `entity`
+    """
+    if allocator is None:
+        allocator = AdamsIdAllocator(get_parent_model(entity))
+    return allocator.assign([entity])[0]
+
+
+RESERVED_NAMES: Set[str] = set()
+"""Lower case full names reserved by `reserved_names`, which `unique_object_names` does not return"""
+_RESERVED_NAMES_LOCK = threading.Lock()
 
 
 def unique_object_name(full_name: str) -> str:
@@ -122,32 +497,113 @@ def unique_object_name(full_name: str) -> str:
     ----------
     full_name : str
         Full name of object
-    model : Model
-        Adams model
 
     Returns
     -------
     str
         Unique name
     """
-    if not find_by_full_name(full_name):
-        return full_name
+    return unique_object_names(full_name, 1)[0]
+
 
-    unique_name = full_name
+def unique_object_names(full_name: str, count: int) -> List[str]:
+    """Returns `count` unique names for new objects named like `full_name`.
+
+    The names of the existing siblings are fetched with a single `db_children` query and the unique
+    names are found locally. The first name is `full_name` if it is not taken, the rest have an
+    index suffix (e.g. `.MOD.PART_1`, `.MOD.PART_2` or, if `full_name` is `.MOD.PART_3`,
+    `.MOD.PART_4`, `.MOD.PART_5`). Names reserved with `reserved_names` are not returned.
+
+    Parameters
+    ----------
+    full_name : str
+        Full name of the object
+    count : int
+        Number of names to return
+
+    Returns
+    -------
+    List[str]
+        Unique full names
+    """
+    return _unique_names(full_name, count, reserve=False)
+
+
+@contextmanager
+def reserved_names(full_name: str, count: int = 1) -> Generator[List[str], None, None]:
+    """Context manager that reserves `count` unique names (see `unique_object_names`) until it exits,
+    so that other helpers do not use them before the objects are created.
+
+    Example
+    -------
+    >>> with reserved_names('.MOD.MARKER', 3) as names:
+    ...     execute_cmds([f'marker create marker_name = {name}' for name in names])
+
+    Parameters
+    ----------
+    full_name : str
+        Full name of the object
+    count : int, optional
+        Number of names to reserve, by default 1
+
+    Yields
+    ------
+    List[str]
+        Reserved unique full names
+    """
+    names = _unique_names(full_name, count, reserve=True)
+    try:
+        yield names
+    finally:
+        with _RESERVED_NAMES_LOCK:
+            RESERVED_NAMES.difference_update(name.lower() for name in names)
+
+
+def _unique_names(full_name: str, count: int, reserve: bool) -> List[str]:
+    parent_name = full_name.rsplit('.', 1)[0]
+    taken = {f'{parent_name}.{name}'.lower() for name in _child_names(parent_name)}
+
+    names = []
+    with _RESERVED_NAMES_LOCK:
+        taken |= RESERVED_NAMES
+        candidates = _candidate_names(full_name)
+        while len(names) < count:
+            name = next(candidates)
+            if name.lower() not in taken:
+                names.append(name)
+
+        if reserve:
+            RESERVED_NAMES.update(name.lower() for name in names)
+
+    return names
+
+
+def _child_names(parent_name: str) -> List[str]:
+    """Returns the names of the children of `parent_name` from a single query"""
+    if not parent_name:
+        return list(Adams.Models.keys())
+
+    if not Adams.evaluate_exp(f'db_exists("{parent_name}")'):
+        return []
+
+    children = Adams.evaluate_exp(f'db_children({parent_name}, "all")')
+    if isinstance(children, str):
+        children = [children] if children else []
+    return [child.rsplit('.', 1)[-1] for child in children or []]
+
+
+def _candidate_names(full_name: str) -> Generator[str, None, None]:
+    yield full_name
 
     if full_name.split('_')[-1].isdigit():
-        idx = int(full_name.split('_')[-1])+1
+        idx = int(full_name.split('_')[-1]) + 1
         full_name = '_'.join(full_name.split('_')[:-1])
-        unique_name = full_name + f'_{idx}'
     else:
         idx = 1
-        unique_name = full_name + f'_{idx}'
 
-    while find_by_full_name(unique_name):
+    while True:
+        yield f'{full_name}_{idx}'
         idx += 1
-        unique_name = f'{full_name}_{idx}'
-
-    return unique_name
 
 
 def all_objects(obj_type: str = 'all') -> Generator[Object, None, None]:
@@ -156,8 +612,4 @@ def all_objects(obj_type: str = 'all') -> Generator[Object, None, None]:
 
     else:
         for mod in Adams.Models.values():
-            objects = Adams.evaluate_exp(f'DB_DESCENDANTS({mod.full_name} , "{obj_type}" , 0 , 2 )')
-            if isinstance(objects, str):
-                objects = [objects]
-
-            yield from (get_object(name, mod) for name in objects)
+            yield from get_objects(descendant_names(mod, obj_type), mod)
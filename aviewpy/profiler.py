@@ -0,0 +1,317 @@
+"""Profiles the Adams View API calls made by aviewpy helpers.
+
+A `Profiler` wraps `Adams.execute_cmd`, `Adams.evaluate_exp` and the methods of the object
+managers (e.g. `mod.Parts.values()`) and records, for each command keyword or expression
+function, the number of calls, the cumulative time and the aviewpy function that made them.
+
+Example
+-------
+>>> with Profiler() as prof:
+...     data = get_contact_data(ans, cont, mkr)
+>>> print(prof.report(top=20))
+>>> prof.write_trace('contact_data.json')  # Open in chrome://tracing or https://ui.perfetto.dev
+
+>>> @profile(trace_file='fbd.json')
+... def make_fbd():
+...     show_fbd(ans, part)
+"""
+import functools
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+import Adams  # type: ignore
+
+LOG = logging.getLogger(__name__)
+
+MANAGER_METHODS = ('__getitem__', '__iter__', '__contains__', '__len__',
+                   'keys', 'values', 'items', 'get', 'create')
+"""Object manager methods that are profiled"""
+
+MAX_TEXT_LENGTH = 200
+"""Maximum length of the command or expression text stored with each timeline event"""
+
+RE_FUNCTION = re.compile(r'([a-z_]\w*)\s*\(', flags=re.IGNORECASE)
+
+_PACKAGE_DIR = str(Path(__file__).parent)
+_SKIP_FILES = {__file__, str(Path(_PACKAGE_DIR) / 'expressions.py')}
+
+
+class ProfileStat(NamedTuple):
+    kind: str
+    """'cmd', 'exp' or 'manager'"""
+    name: str
+    """Command keyword, expression function or manager method"""
+    caller: str
+    """aviewpy function that made the calls"""
+    calls: int
+    total_time: float
+    """Cumulative time in seconds"""
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+
+class Profiler():
+    """Records the Adams View API calls made while it is active.
+
+    Parameters
+    ----------
+    managers : bool, optional
+        Whether to profile the object manager methods (`MANAGER_METHODS`), by default True
+    timeline : bool, optional
+        Whether to record every call for `write_trace`, by default True
+    max_events : int, optional
+        Maximum number of timeline events to record, by default 1,000,000
+    """
+
+    def __init__(self, managers=True, timeline=True, max_events=1_000_000):
+        self.managers = managers
+        self.timeline = timeline
+        self.max_events = max_events
+        self.records: Dict[Tuple[str, str, str], List[float]] = {}
+        self.events: List[Tuple[str, str, str, str, float, float, int]] = []
+        self.start_time: float = None
+        self.stop_time: float = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Starts recording"""
+        self.start_time = time.perf_counter()
+        self.stop_time = None
+        _install(self.managers)
+        _ACTIVE.append(self)
+        return self
+
+    def stop(self):
+        """Stops recording"""
+        if self in _ACTIVE:
+            _ACTIVE.remove(self)
+            _uninstall()
+            self.stop_time = time.perf_counter()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_):
+        self.stop()
+
+    def record(self, kind: str, name: str, text: str, caller: str, start: float, duration: float):
+        with self._lock:
+            record = self.records.setdefault((kind, name, caller), [0, 0.0])
+            record[0] += 1
+            record[1] += duration
+            if self.timeline and len(self.events) < self.max_events:
+                self.events.append((kind, name, text, caller, start, duration, threading.get_ident()))
+
+    @property
+    def total_time(self) -> float:
+        """Cumulative time spent in Adams View API calls, in seconds"""
+        return sum(total for _, total in self.records.values())
+
+    def stats(self, sort='total_time') -> List[ProfileStat]:
+        """Returns the recorded statistics, sorted in descending order of `sort`"""
+        stats = [ProfileStat(kind, name, caller, calls, total)
+                 for (kind, name, caller), (calls, total) in self.records.items()]
+        return sorted(stats, key=lambda s: getattr(s, sort), reverse=sort in ('calls', 'total_time', 'mean_time'))
+
+    def report(self, sort='total_time', top: int = None) -> str:
+        """Returns a table of the recorded statistics
+
+        Parameters
+        ----------
+        sort : str, optional
+            `ProfileStat` field to sort by, by default 'total_time'
+        top : int, optional
+            Number of rows to include, by default all
+        """
+        stats = self.stats(sort)[:top]
+        elapsed = (self.stop_time or time.perf_counter()) - (self.start_time or time.perf_counter())
+        lines = [f'{sum(calls for calls, _ in self.records.values())} Adams API calls took '
+                 f'{self.total_time:.3f} s of {elapsed:.3f} s',
+                 f'{"calls":>8} {"total (ms)":>11} {"mean (ms)":>10}  {"kind":<8}{"name":<32}caller']
+        lines += [f'{s.calls:>8d} {s.total_time*1e3:>11.2f} {s.mean_time*1e3:>10.3f}  {s.kind:<8}{s.name:<32}{s.caller}'
+                  for s in stats]
+        return '\n'.join(lines)
+
+    def write_trace(self, filename: Path):
+        """Writes the timeline in the Chrome trace event format (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        origin = self.start_time or 0.0
+        events = [{'name': name,
+                   'cat': kind,
+                   'ph': 'X',
+                   'ts': (start - origin) * 1e6,
+                   'dur': duration * 1e6,
+                   'pid': pid,
+                   'tid': tid,
+                   'args': {'caller': caller, 'text': text}}
+                  for kind, name, text, caller, start, duration, tid in self.events]
+        Path(filename).write_text(json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'}))
+
+
+def profile(func: Callable = None, *, trace_file: Path = None, top: int = 20, **kwargs):
+    """Decorator that profiles each call of `func` and logs the report. The `Profiler` of the last
+    call is stored in the `profiler` attribute of the decorated function.
+
+    Parameters
+    ----------
+    trace_file : Path, optional
+        File to write the timeline of each call to, by default None
+    top : int, optional
+        Number of rows of the logged report, by default 20
+    **kwargs
+        Passed to `Profiler`
+    """
+    if func is None:
+        return functools.partial(profile, trace_file=trace_file, top=top, **kwargs)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kw):
+        with Profiler(**kwargs) as prof:
+            wrapper.profiler = prof
+            try:
+                return func(*args, **kw)
+            finally:
+                prof.stop()
+                LOG.info(f'Profile of {func.__qualname__}\n{prof.report(top=top)}')
+                if trace_file is not None:
+                    prof.write_trace(trace_file)
+
+    wrapper.profiler = None
+    return wrapper
+
+
+def get_command_keyword(cmd: str) -> str:
+    """Returns the leading keywords of a command (e.g. 'part create rigid_body')"""
+    tokens = cmd.split()
+    words = []
+    for word, following in zip(tokens[:3], [*tokens[1:4], '']):
+        if '=' in word or following.startswith('='):
+            break
+        words.append(word.lower())
+    return ' '.join(words)
+
+
+def get_expression_function(exp: str) -> str:
+    """Returns the outermost function of an expression, or '(value)' if it has none"""
+    match = RE_FUNCTION.search(exp)
+    return match.group(1).lower() if match else '(value)'
+
+
+def get_caller() -> str:
+    """Returns the innermost aviewpy function on the stack, or the function calling the API"""
+    frame = sys._getframe(2)  # pylint: disable=protected-access
+    first = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename not in _SKIP_FILES:
+            if first is None:
+                first = frame
+            if filename.startswith(_PACKAGE_DIR):
+                return f'{frame.f_globals.get("__name__", "?")}.{frame.f_code.co_name}'
+        frame = frame.f_back
+
+    return first.f_code.co_name if first is not None else '?'
+
+
+_ACTIVE: List[Profiler] = []
+_ORIGINALS: Dict[Any, Dict[str, Any]] = {}
+"""Attributes replaced by profiling wrappers, keyed by the patched module or class. Entries are
+kept while their wrapper is still installed (e.g. inside an `expression_cache` wrapper that was
+installed after it)."""
+_WRAPPERS: Dict[Any, Dict[str, Any]] = {}
+
+
+def _timed(kind: str, func: Callable, get_name: Callable[[Any], str]):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _ACTIVE:
+            return func(*args, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            duration = time.perf_counter() - start
+            name, text = get_name(args)
+            caller = get_caller()
+            for prof in _ACTIVE:
+                prof.record(kind, name, text, caller, start, duration)
+
+    return wrapper
+
+
+def _text_name(get: Callable[[str], str]):
+    def get_name(args):
+        text = str(args[0]) if args else ''
+        return get(text), text[:MAX_TEXT_LENGTH]
+    return get_name
+
+
+def _install(managers: bool):
+    if _ACTIVE:
+        return
+
+    for attr, kind, get_name in (('execute_cmd', 'cmd', get_command_keyword),
+                                 ('evaluate_exp', 'exp', get_expression_function)):
+        if attr not in _ORIGINALS.get(Adams, {}):
+            original = getattr(Adams, attr)
+            _wrap(Adams, attr, original, _timed(kind, original, _text_name(get_name)))
+
+    if managers:
+        for cls in _get_manager_classes():
+            for method in MANAGER_METHODS:
+                if method in cls.__dict__ and method not in _ORIGINALS.get(cls, {}):
+                    original = cls.__dict__[method]
+                    try:
+                        _wrap(cls, method, original, _timed('manager', original,
+                                                            lambda _, m=f'{cls.__name__}.{method}': (m, '')))
+                    except (TypeError, AttributeError):
+                        LOG.debug(f'Can not profile {cls.__name__}.{method}')
+
+
+def _wrap(obj, attr: str, original, wrapper):
+    setattr(obj, attr, wrapper)
+    _ORIGINALS.setdefault(obj, {})[attr] = original
+    _WRAPPERS.setdefault(obj, {})[attr] = wrapper
+
+
+def _uninstall():
+    if _ACTIVE:
+        return
+
+    for obj, wrappers in _WRAPPERS.items():
+        for attr, wrapper in list(wrappers.items()):
+            # If something else wrapped ours since, restoring would remove its wrapper. Ours stays
+            # in its call chain and passes calls through while no profiler is active.
+            if vars(obj).get(attr) is wrapper:
+                setattr(obj, attr, _ORIGINALS[obj].pop(attr))
+                del wrappers[attr]
+
+    for patched in (_ORIGINALS, _WRAPPERS):
+        for obj in [obj for obj, attrs in patched.items() if not attrs]:
+            del patched[obj]
+
+
+def _get_manager_classes() -> List[type]:
+    classes = []
+    if hasattr(Adams, 'Models'):
+        classes += [cls for cls in type(Adams.Models).__mro__ if cls is not object]
+
+    try:
+        import Manager  # type: ignore
+    except ImportError:
+        pass
+    else:
+        classes += [obj for obj in vars(Manager).values()
+                    if isinstance(obj, type) and 'Manager' in obj.__name__]
+
+    return list(dict.fromkeys(classes))
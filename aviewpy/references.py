@@ -0,0 +1,177 @@
+"""Snapshot of the references between the objects of a model (e.g. a joint referencing its markers)
+
+Example
+-------
+>>> graph = ReferenceGraph.from_model(mod)
+>>> joints = [ref.source for ref in graph.referrers(mkr, ['i_marker', 'j_marker'])]
+"""
+from typing import Callable, Dict, Iterable, List, NamedTuple, Tuple
+
+from Model import Model  # type: ignore # noqa
+from Object import ObjectBase as Object  # type: ignore # noqa
+
+from .objects import iter_descendants
+
+
+class Reference(NamedTuple):
+    """A reference from an attribute of `source` to `target`"""
+    source: Object
+    attribute: str
+    target: Object
+
+
+class ReferenceGraph():
+    """Snapshot of the references from the attributes of some objects to other objects.
+
+    Every object is given an integer id and the references are stored as lists of
+    (attribute id, object id) pairs in both directions, so looking up the references from or to an
+    object costs O(number of references) instead of a scan of the model. The graph is not updated
+    when the model changes. Call `invalidate` with objects whose attributes have changed and
+    `discard` with objects that have been deleted.
+
+    Parameters
+    ----------
+    sources : Iterable[Object], optional
+        Objects whose references are read, by default none
+    attributes : Iterable[str], optional
+        Only read these attributes of the sources, by default all of their `properties` are read
+    """
+
+    def __init__(self, sources: Iterable[Object] = (), attributes: Iterable[str] = None):
+        self.read_attributes = list(attributes) if attributes is not None else None
+        self.objects: List[Object] = []
+        """Object of each id"""
+        self.ids: Dict[str, int] = {}
+        """Id of each object, keyed on the lower case full name"""
+        self.attributes: List[str] = []
+        """Attribute name of each attribute id"""
+        self.attribute_ids: Dict[str, int] = {}
+        self.forward: Dict[int, List[Tuple[int, int]]] = {}
+        """(attribute id, target id) of each reference, keyed on the id of the source"""
+        self.reverse: Dict[int, List[Tuple[int, int]]] = {}
+        """(attribute id, source id) of each reference, keyed on the id of the target"""
+
+        for source in sources:
+            self._read(source)
+
+    @classmethod
+    def from_model(cls, mod: Model, prune: Callable[[Object], bool] = None,
+                   attributes: Iterable[str] = None) -> 'ReferenceGraph':
+        """Reads the references of the descendants of `mod` in a single traversal.
+
+        Parameters
+        ----------
+        mod : Model
+            Model to read
+        prune : Callable[[Object], bool], optional
+            Descendants of the objects for which this returns True are not read (see
+            `iter_descendants`). For example, `lambda obj: True` reads only the direct children of
+            `mod` and the `objects` of the UDE instances among them.
+        attributes : Iterable[str], optional
+            Only read these attributes, by default all of the `properties` of each object are read
+
+        Returns
+        -------
+        ReferenceGraph
+            References of the descendants of `mod`
+        """
+        return cls(iter_descendants(mod, prune=prune), attributes)
+
+    def references(self, obj: Object, attributes: Iterable[str] = None) -> List[Reference]:
+        """Returns the references from the attributes of `obj`
+
+        Parameters
+        ----------
+        obj : Object
+            Object to return the references of
+        attributes : Iterable[str], optional
+            Only return references from these attributes, by default references from all attributes
+
+        Returns
+        -------
+        List[Reference]
+            References from `obj`
+        """
+        node = self.ids.get(obj.full_name.lower())
+        return [Reference(self.objects[node], self.attributes[attr], self.objects[target])
+                for attr, target in self._edges(self.forward, node, attributes)]
+
+    def referrers(self, obj: Object, attributes: Iterable[str] = None) -> List[Reference]:
+        """Returns the references to `obj`
+
+        Parameters
+        ----------
+        obj : Object
+            Object to return the references to
+        attributes : Iterable[str], optional
+            Only return references from these attributes, by default references from all attributes
+
+        Returns
+        -------
+        List[Reference]
+            References to `obj`
+        """
+        node = self.ids.get(obj.full_name.lower())
+        return [Reference(self.objects[source], self.attributes[attr], self.objects[node])
+                for attr, source in self._edges(self.reverse, node, attributes)]
+
+    def invalidate(self, *sources: Object):
+        """Reads the references of `sources` again (e.g. after their attributes were modified)"""
+        for source in sources:
+            self._read(source)
+
+    def discard(self, *objects: Object):
+        """Removes the references from and to `objects` (e.g. after they were deleted)"""
+        for obj in objects:
+            node = self.ids.pop(obj.full_name.lower(), None)
+            if node is None:
+                continue
+            self._remove_references(node)
+            for attr, source in self.reverse.pop(node, []):
+                self.forward[source].remove((attr, node))
+
+    def _read(self, source: Object):
+        node = self._node(source)
+        self._remove_references(node)
+
+        edges: List[Tuple[int, int]] = []
+        for attr_name in (self.read_attributes if self.read_attributes is not None else source.properties):
+            try:
+                value = getattr(source, attr_name)
+            except AttributeError:
+                continue
+
+            for target in (value if isinstance(value, (list, tuple)) else [value]):
+                if isinstance(target, Object):
+                    edge = (self._attribute(attr_name), self._node(target))
+                    if edge not in edges:
+                        edges.append(edge)
+                        self.reverse.setdefault(edge[1], []).append((edge[0], node))
+
+        self.forward[node] = edges
+
+    def _remove_references(self, node: int):
+        for attr, target in self.forward.pop(node, []):
+            self.reverse[target].remove((attr, node))
+
+    def _node(self, obj: Object) -> int:
+        key = obj.full_name.lower()
+        if key not in self.ids:
+            self.ids[key] = len(self.objects)
+            self.objects.append(obj)
+        return self.ids[key]
+
+    def _attribute(self, name: str) -> int:
+        if name not in self.attribute_ids:
+            self.attribute_ids[name] = len(self.attributes)
+            self.attributes.append(name)
+        return self.attribute_ids[name]
+
+    def _edges(self, edges: Dict[int, List[Tuple[int, int]]], node: int, attributes: Iterable[str] = None):
+        if node is None:
+            return []
+        if attributes is None:
+            return edges.get(node, [])
+
+        attr_ids = {self.attribute_ids.get(name) for name in attributes}
+        return [edge for edge in edges.get(node, []) if edge[0] in attr_ids]
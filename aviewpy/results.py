@@ -2,7 +2,6 @@ from pathlib import Path
 from typing import List
 
 import Adams  # type: ignore
-from adamspy.postprocess.msg import get_errors
 from Analysis import Analysis  # type: ignore
 
 from aviewpy.objects import get_parent_model  # type: ignore
@@ -61,6 +60,7 @@ def get_sim_errors(msg_file: Path, ignore_static: bool = False, ignore_parse: bo
     List[str]
         The list of errors.
     """
+    from adamspy.postprocess.msg import get_errors  # pylint: disable=import-outside-toplevel
     errors: List[str] = get_errors(msg_file)
 
     if ignore_static:
@@ -1,22 +1,31 @@
+import json
 import logging
 import os
 import platform
 import shutil
-import subprocess
+import time
 from contextlib import contextmanager
 from math import log10
 from numbers import Number
 from pathlib import Path
-from typing import Callable, List, Tuple, Union
+from tempfile import mkdtemp
+from typing import Callable, Iterable, List, NamedTuple, Tuple, Union
 
 import Adams  # type: ignore
 from Simulation import Simulation  # type: ignore
 
+from .commands import execute_cmds
+from .files.acf_text import get_model_file, patch_acf
+from .files.adm_text import get_dataset_dependencies
 from .files.bin import write_bin_file
-from .files.msg import get_process_id
+from .files.msg import get_failed_static_step
+from .jobs import JobQueue
+from .solver import JobResult, get_output_files, solve, solve_async
+from .utils.cache import CACHE_DIR, hash_files, link_or_copy
 
 SIM_PREFERNCES = ['internal', 'external', 'write_files_only']
 SIM_EXTS = ['.acf', '.adm', '.xmt_txt', '.req', '.res', '.msg', '.out', '.gra']
+FUNNEL_SCHEDULE_DIR = CACHE_DIR / 'funnels'
 
 
 LOG = logging.getLogger(__name__)
@@ -34,8 +43,22 @@ def static_funnel(steps: int, **kwargs: Union[float, Tuple[float, float]]) -> Li
         the parameter is held constant, or a tuple of two numbers, in which case the parameter
         is varied linearly between the two values.
     """
+    return funnel_commands([step / steps for step in range(1, steps + 1)], **kwargs)
+
+
+def funnel_commands(fractions: Iterable[float], **kwargs: Union[float, Tuple[float, float]]) -> List[str]:
+    """Generate a list of acf commands to simulate a static equilibrium funnel with a step at
+    each of `fractions` (between 0 and 1) of the way through the funnel.
+
+    Parameters
+    ----------
+    fractions : Iterable[float]
+        Position of each step in the funnel
+    **kwargs : float or Tuple[float, float]]
+        The parameters to vary in the funnel. See `static_funnel`.
+    """
     lines = []
-    for step in range(1, steps + 1):
+    for fraction in fractions:
         params = []
         for key, value in kwargs.items():
             if isinstance(value, Number):
@@ -48,12 +71,12 @@ def static_funnel(steps: int, **kwargs: Union[float, Tuple[float, float]]) -> Li
                     # If both values are positive (most likely), interpolate logarithmically
                     start_value = log10(start_value)
                     end_value = log10(end_value)
-                    val = 10 ** (start_value + (end_value - start_value) * step / steps)
+                    val = 10 ** (start_value + (end_value - start_value) * fraction)
 
                 else:
 
                     # If either value is negative, interpolate linearly
-                    val = start_value + (end_value - start_value) * step / steps
+                    val = start_value + (end_value - start_value) * fraction
 
             params.append(f'{key}={val:d}' if isinstance(val, int) else f'{key}={val:.2e}')
 
@@ -63,15 +86,173 @@ def static_funnel(steps: int, **kwargs: Union[float, Tuple[float, float]]) -> Li
     return lines
 
 
+class FunnelResult(NamedTuple):
+    """Result of `adaptive_static_funnel`"""
+    fractions: List[float]
+    """Position of each step of the last funnel that was run"""
+    converged: bool
+    """Whether every static step of the last run converged"""
+    runs: int
+    """Number of solver runs"""
+    result: 'JobResult'
+    """Result of the last solver run"""
+
+
+def adaptive_static_funnel(acf_file: Path,
+                           steps: int = 3,
+                           max_steps: int = 64,
+                           max_runs: int = 10,
+                           use_adams_car=False,
+                           schedule_dir: Path = None,
+                           **kwargs: Union[float, Tuple[float, float]]) -> FunnelResult:
+    """Solves `acf_file` after a static equilibrium funnel, adding steps to the funnel only where
+    it fails.
+
+    The funnel is run through the solver. If a static step fails (according to the .msg file), a
+    step is inserted halfway between it and the previous step and the funnel is run again. The
+    steps of a funnel that converges are saved, keyed on the contents of the model and the funnel
+    parameters, and are used as the starting funnel the next time the same model is solved.
+
+    Example
+    -------
+    >>> result = adaptive_static_funnel('run_1.acf', steps=3, stability=(1e3, 1e-5), error=1e-5)
+    >>> result.converged, len(result.fractions)
+    (True, 4)
+
+    Parameters
+    ----------
+    acf_file : Path
+        Adams Command (.acf) File to solve. The funnel is run before its commands from a copy
+        named `<stem>_funnel.acf`.
+    steps : int, optional
+        Number of steps in the funnel if there is no saved funnel for the model, by default 3
+    max_steps : int, optional
+        Maximum number of steps in the funnel, by default 64
+    max_runs : int, optional
+        Maximum number of solver runs, by default 10
+    use_adams_car : bool, optional
+        Whether to use Adams/Car to solve the simulation, by default False
+    schedule_dir : Path, optional
+        Directory to save converged funnels in, by default `FUNNEL_SCHEDULE_DIR`
+    **kwargs : float or Tuple[float, float]]
+        The parameters to vary in the funnel. See `static_funnel`.
+
+    Returns
+    -------
+    FunnelResult
+        The last funnel that was run and its result
+
+    Raises
+    ------
+    ValueError
+        If `max_runs` is less than 1
+    """
+    if max_runs < 1:
+        raise ValueError(f'max_runs must be at least 1, not {max_runs}')
+
+    acf_file = Path(acf_file).absolute()
+    schedule_file = (Path(schedule_dir) if schedule_dir is not None else FUNNEL_SCHEDULE_DIR) / \
+        f'{_get_funnel_key(acf_file, kwargs)}.json'
+
+    fractions = _read_funnel_schedule(schedule_file) or [step / steps for step in range(1, steps + 1)]
+
+    lines = acf_file.read_text().splitlines()
+    funnel_acf = acf_file.with_name(f'{acf_file.stem}_funnel.acf')
+
+    for run in range(1, max_runs + 1):
+        funnel_acf.write_text('\n'.join(lines[:2] + funnel_commands(fractions, **kwargs) + lines[2:]) + '\n')
+
+        start = time.time()
+        proc = solve(funnel_acf, wait=True, use_adams_car=use_adams_car)
+        result = JobResult(funnel_acf, proc.returncode, time.time() - start, get_output_files(funnel_acf, since=start))
+
+        failed_step = get_failed_static_step(result.msg_file) if result.msg_file is not None else None
+        if failed_step is None or failed_step >= len(fractions):
+            converged = failed_step is None and result.succeeded
+            if converged:
+                _write_funnel_schedule(schedule_file, fractions)
+            return FunnelResult(fractions, converged, run, result)
+
+        if len(fractions) >= max_steps:
+            LOG.warning(f'The static funnel of {acf_file.name} failed at its maximum of {max_steps} steps')
+            break
+
+        # Bisect the interval leading up to the failed step
+        previous = fractions[failed_step - 1] if failed_step > 0 else 0.0
+        LOG.info(f'Static step {failed_step + 1} of {len(fractions)} failed. '
+                 f'Adding a step at {(previous + fractions[failed_step]) / 2:.4f}')
+        fractions = fractions[:failed_step] + [(previous + fractions[failed_step]) / 2] + fractions[failed_step:]
+
+    return FunnelResult(fractions, False, run, result)
+
+
+def _get_funnel_key(acf_file: Path, params: dict) -> str:
+    """Returns a hash of the model of `acf_file` and the funnel parameters"""
+    model_file = get_model_file(acf_file)
+    files = [model_file, *(get_dataset_dependencies(model_file) if model_file.is_file() else [])]
+    return hash_files(files, json.dumps(params, sort_keys=True))
+
+
+def _read_funnel_schedule(schedule_file: Path) -> Union[List[float], None]:
+    try:
+        return json.loads(schedule_file.read_text())['fractions']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _write_funnel_schedule(schedule_file: Path, fractions: List[float]):
+    schedule_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = schedule_file.with_name(f'tmp_{os.getpid()}_{schedule_file.name}')
+    tmp_file.write_text(json.dumps({'fractions': fractions}))
+    os.replace(tmp_file, schedule_file)
+
+
 def write_simulation_files(sim: Simulation,
                            file_prefix: str,
                            working_dir: Path = None,
                            aux_files: List[Path] = None,
                            write_cmd=False,
-                           write_bin=False):
+                           write_bin=False,
+                           scratch=False) -> Union[Path, None]:
+    """Writes the solver input files (.adm, .acf, ...) of a simulation.
 
-    if aux_files is not None and working_dir is not None:
-        for aux_file in aux_files:
+    Parameters
+    ----------
+    sim : Simulation
+        The simulation to write files for
+    file_prefix : str
+        The prefix for the simulation files
+    working_dir : Path, optional
+        Directory to move the files to, by default None (the files are left in the current
+        working directory)
+    aux_files : List[Path], optional
+        Auxiliary files (shells, splines, etc.) needed by the dataset, by default None
+    write_cmd : bool, optional
+        Whether to write a .cmd file of the current model (for reference only), by default False
+    write_bin : bool, optional
+        Whether to write a .bin file of the current model (for reference only), by default False
+    scratch : bool, optional
+        If True, the files are written to a private scratch directory which is then renamed to
+        `working_dir / file_prefix`, and `aux_files` are hard linked (or reflinked) instead of
+        copied. This does not scan the current working directory and is safe when several jobs
+        write files at the same time. By default False
+
+    Returns
+    -------
+    Path or None
+        The job directory if `scratch` is True, otherwise None
+    """
+    if scratch:
+        return _write_simulation_files_to_job_dir(sim,
+                                                  file_prefix,
+                                                  working_dir,
+                                                  aux_files,
+                                                  write_cmd=write_cmd,
+                                                  write_bin=write_bin)
+
+    if working_dir is not None:
+        working_dir = Path(working_dir)
+        for aux_file in aux_files or []:
             shutil.copy(aux_file, working_dir)
 
         current_files = {f: os.stat(f).st_mtime for f in Path().iterdir()}
@@ -102,50 +283,122 @@ def write_simulation_files(sim: Simulation,
             shutil.move(file.name, working_dir)
 
 
-def solve(acf_file: Path, wait=False, use_adams_car=False) -> subprocess.Popen:
-    """Runs Adams Solver to solve the model specified in `acf_file`
+def _write_simulation_files_to_job_dir(sim: Simulation,
+                                       file_prefix: str,
+                                       working_dir: Path = None,
+                                       aux_files: List[Path] = None,
+                                       write_cmd=False,
+                                       write_bin=False) -> Path:
+    """Writes the simulation files to a scratch directory and renames it to
+    `working_dir / file_prefix`. See `write_simulation_files`."""
+    working_dir = Path(working_dir if working_dir is not None else Path.cwd()).absolute()
+    working_dir.mkdir(parents=True, exist_ok=True)
+    job_dir = working_dir / file_prefix
+
+    # The scratch directory is in `working_dir` so that the final rename is atomic
+    scratch_dir = Path(mkdtemp(prefix=f'.{file_prefix}_', dir=working_dir))
+    try:
+        prefix = scratch_dir / file_prefix
+
+        if write_cmd:
+            # Write the .cmd file. (NOTE: This file is for reference only)
+            Adams.write_command_file(file_name=f'{prefix}_.cmd', model=sim.parent)
+
+        if write_bin:
+            write_bin_file(filename=f'{prefix}.bin', entity=sim.parent)
+
+        # Write the analysis files
+        with temp_sim_prefs(solver_preference='write_files_only', file_prefix=str(prefix)):
+            sim.simulate()
+
+        # Make the paths in the .acf relative so that it still works after the rename
+        acf_file = prefix.with_name(f'{file_prefix}.acf')
+        if acf_file.exists():
+            lines = acf_file.read_text().splitlines()
+            acf_file.write_text(patch_acf('\n'.join(lines),
+                                          model_file=_basename(lines[0]) if lines else None,
+                                          output_prefix=_basename(lines[1]) if len(lines) > 1 else None))
+
+        for aux_file in aux_files or []:
+            link_or_copy(aux_file, scratch_dir / Path(aux_file).name)
+
+        # Swap in the new job directory
+        old_dir = None
+        if job_dir.exists():
+            old_dir = Path(mkdtemp(prefix=f'.{file_prefix}_old_', dir=working_dir))
+            os.replace(job_dir, old_dir / file_prefix)
+        os.replace(scratch_dir, job_dir)
+
+    except BaseException:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+        raise
+
+    if old_dir is not None:
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    return job_dir
+
+
+def _basename(path: str) -> str:
+    return path.strip().replace('\\', '/').split('/')[-1]
+
+
+async def submit_async(sim: Simulation,
+                       file_prefix: str,
+                       use_adams_car=False,
+                       write_cmd=False,
+                       write_bin=False,
+                       callback: Callable = None,
+                       msg_callback: Callable[[str], None] = None,
+                       working_dir: Path = None,
+                       scratch=False) -> JobResult:
+    """Asynchronous version of `submit`. Writes the simulation files, then awaits an external
+    solver run.
+
+    Note
+    ----
+    The simulation files are written before the first `await`, using the Adams View API. This
+    coroutine must therefore run on an event loop in the thread that runs Adams View.
 
     Parameters
     ----------
-    acf_file : str
-        Path to an Adams Command (.acf) File
-    wait : bool, optional
-        Whether to wait for the simulation to complete, by default False
+    sim : Simulation
+        The simulation to submit
+    file_prefix : str
+        The prefix for the simulation files
     use_adams_car : bool, optional
         Whether to use Adams/Car to solve the simulation, by default False
+    write_cmd : bool, optional
+        Whether to write a .cmd file of the current model (for reference only), by default False
+    write_bin : bool, optional
+        Whether to write a .bin file of the current model (for reference only), by default False
+    callback : Callable, optional
+        A function to run before the simulation is submitted, by default None
+    msg_callback : Callable[[str], None], optional
+        Called with each new line written to the .msg file while the solver runs, by default None
+    working_dir : Path, optional
+        Directory to write the simulation files to, by default the current working directory
+    scratch : bool, optional
+        Whether to write the files to an isolated job directory (`working_dir / file_prefix`). See
+        `write_simulation_files`. By default False
 
     Returns
     -------
-    subprocess.Popen
-        The process running the Adams Solver
+    JobResult
+        Return code, wall time and output files of the run
     """
-    acf_file = Path(acf_file).absolute()
-    cwd = str(acf_file.parent)
-    mdi_cmd = Path(os.environ['TOPDIR']) / 'common' / 'mdi.bat'
-
-    if platform.system() == 'Windows':
-        startupinfo = subprocess.STARTUPINFO()
-        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-
-        if use_adams_car is False:
-            command = f'"{mdi_cmd}" ru-s "{acf_file.name}"'
-        else:
-            command = f'"{mdi_cmd}" acar ru-solver "{acf_file.name}"'
-
-        proc = subprocess.Popen(command, cwd=cwd, startupinfo=startupinfo)
+    job_dir = write_simulation_files(sim,
+                                     file_prefix,
+                                     working_dir=working_dir,
+                                     write_cmd=write_cmd,
+                                     write_bin=write_bin,
+                                     scratch=scratch)
+    acf_file = (job_dir or Path(working_dir or Path.cwd()).absolute()) / f'{file_prefix}.acf'
 
-    else:
-        if use_adams_car is False:
-            command = [mdi_cmd, '-c', 'ru-standard', 'i', acf_file.name, 'exit']
-        else:
-            command = [mdi_cmd, '-c', 'acar', 'ru-solver', 'i', acf_file.name, 'exit']
-
-        proc = subprocess.Popen(command, cwd=cwd)
-
-    if wait:
-        proc.wait()
+    if callback is not None:
+        callback()
 
-    return proc
+    return await solve_async(acf_file, use_adams_car=use_adams_car, msg_callback=msg_callback)
 
 
 def submit(sim: Simulation,
@@ -155,7 +408,11 @@ def submit(sim: Simulation,
            write_cmd=False,
            write_bin=False,
            just_write_files=False,
-           callback: Callable = None):
+           callback: Callable = None,
+           working_dir: Path = None,
+           scratch=False,
+           cache=False,
+           queue: Union[JobQueue, Path] = None):
     """Run a simulation externally and import results on completion.
 
     Parameters
@@ -176,22 +433,43 @@ def submit(sim: Simulation,
         Whether to just write the simulation files and not run the simulation, by default False
     callback : Callable, optional
         A function to run before the simulation is submitted, by default None
+    working_dir : Path, optional
+        Directory to write the simulation files to, by default the current working directory
+    scratch : bool, optional
+        Whether to write the files to an isolated job directory (`working_dir / file_prefix`). See
+        `write_simulation_files`. By default False
+    cache : bool, optional
+        Whether to restore the results from the result cache if the simulation files match a
+        previous run, and to store the results of this run. See `solve`. By default False
+    queue : Union[JobQueue, Path], optional
+        If given, the simulation is queued to be solved by an `aviewpy.worker` instead of being
+        solved locally. `working_dir` should be on the filesystem shared with the workers. By
+        default None
+
     Returns
     -------
-    subprocess.Popen
-        The process running the Adams Solver
+    subprocess.Popen, CachedProcess or str
+        The process running the Adams Solver, a `CachedProcess` if the results were restored
+        from the cache, or the job id if the simulation was queued
     """
-    acf_file = Path.cwd() / f'{file_prefix}.acf'
-
-    write_simulation_files(sim, file_prefix, write_cmd=write_cmd, write_bin=write_bin)
+    job_dir = write_simulation_files(sim,
+                                     file_prefix,
+                                     working_dir=working_dir,
+                                     write_cmd=write_cmd,
+                                     write_bin=write_bin,
+                                     scratch=scratch)
+    acf_file = (job_dir or Path(working_dir or Path.cwd()).absolute()) / f'{file_prefix}.acf'
 
     if callback is not None:
         callback()
 
-    if not just_write_files:
-        proc = solve(acf_file, wait=wait, use_adams_car=use_adams_car)
-    else:
+    if just_write_files:
         proc = None
+    elif queue is not None:
+        queue = queue if isinstance(queue, JobQueue) else JobQueue(queue)
+        proc = queue.put(acf_file, use_adams_car=use_adams_car)
+    else:
+        proc = solve(acf_file, wait=wait, use_adams_car=use_adams_car, cache=cache)
 
     return proc
 
@@ -222,13 +500,14 @@ def temp_sim_prefs(**kwargs):
     ```
     """
     current_settings = {}
+    cmds = []
     for key, value in kwargs.items():
         if key == 'solver_preference':
             current_settings[key] = SIM_PREFERNCES[Adams.evaluate_exp('.sim_preferences.solver_preference')]
         elif key == 'file_prefix':
             file_prefix = Adams.evaluate_exp('.sim_preferences.file_prefix')
-            current_settings[key] = '"{}"'.format(Path(file_prefix).as_posix().replace('/', r'\\'))
-            value = '"{}"'.format(Path(value).as_posix().replace('/', r'\\'))
+            current_settings[key] = '"{}"'.format(_prefix_path(file_prefix))
+            value = '"{}"'.format(_prefix_path(value))
         else:
             current_settings[key] = Adams.evaluate_exp(f'.sim_preferences.{key}')
 
@@ -236,16 +515,25 @@ def temp_sim_prefs(**kwargs):
         if isinstance(value, bool):
             value = 'yes' if value else 'no'
 
-        cmd = f'simulation set {key} = {value}'
-        LOG.debug(f'Running command: {cmd}')
-        Adams.execute_cmd(cmd)
+        cmds.append(f'simulation set {key} = {value}')
+
+    LOG.debug(f'Running commands: {cmds}')
+    execute_cmds(cmds)
 
     yield
 
-    for key, value in current_settings.items():
-        cmd = f'simulation set {key} = {value}'
-        LOG.debug(f'Running command: {cmd}')
-        Adams.execute_cmd(cmd)
+    cmds = [f'simulation set {key} = {value}' for key, value in current_settings.items()]
+    LOG.debug(f'Running commands: {cmds}')
+    execute_cmds(cmds)
+
+
+def _prefix_path(file_prefix: str) -> str:
+    """Formats a file prefix for a `simulation set file_prefix` command"""
+    if not file_prefix:
+        return ''
+    if platform.system() == 'Windows':
+        return Path(file_prefix).as_posix().replace('/', r'\\')
+    return Path(file_prefix).as_posix()
 
 
 def solve_internal(sim: Simulation, reset=False):
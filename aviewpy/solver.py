@@ -0,0 +1,688 @@
+"""Run Adams Solver on Adams Command (.acf) files outside of Adams View.
+
+This module does not use the Adams View API, so it can be used from any python environment (e.g.
+by `aviewpy.worker` on a compute node).
+"""
+import asyncio
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from tempfile import mkdtemp
+from typing import Callable, Iterable, List, Union
+
+from .files.acf_text import get_model_file, get_output_prefix
+from .files.adm_text import get_dataset_dependencies
+from .utils.cache import CACHE_DIR, evict_lru, hash_files, link_or_copy, touch
+from .utils.process import (ProcessMonitor, get_process_tree_info, terminate_process_tree, thread_affinity,
+                            thread_env)
+
+OUTPUT_EXTS = ['.res', '.msg', '.req', '.out', '.gra']
+MSG_POLL_INTERVAL = 1.0
+WATCHDOG_POLL_INTERVAL = 5.0
+WATCHDOG_EXTS = ['.msg', '.out']
+"""Output files whose growth shows that a solver is making progress"""
+
+RESULT_CACHE_DIR = CACHE_DIR / 'results'
+RESULT_CACHE_MAX_SIZE = 20 * 2**30
+"""Maximum total size of the result cache in bytes"""
+
+LOG = logging.getLogger(__name__)
+
+
+class JobResult():
+    """Result of a solver job
+
+    Attributes
+    ----------
+    acf_file : Path
+        The Adams Command (.acf) file that was solved
+    returncode : int
+        Return code of the solver process (None if the job timed out)
+    wall_time : float
+        Wall clock time of the last attempt in seconds
+    files : List[Path]
+        Output files written by the solver
+    attempts : int
+        Number of times the job was run
+    timed_out : bool
+        Whether the last attempt was killed because it exceeded its timeout
+    timeout_reason : str
+        'wall_time' if the last attempt exceeded its wall clock limit, 'stalled' if it stopped
+        making progress, otherwise None. See `Watchdog`.
+    """
+
+    def __init__(self,
+                 acf_file: Path,
+                 returncode: int,
+                 wall_time: float,
+                 files: List[Path],
+                 attempts: int = 1,
+                 timed_out=False,
+                 timeout_reason: str = None):
+        self.acf_file = acf_file
+        self.returncode = returncode
+        self.wall_time = wall_time
+        self.files = files
+        self.attempts = attempts
+        self.timed_out = timed_out or timeout_reason is not None
+        self.timeout_reason = timeout_reason
+
+    @property
+    def succeeded(self) -> bool:
+        return self.returncode == 0 and not self.timed_out
+
+    def get_file(self, ext: str) -> Union[Path, None]:
+        """Returns the output file with extension `ext` (e.g. '.res'), or None"""
+        return next((f for f in self.files if f.suffix.lower() == ext.lower()), None)
+
+    @property
+    def res_file(self) -> Union[Path, None]:
+        return self.get_file('.res')
+
+    @property
+    def msg_file(self) -> Union[Path, None]:
+        return self.get_file('.msg')
+
+    @property
+    def out_file(self) -> Union[Path, None]:
+        return self.get_file('.out')
+
+    def __repr__(self):
+        return (f'{type(self).__name__}({self.acf_file.name!r}, returncode={self.returncode}, '
+                f'wall_time={self.wall_time:.1f}, attempts={self.attempts})')
+
+
+def get_output_files(acf_file: Path, since: float = None) -> List[Path]:
+    """Returns the solver output files of `acf_file`
+
+    Parameters
+    ----------
+    acf_file : Path
+        Path to an Adams Command (.acf) File
+    since : float, optional
+        Only return files modified at or after this time, by default None
+
+    Returns
+    -------
+    List[Path]
+        Output files
+    """
+    prefix = Path(acf_file).parent / get_output_prefix(acf_file)
+    files = []
+    for ext in OUTPUT_EXTS:
+        file = prefix.with_name(prefix.name + ext)
+        if file.exists() and (since is None or file.stat().st_mtime >= since - 1):
+            files.append(file)
+
+    return files
+
+
+def solve(acf_file: Path,
+          wait=False,
+          use_adams_car=False,
+          cache=False,
+          cache_dir: Path = None,
+          max_cache_size: int = RESULT_CACHE_MAX_SIZE,
+          telemetry=False,
+          telemetry_interval: float = 1.0,
+          cpus: List[int] = None,
+          threads: int = None,
+          wall_time: float = None,
+          stall_time: float = None) -> Union[subprocess.Popen, 'CachedProcess']:
+    """Runs Adams Solver to solve the model specified in `acf_file`
+
+    Parameters
+    ----------
+    acf_file : str
+        Path to an Adams Command (.acf) File
+    wait : bool, optional
+        Whether to wait for the simulation to complete, by default False
+    use_adams_car : bool, optional
+        Whether to use Adams/Car to solve the simulation, by default False
+    cache : bool, optional
+        If True, the output files (.res, .msg, .req, ...) of successful runs are stored in a
+        result cache. If the .acf, its model file and the files they reference match a stored
+        run, the outputs are restored (hard linked) from the cache instead of running the solver.
+        By default False
+    cache_dir : Path, optional
+        Directory to store the cached results in, by default `RESULT_CACHE_DIR`
+    max_cache_size : int, optional
+        Maximum total size of the cache in bytes, by default `RESULT_CACHE_MAX_SIZE`. The least
+        recently used results are deleted when the cache grows beyond this size.
+    telemetry : bool, optional
+        If True, the CPU time, memory and I/O of the solver processes are sampled (Linux only) and
+        written to `<output prefix>_telemetry.json` when the run finishes. The `ProcessMonitor`
+        is available as the `telemetry` attribute of the returned process. By default False
+    telemetry_interval : float, optional
+        Time between telemetry samples in seconds, by default 1.0
+    cpus : List[int], optional
+        Cpus to restrict the solver processes to (Linux only), by default None (no restriction).
+        See `utils.process.CpuAllocator` for handing out disjoint sets to concurrent runs.
+    threads : int, optional
+        Number of threads the solver may use. Sets the `utils.process.THREAD_ENV_VARS` of the
+        solver process. By default the number of `cpus` if given, otherwise they are not set.
+    wall_time : float, optional
+        Wall clock limit in seconds, by default None (no limit)
+    stall_time : float, optional
+        Time in seconds after which the solver is considered hung if its .msg and .out files
+        have not grown, by default None (no limit). If either limit is given, a `Watchdog`
+        terminates the solver when it is hit and is available as the `watchdog` attribute of the
+        returned process.
+
+    Returns
+    -------
+    subprocess.Popen or CachedProcess
+        The process running the Adams Solver, or a `CachedProcess` if the results were restored
+        from the cache
+    """
+    acf_file = Path(acf_file).absolute()
+    _unlink_linked_outputs(acf_file)
+
+    if cache:
+        cache_dir = Path(cache_dir) if cache_dir is not None else RESULT_CACHE_DIR
+        key = get_result_key(acf_file, use_adams_car)
+        files = restore_results(key, acf_file, cache_dir)
+        if files is not None:
+            LOG.info(f'Restored the results of {acf_file.name} from the result cache')
+            return CachedProcess(acf_file, files)
+
+    start = time.time()
+    command, kwargs = _solver_command(acf_file, use_adams_car)
+    if threads is not None or cpus is not None:
+        kwargs['env'] = thread_env(threads or len(cpus))
+
+    with thread_affinity(cpus) if cpus is not None else nullcontext():
+        proc = subprocess.Popen(command, **kwargs)
+
+    if telemetry:
+        proc.telemetry = ProcessMonitor(proc,
+                                        interval=telemetry_interval,
+                                        output_file=get_telemetry_file(acf_file))
+
+    if wall_time is not None or stall_time is not None:
+        proc.watchdog = Watchdog(proc, acf_file, wall_time=wall_time, stall_time=stall_time)
+
+    if cache:
+        args = (proc, key, acf_file, cache_dir, max_cache_size, start)
+        if wait:
+            _store_results_on_exit(*args)
+        else:
+            threading.Thread(target=_store_results_on_exit, args=args, daemon=True).start()
+
+    if wait:
+        proc.wait()
+        for monitor in ['telemetry', 'watchdog']:
+            if hasattr(proc, monitor):
+                getattr(proc, monitor).join()
+
+    return proc
+
+
+class Watchdog():
+    """Terminates a solver process that exceeds a wall clock limit or stops making progress.
+
+    Progress is measured by the growth of the .msg and .out files. When a limit is hit, the tail
+    of those files and the state of the process tree are written to
+    `<output prefix>_watchdog.json`, then the process tree is asked to exit and killed after
+    `grace_period`.
+
+    Parameters
+    ----------
+    proc : subprocess.Popen
+        The solver process
+    acf_file : Path
+        The Adams Command (.acf) file being solved
+    wall_time : float, optional
+        Wall clock limit in seconds, by default None (no limit)
+    stall_time : float, optional
+        Time in seconds without growth of the .msg and .out files after which the solver is
+        considered hung, by default None (no limit)
+    poll_interval : float, optional
+        Time between checks in seconds, by default `WATCHDOG_POLL_INTERVAL`
+    grace_period : float, optional
+        Time the processes are given to exit before they are killed in seconds, by default 10.0
+
+    Attributes
+    ----------
+    reason : str
+        'wall_time' or 'stalled' if the process was terminated, otherwise None
+    diagnostics : dict
+        Diagnostic information gathered before the process was terminated
+    """
+    tail_lines = 50
+
+    def __init__(self,
+                 proc: subprocess.Popen,
+                 acf_file: Path,
+                 wall_time: float = None,
+                 stall_time: float = None,
+                 poll_interval: float = None,
+                 grace_period: float = 10.0):
+        self.proc = proc
+        self.acf_file = Path(acf_file)
+        self.wall_time = wall_time
+        self.stall_time = stall_time
+        self.poll_interval = poll_interval if poll_interval is not None else WATCHDOG_POLL_INTERVAL
+        self.grace_period = grace_period
+        self.reason: str = None
+        self.diagnostics: dict = None
+        prefix = self.acf_file.parent / get_output_prefix(self.acf_file)
+        self.files = [prefix.with_name(prefix.name + ext) for ext in WATCHDOG_EXTS]
+        self.diagnostics_file = prefix.with_name(f'{prefix.name}_watchdog.json')
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def join(self, timeout: float = None):
+        """Waits for the process to exit (or be terminated)"""
+        self._thread.join(timeout)
+
+    def _run(self):
+        start = last_progress = time.monotonic()
+        sizes = None
+        while True:
+            try:
+                self.proc.wait(timeout=self.poll_interval)
+                return
+            except subprocess.TimeoutExpired:
+                pass
+
+            now = time.monotonic()
+            new_sizes = [f.stat().st_size if f.exists() else 0 for f in self.files]
+            if new_sizes != sizes:
+                sizes = new_sizes
+                last_progress = now
+
+            if self.wall_time is not None and now - start > self.wall_time:
+                self.reason = 'wall_time'
+            elif self.stall_time is not None and now - last_progress > self.stall_time:
+                self.reason = 'stalled'
+            else:
+                continue
+
+            LOG.warning(f'Terminating the solver of {self.acf_file.name} ({self.reason}) after {now - start:.0f}s')
+            self.diagnostics = {'acf_file': str(self.acf_file),
+                                'reason': self.reason,
+                                'elapsed': now - start,
+                                'since_progress': now - last_progress,
+                                'processes': get_process_tree_info(self.proc.pid),
+                                'tails': {f.name: _tail_lines(f, self.tail_lines) for f in self.files}}
+            try:
+                self.diagnostics_file.write_text(json.dumps(self.diagnostics, indent=1))
+            except OSError:
+                LOG.warning(f'Failed to write {self.diagnostics_file}', exc_info=True)
+
+            terminate_process_tree(self.proc, self.grace_period)
+            return
+
+
+def _tail_lines(file: Path, count: int) -> List[str]:
+    """Returns the last `count` lines of `file`"""
+    try:
+        with file.open('rb') as fid:
+            fid.seek(0, os.SEEK_END)
+            fid.seek(max(0, fid.tell() - 200 * count))
+            return fid.read().decode(errors='ignore').splitlines()[-count:]
+    except OSError:
+        return []
+
+
+def get_telemetry_file(acf_file: Path) -> Path:
+    """Returns the file that `solve` writes the telemetry of `acf_file` to"""
+    prefix = Path(acf_file).parent / get_output_prefix(acf_file)
+    return prefix.with_name(f'{prefix.name}_telemetry.json')
+
+
+class CachedProcess():
+    """Stands in for the `subprocess.Popen` returned by `solve` when the results of a run were
+    restored from the result cache. It behaves like a process that has already exited with a
+    return code of 0.
+
+    Attributes
+    ----------
+    args : Path
+        The Adams Command (.acf) file
+    files : List[Path]
+        The restored output files
+    """
+    pid = None
+    returncode = 0
+
+    def __init__(self, acf_file: Path, files: List[Path]):
+        self.args = acf_file
+        self.files = files
+
+    def poll(self) -> int:
+        return self.returncode
+
+    def wait(self, timeout: float = None) -> int:  # pylint: disable=unused-argument
+        return self.returncode
+
+    def communicate(self, input=None, timeout=None):  # pylint: disable=redefined-builtin,unused-argument
+        return None, None
+
+    def send_signal(self, signal):
+        pass
+
+    def terminate(self):
+        pass
+
+    def kill(self):
+        pass
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.args.name!r})'
+
+
+def get_result_key(acf_file: Path, use_adams_car=False) -> str:
+    """Returns the result cache key of `acf_file`. This is a hash of the contents of the .acf
+    file, its model file, the files they reference and the solver installation.
+
+    Parameters
+    ----------
+    acf_file : Path
+        Path to an Adams Command (.acf) File
+    use_adams_car : bool, optional
+        Whether the simulation is solved with Adams/Car, by default False
+
+    Returns
+    -------
+    str
+        Hex digest
+    """
+    acf_file = Path(acf_file)
+    model_file = get_model_file(acf_file)
+    files = [acf_file, model_file, *get_dataset_dependencies(acf_file)]
+    if model_file.is_file():
+        files += get_dataset_dependencies(model_file)
+
+    return hash_files(files,
+                      os.environ.get('TOPDIR', ''),
+                      os.environ.get('VERSION', ''),
+                      'acar' if use_adams_car else 'solver')
+
+
+def restore_results(key: str, acf_file: Path, cache_dir: Path = None) -> Union[List[Path], None]:
+    """Hard links the cached output files with `key` next to `acf_file`
+
+    Parameters
+    ----------
+    key : str
+        Result cache key (see `get_result_key`)
+    acf_file : Path
+        Path to an Adams Command (.acf) File
+    cache_dir : Path, optional
+        Result cache directory, by default `RESULT_CACHE_DIR`
+
+    Returns
+    -------
+    List[Path] or None
+        The restored output files, or None if there is no cached result
+    """
+    entry = (Path(cache_dir) if cache_dir is not None else RESULT_CACHE_DIR) / key
+    if not entry.is_dir():
+        return None
+
+    prefix = Path(acf_file).parent / get_output_prefix(acf_file)
+    files = []
+    try:
+        for cached_file in sorted(entry.iterdir()):
+            file = prefix.with_name(prefix.name + cached_file.suffix)
+            link_or_copy(cached_file, file)
+
+            # Restored files look freshly written (and the cache entry recently used)
+            touch(file)
+            files.append(file)
+    except OSError:
+        LOG.warning(f'Failed to restore the cached results of {Path(acf_file).name}', exc_info=True)
+        return None
+
+    if not files:
+        return None
+
+    touch(entry)
+    return files
+
+
+def store_results(key: str,
+                  files: List[Path],
+                  cache_dir: Path = None,
+                  max_cache_size: int = RESULT_CACHE_MAX_SIZE):
+    """Stores the output files of a run in the result cache with `key`
+
+    Parameters
+    ----------
+    key : str
+        Result cache key (see `get_result_key`)
+    files : List[Path]
+        Output files of the run
+    cache_dir : Path, optional
+        Result cache directory, by default `RESULT_CACHE_DIR`
+    max_cache_size : int, optional
+        Maximum total size of the cache in bytes, by default `RESULT_CACHE_MAX_SIZE`
+    """
+    if not files:
+        return
+
+    cache_dir = Path(cache_dir) if cache_dir is not None else RESULT_CACHE_DIR
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    # Fill a temporary directory and rename it so that partial entries are never visible
+    tmp_dir = Path(mkdtemp(prefix=f'tmp_{key}_', dir=cache_dir))
+    try:
+        for file in files:
+            link_or_copy(file, tmp_dir / f'result{file.suffix.lower()}')
+        os.replace(tmp_dir, cache_dir / key)
+    except OSError:
+
+        # Another process stored the same result first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    evict_lru(cache_dir, max_cache_size, pattern='[0-9a-f]*')
+
+
+def _store_results_on_exit(proc: subprocess.Popen,
+                           key: str,
+                           acf_file: Path,
+                           cache_dir: Path,
+                           max_cache_size: int,
+                           start: float):
+    """Waits for `proc` and stores its output files if it succeeded"""
+    if proc.wait() != 0:
+        return
+
+    try:
+        store_results(key, get_output_files(acf_file, since=start), cache_dir, max_cache_size)
+    except OSError:
+        LOG.warning(f'Failed to store the results of {acf_file.name} in the result cache', exc_info=True)
+
+
+def _unlink_linked_outputs(acf_file: Path):
+    """Deletes output files of `acf_file` that are hard links (e.g. restored from the result cache)
+    so that the solver writes new files instead of overwriting the cached ones"""
+    try:
+        prefix = acf_file.parent / get_output_prefix(acf_file)
+    except OSError:
+        return
+
+    for ext in OUTPUT_EXTS:
+        file = prefix.with_name(prefix.name + ext)
+        try:
+            if file.stat().st_nlink > 1:
+                file.unlink()
+        except OSError:
+            pass
+
+
+def _solver_command(acf_file: Path, use_adams_car=False):
+    """Returns the command and `Popen` keyword arguments used to solve `acf_file`"""
+    cwd = str(acf_file.parent)
+    mdi_cmd = Path(os.environ['TOPDIR']) / 'common' / 'mdi.bat'
+
+    if platform.system() == 'Windows':
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+
+        if use_adams_car is False:
+            command = f'"{mdi_cmd}" ru-s "{acf_file.name}"'
+        else:
+            command = f'"{mdi_cmd}" acar ru-solver "{acf_file.name}"'
+
+        kwargs = {'cwd': cwd, 'startupinfo': startupinfo}
+
+    else:
+        if use_adams_car is False:
+            command = [mdi_cmd, '-c', 'ru-standard', 'i', acf_file.name, 'exit']
+        else:
+            command = [mdi_cmd, '-c', 'acar', 'ru-solver', 'i', acf_file.name, 'exit']
+
+        kwargs = {'cwd': cwd}
+
+    return command, kwargs
+
+
+async def solve_async(acf_file: Path,
+                      use_adams_car=False,
+                      msg_callback: Callable[[str], None] = None) -> JobResult:
+    """Runs Adams Solver on `acf_file` as an asyncio subprocess and waits for it to finish
+    without blocking the event loop.
+
+    Example
+    -------
+    >>> result = await solve_async('run_1.acf', msg_callback=print)
+    >>> result.res_file
+    WindowsPath('run_1.res')
+
+    Parameters
+    ----------
+    acf_file : Path
+        Path to an Adams Command (.acf) File
+    use_adams_car : bool, optional
+        Whether to use Adams/Car to solve the simulation, by default False
+    msg_callback : Callable[[str], None], optional
+        Called with each new line written to the .msg file while the solver runs, by default None
+
+    Returns
+    -------
+    JobResult
+        Return code, wall time and output files of the run
+    """
+    acf_file = Path(acf_file).absolute()
+    command, kwargs = _solver_command(acf_file, use_adams_car)
+
+    start = time.time()
+    if isinstance(command, str):
+        proc = await asyncio.create_subprocess_shell(command, **kwargs)
+    else:
+        proc = await asyncio.create_subprocess_exec(*command, **kwargs)
+
+    if msg_callback is not None:
+        msg_file = acf_file.parent / (get_output_prefix(acf_file) + '.msg')
+        tail = asyncio.ensure_future(_tail_file(msg_file, msg_callback, since=start))
+
+    try:
+        returncode = await proc.wait()
+    finally:
+        if msg_callback is not None:
+            tail.cancel()
+            try:
+                await tail
+            except asyncio.CancelledError:
+                pass
+
+    return JobResult(acf_file, returncode, time.time() - start, get_output_files(acf_file, since=start))
+
+
+async def gather_solves(acf_files: Iterable[Path],
+                        max_concurrent: int = None,
+                        **kwargs) -> List[JobResult]:
+    """Solves several Adams Command (.acf) files with at most `max_concurrent` running at once.
+
+    Parameters
+    ----------
+    acf_files : Iterable[Path]
+        Adams Command (.acf) files to solve
+    max_concurrent : int, optional
+        Maximum number of concurrent solver processes, by default the number of cores
+    **kwargs
+        Passed to `solve_async`
+
+    Returns
+    -------
+    List[JobResult]
+        Results in the same order as `acf_files`
+    """
+    semaphore = asyncio.Semaphore(max_concurrent or os.cpu_count() or 1)
+
+    async def _solve(acf_file):
+        async with semaphore:
+            return await solve_async(acf_file, **kwargs)
+
+    return list(await asyncio.gather(*(_solve(f) for f in acf_files)))
+
+
+_BACKGROUND_LOOP: asyncio.AbstractEventLoop = None
+_BACKGROUND_LOCK = threading.Lock()
+
+
+def run_in_background(coro):
+    """Runs a coroutine on an event loop in a background thread so that Adams View stays
+    responsive. Do not pass coroutines that call the Adams View API (e.g. `submit_async`).
+
+    Example
+    -------
+    >>> future = run_in_background(gather_solves(acf_files, max_concurrent=4))
+    >>> results = future.result()  # Blocks until all runs are done
+
+    Returns
+    -------
+    concurrent.futures.Future
+        Future resolving to the result of `coro`
+    """
+    global _BACKGROUND_LOOP
+    with _BACKGROUND_LOCK:
+        if _BACKGROUND_LOOP is None:
+            _BACKGROUND_LOOP = asyncio.new_event_loop()
+            threading.Thread(target=_BACKGROUND_LOOP.run_forever, daemon=True).start()
+
+    return asyncio.run_coroutine_threadsafe(coro, _BACKGROUND_LOOP)
+
+
+async def _tail_file(file: Path, callback: Callable[[str], None], since: float = None):
+    """Calls `callback` with each line appended to `file` until cancelled"""
+    position = 0
+    partial = ''
+
+    def _read_new():
+        nonlocal position, partial
+        try:
+            if since is not None and file.stat().st_mtime < since - 1:
+                return
+            with file.open('r', errors='ignore') as fid:
+                fid.seek(position)
+                text = fid.read()
+                position = fid.tell()
+        except OSError:
+            return
+
+        *lines, partial = (partial + text).split('\n')
+        for line in lines:
+            callback(line)
+
+    try:
+        while True:
+            await asyncio.sleep(MSG_POLL_INTERVAL)
+            _read_new()
+    except asyncio.CancelledError:
+
+        # Pass on anything written since the last poll
+        _read_new()
+        if partial:
+            callback(partial)
+        raise
@@ -0,0 +1,197 @@
+"""Parameter sweeps that patch a single exported dataset instead of re-exporting from Adams View.
+
+The base .adm and .acf files are written once. Each variant is generated by replacing argument
+values in their text, and all variants are solved in parallel by a `JobScheduler`.
+
+Example
+-------
+>>> sweep = ParameterSweep.from_simulation(sim, 'base', working_dir=Path('doe'))
+>>> sweep.add_grid('run', {('PART', 'PART_2', 'MASS'): [1.0, 2.0, 3.0],
+...                        ('SFORCE', 'SFORCE_1', 'FUNCTION'): ['100', '200']})
+>>> futures = sweep.run(max_workers=8)
+>>> results = {name: future.result() for name, future in futures.items()}
+
+Note
+----
+Design variables are written to the dataset as literal values, so they are varied by patching
+the arguments of the statements they drive.
+"""
+from concurrent.futures import Future
+from itertools import product
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Tuple, Union
+
+from Simulation import Simulation  # type: ignore
+
+from .files.acf_text import patch_acf
+from .files.adm_text import AdmPatcher
+from .jobs import JobScheduler
+from .sim import write_simulation_files
+
+AdmKey = Tuple[str, Union[int, str], str]
+"""(statement type, adams id or Adams View name, argument) e.g. ('PART', 'PART_2', 'MASS')"""
+
+
+class Variant(NamedTuple):
+    name: str
+    adm: Dict[AdmKey, Any]
+    """New .adm argument values"""
+    acf: Dict[str, str]
+    """Solver commands to replace or insert in the .acf, keyed by command name"""
+
+
+class ParameterSweep():
+    """Generates and solves variants of a base Adams dataset.
+
+    Parameters
+    ----------
+    adm_file : Path
+        Base Adams Dataset (.adm) file
+    acf_file : Path
+        Base Adams Command (.acf) file
+    working_dir : Path, optional
+        Directory to write the variant files to, by default the directory of `adm_file`
+    """
+
+    def __init__(self, adm_file: Path, acf_file: Path, working_dir: Path = None):
+        self.adm_file = Path(adm_file)
+        self.acf_file = Path(acf_file)
+        self.working_dir = Path(working_dir) if working_dir is not None else self.adm_file.parent
+        self.patcher = AdmPatcher(self.adm_file.read_text())
+        self.acf_text = self.acf_file.read_text()
+        self.variants: Dict[str, Variant] = {}
+
+    @classmethod
+    def from_simulation(cls,
+                        sim: Simulation,
+                        file_prefix: str,
+                        working_dir: Path = None,
+                        aux_files: List[Path] = None):
+        """Writes the base simulation files once and returns a sweep of them.
+
+        Note
+        ----
+        The files are written in the current working directory and moved to `working_dir`, but
+        the files the dataset references are not. Relative `FILE=` references (e.g. of SPLINE or
+        GRAPHICS statements) are resolved against `working_dir` by the solver, so pass the
+        referenced files as `aux_files` to have them copied there (`get_dataset_dependencies` of
+        an existing dataset lists them).
+
+        Parameters
+        ----------
+        sim : Simulation
+            The simulation to sweep
+        file_prefix : str
+            The prefix for the base simulation files
+        working_dir : Path, optional
+            Directory to write the simulation files to, by default the current working directory
+        aux_files : List[Path], optional
+            Auxiliary files (shells, splines, etc.) needed by the dataset, which are copied to
+            `working_dir`, by default None
+        """
+        working_dir = Path(working_dir) if working_dir is not None else Path.cwd()
+        working_dir.mkdir(parents=True, exist_ok=True)
+        write_simulation_files(sim, file_prefix, working_dir=working_dir, aux_files=aux_files)
+
+        return cls(working_dir / f'{file_prefix}.adm', working_dir / f'{file_prefix}.acf', working_dir)
+
+    def add(self, name: str, adm: Dict[AdmKey, Any] = None, acf: Dict[str, str] = None) -> Variant:
+        """Adds a variant.
+
+        Parameters
+        ----------
+        name : str
+            Name of the variant. Used as the file prefix of its .adm, .acf and output files.
+        adm : Dict[AdmKey, Any], optional
+            New .adm argument values, by default None
+        acf : Dict[str, str], optional
+            Solver commands to replace or insert in the .acf, by default None
+        """
+        variant = Variant(name, adm or {}, acf or {})
+        self.variants[name] = variant
+        return variant
+
+    def add_grid(self,
+                 prefix: str,
+                 adm: Dict[AdmKey, List[Any]] = None,
+                 acf: Dict[str, List[str]] = None) -> List[Variant]:
+        """Adds a full factorial grid of variants named `{prefix}_{index:04d}`.
+
+        Parameters
+        ----------
+        prefix : str
+            Prefix of the variant names
+        adm : Dict[AdmKey, List[Any]], optional
+            Values to take for each .adm argument, by default None
+        acf : Dict[str, List[str]], optional
+            Commands to take for each solver command name, by default None
+        """
+        adm = adm or {}
+        acf = acf or {}
+        keys = [*adm, *acf]
+        variants = []
+        for idx, values in enumerate(product(*adm.values(), *acf.values())):
+            combo = dict(zip(keys, values))
+            variants.append(self.add(f'{prefix}_{idx:04d}',
+                                     adm={k: combo[k] for k in adm},
+                                     acf={k: combo[k] for k in acf}))
+
+        return variants
+
+    def write(self, names: List[str] = None) -> List[Path]:
+        """Writes the .adm and .acf files of the variants.
+
+        Parameters
+        ----------
+        names : List[str], optional
+            Names of the variants to write, by default all
+
+        Returns
+        -------
+        List[Path]
+            The .acf files of the written variants
+        """
+        self.working_dir.mkdir(parents=True, exist_ok=True)
+        acf_files = []
+        for variant in (self.variants[n] for n in (names if names is not None else self.variants)):
+            adm_file = self.working_dir / f'{variant.name}.adm'
+            acf_file = self.working_dir / f'{variant.name}.acf'
+            adm_file.write_text(self.patcher.patch(variant.adm))
+            acf_file.write_text(patch_acf(self.acf_text,
+                                          model_file=adm_file.name,
+                                          output_prefix=variant.name,
+                                          commands=variant.acf))
+            acf_files.append(acf_file)
+
+        return acf_files
+
+    def run(self,
+            scheduler: JobScheduler = None,
+            max_workers: int = None,
+            use_adams_car=False,
+            **kwargs) -> Dict[str, Future]:
+        """Writes all variants and submits them to a `JobScheduler`.
+
+        Parameters
+        ----------
+        scheduler : JobScheduler, optional
+            Scheduler to submit the variants to, by default a new one
+        max_workers : int, optional
+            Maximum number of concurrent solver processes if a new scheduler is created, by default
+            the number of cores
+        use_adams_car : bool, optional
+            Whether to use Adams/Car to solve the variants if a new scheduler is created, by
+            default False
+        **kwargs
+            Passed to `JobScheduler.submit` (e.g. `timeout`, `retries`)
+
+        Returns
+        -------
+        Dict[str, Future]
+            Futures resolving to a `JobResult`, keyed by variant name
+        """
+        if scheduler is None:
+            scheduler = JobScheduler(max_workers=max_workers, use_adams_car=use_adams_car)
+
+        acf_files = self.write()
+        return {acf_file.stem: scheduler.submit(acf_file, **kwargs) for acf_file in acf_files}
@@ -0,0 +1,183 @@
+"""Helpers for the content-addressed file caches used by aviewpy"""
+import hashlib
+import os
+import platform
+import shutil
+from pathlib import Path
+from typing import Iterable, List, Union
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+CACHE_DIR = Path(os.environ.get('AVIEWPY_CACHE_DIR', Path.home() / '.aviewpy' / 'cache'))
+"""Root directory of the shared aviewpy caches. Can be set with the `AVIEWPY_CACHE_DIR` environment
+variable."""
+
+HASH_CHUNK_SIZE = 1 << 20
+
+FICLONE = 0x40049409
+"""Linux ioctl request for cloning a file (reflink)"""
+
+
+def hash_file(filename: Union[Path, str]) -> str:
+    """Returns the sha256 hex digest of the contents of `filename`"""
+    digest = hashlib.sha256()
+    with Path(filename).open('rb') as fid:
+        for chunk in iter(lambda: fid.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def hash_files(files: Iterable[Union[Path, str]], *extra: str) -> str:
+    """Returns a sha256 hex digest of the contents of `files` and the strings in `extra`.
+
+    The digest depends on the order of `files` but not on their names or locations. Missing files
+    contribute their name so that creating them changes the digest.
+
+    Parameters
+    ----------
+    files : Iterable[Union[Path, str]]
+        Files to hash
+    *extra : str
+        Additional strings to include in the hash (e.g. a version)
+
+    Returns
+    -------
+    str
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    for text in extra:
+        digest.update(text.encode() + b'\0')
+
+    for filename in files:
+        if Path(filename).is_file():
+            digest.update(hash_file(filename).encode())
+        else:
+            digest.update(b'missing:' + str(filename).encode())
+        digest.update(b'\0')
+
+    return digest.hexdigest()
+
+
+def touch(filename: Union[Path, str]):
+    """Marks `filename` as recently used"""
+    try:
+        os.utime(filename)
+    except OSError:
+        pass
+
+
+def evict_lru(directory: Union[Path, str], max_size: int, pattern: str = '*') -> List[Path]:
+    """Deletes the least recently used entries matching `pattern` in `directory` until their total
+    size is at most `max_size` bytes. Entries are ordered by modification time, which is updated
+    by `touch` on each cache hit. An entry may be a file or a directory of files, which is deleted
+    as a whole.
+
+    Parameters
+    ----------
+    directory : Union[Path, str]
+        Cache directory
+    max_size : int
+        Maximum total size in bytes
+    pattern : str, optional
+        Glob pattern of the cache files, by default '*'
+
+    Returns
+    -------
+    List[Path]
+        The deleted files
+    """
+    entries = []
+    for file in Path(directory).glob(pattern):
+        try:
+            st = file.stat()
+        except OSError:
+            continue
+        if file.is_file():
+            entries.append((st.st_mtime, st.st_size, file))
+        elif file.is_dir():
+            entries.append((st.st_mtime, _dir_size(file), file))
+
+    total = sum(size for _, size, _ in entries)
+    deleted = []
+    for _, size, file in sorted(entries, key=lambda e: e[0]):
+        if total <= max_size:
+            break
+        try:
+            if file.is_dir():
+                shutil.rmtree(file)
+            else:
+                file.unlink()
+        except OSError:
+            continue
+        total -= size
+        deleted.append(file)
+
+    return deleted
+
+
+def _dir_size(directory: Path) -> int:
+    size = 0
+    for file in directory.rglob('*'):
+        try:
+            size += file.stat().st_size if file.is_file() else 0
+        except OSError:
+            pass
+    return size
+
+
+def link_or_copy(src: Union[Path, str], dst: Union[Path, str]) -> str:
+    """Makes `dst` a hard link to `src`. Falls back to a reflink (copy-on-write clone) if the files
+    are on different devices, and to a regular copy if neither is supported.
+
+    Note
+    ----
+    A hard link shares its contents with `src`, so `dst` should be treated as read only.
+
+    Parameters
+    ----------
+    src : Union[Path, str]
+        Source file
+    dst : Union[Path, str]
+        Destination file. Replaced if it exists.
+
+    Returns
+    -------
+    str
+        'link', 'reflink' or 'copy'
+    """
+    src, dst = Path(src), Path(dst)
+    if dst.exists() or dst.is_symlink():
+        dst.unlink()
+
+    try:
+        os.link(src, dst)
+        return 'link'
+    except OSError:
+        pass
+
+    if _reflink(src, dst):
+        return 'reflink'
+
+    shutil.copy2(src, dst)
+    return 'copy'
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    if fcntl is None or platform.system() != 'Linux':
+        return False
+
+    try:
+        with src.open('rb') as fid_src, dst.open('wb') as fid_dst:
+            fcntl.ioctl(fid_dst.fileno(), FICLONE, fid_src.fileno())
+    except OSError:
+        if dst.exists():
+            dst.unlink()
+        return False
+
+    shutil.copystat(src, dst)
+    return True
@@ -2,11 +2,13 @@ from collections import namedtuple
 from pathlib import Path
 from shutil import rmtree
 from tempfile import mkdtemp
-from typing import List
+from typing import Iterable, List
 
 import Adams  # type: ignore # noqa
-from aviewpy.objects import delete_objects, get_managers, get_object
+from aviewpy.commands import execute_cmds
+from aviewpy.objects import get_managers, get_objects
 from aviewpy.objects import get_parent_model
+from aviewpy.references import ReferenceGraph
 from aviewpy.ui.alerts import adams_errors_suppressed
 
 from DBAccess import SetValueFailed                                                                 # type: ignore # isort: skip # pylint: disable=wrong-import-order
@@ -16,123 +18,147 @@ from Object import ObjectBase as Object
 Property = namedtuple('Property', ['entity', 'name', 'value'])
 
 
-class Dereferencer():
-    def __init__(self, entity: Object):
-        self.entity = entity
+class MultiDereferencer():
+    """Temporarily removes all references to several entities of a model, e.g. to replace many
+    geometries at once.
+
+    `dereference` finds the referencing properties of all the entities in a single scan of the
+    model and points them at copies of the entities. Analyses with contact incidents that depend on
+    any of the entities are written to files and deleted, once each. `rereference` restores all the
+    references and analyses in a single pass.
+
+    Parameters
+    ----------
+    entities : List[Object]
+        Entities to dereference. They must all be in the same model.
+    """
+
+    def __init__(self, entities: List[Object]):
+        self.entities = list(entities)
         self.dep_props: List[Property] = []
-        self.mod: Model = get_parent_model(self.entity)
-        self.entity_copy: Object = None
+        self.mod: Model = get_parent_model(self.entities[0])
+        self.entity_copies: List[Object] = []
         self.files: List[Path] = []
         self.export_dir: Path = None
 
     def dereference(self):
-        """Removes all references to `self.entity`
+        """Removes all references to `self.entities`
 
         Note
         ----
         Only removes references from **direct** children of the model.
         """
-        self.entity_copy = self.entity.copy()
-        for manager in get_managers(self.mod):
-            for ent in manager.values():
-                ent: Object = ent
-                for prop_name in ent.properties:
-                    try:
-                        prop_val = getattr(ent, prop_name)
-                    except AttributeError:
-                        continue
-                    
-                    if isinstance(prop_val, Object) and prop_val == self.entity:
-
-                        # If the property is a **sigleton**
-
-                        # Store Original
-                        self.dep_props.append(Property(ent, prop_name, prop_val.full_name))
-
-                        # Remove referece
-                        with adams_errors_suppressed():
-                            try:
-                                setattr(ent, prop_name, self.entity_copy)
-                            except SetValueFailed:
-                                pass
-
-                    elif (isinstance(prop_val, List) and self.entity in prop_val):
-                        
-                        # If the property is a **list**
-                        prop_val: List[Object] = prop_val
-
-                        # Store Original
-                        self.dep_props.append(Property(ent,
-                                                       prop_name,
-                                                       [obj.full_name for obj in prop_val]))
-
-                        # Remove referece
-                        with adams_errors_suppressed():
-                            try:
-                                setattr(ent, prop_name, [v for v in prop_val if v != self.entity] or [self.entity_copy])
-                            except SetValueFailed:
-                                pass
-        
+        self.entity_copies = [ent.copy() for ent in self.entities]
+        copies = {ent.full_name.lower(): copy for ent, copy in zip(self.entities, self.entity_copies)}
+
+        graph = ReferenceGraph(ent for mgr in get_managers(self.mod) for ent in mgr.values())
+        refs = {(ref.source.full_name, ref.attribute): ref for ent in self.entities for ref in graph.referrers(ent)}
+
+        with adams_errors_suppressed():
+            for ref in refs.values():
+                ent, prop_name = ref.source, ref.attribute
+                try:
+                    prop_val = getattr(ent, prop_name)
+                except AttributeError:
+                    continue
+
+                if _key(prop_val) in copies:
+
+                    # If the property is a **sigleton**
+                    self.dep_props.append(Property(ent, prop_name, prop_val.full_name))
+                    new_val = copies[_key(prop_val)]
+
+                elif isinstance(prop_val, List) and any(_key(v) in copies for v in prop_val):
+
+                    # If the property is a **list**
+                    self.dep_props.append(Property(ent, prop_name, [obj.full_name for obj in prop_val]))
+                    new_val = [v for v in prop_val if _key(v) not in copies] or [copies[_key(v)] for v in prop_val]
+
+                else:
+                    continue
+
+                # Remove reference
+                try:
+                    setattr(ent, prop_name, new_val)
+                except SetValueFailed:
+                    pass
+
         # Check for dependent contact incidents
-        if Adams.evaluate_exp(f'db_object_count(DB_DEPENDENTS({self.entity.full_name}, "incident"))') > 0:
-            self._write_all_contact_incidents()
+        inc_names = {name for ent in self.entities
+                     for name in _as_list(Adams.evaluate_exp(f'DB_DEPENDENTS({ent.full_name}, "incident")'))}
 
-    def _write_all_contact_incidents(self):
-        """Write analyses to files and delete from database
-        """
-        self.export_dir = Path(mkdtemp())
-        inc_names = Adams.evaluate_exp(f'DB_DEPENDENTS({self.entity.full_name}, "incident")')
-        ans_names = [Adams.evaluate_exp(f'DB_ANCESTOR({inc_name}, "Analysis")')
-                     for inc_name in inc_names]
-                     
-        for ans_name in set(ans_names):
-            ans = self.mod.Analyses[ans_name.split('.')[-1]]
-
-            if False:
-                incident_container = f'{ans.full_name}.CONTACT_INCIDENTS'
-                file = self.export_dir / f'{incident_container}.bin'
-                Adams.execute_cmd(' '.join([f'file bin write file="{str(file)}"',
-                                            f'entity_name={incident_container}',
-                                            'alert=no']))
-                delete_objects(f'{ans.full_name}.CONTACT_INCIDENTS')
-            else:
-                file = self.export_dir / f'{ans.name}.res'
-                Adams.execute_cmd(' '.join([f'file analysis write file="{str(file)}"',
-                                            f'analysis={ans.full_name}']))
-                self.files.append(file)
-                ans.destroy()
+        if inc_names:
+            self._write_analyses(inc_names)
 
-    def rereference(self):
-        """Restores all references to `self.entity`
+    def _write_analyses(self, inc_names: Iterable[str]):
+        """Writes the analyses containing the contact incidents `inc_names` to files (once each) and
+        deletes them from the database"""
+        self.export_dir = Path(mkdtemp())
+        ans_names = {Adams.evaluate_exp(f'DB_ANCESTOR({inc_name}, "Analysis")') for inc_name in inc_names}
+        analyses = [self.mod.Analyses[ans_name.split('.')[-1]] for ans_name in sorted(ans_names)]
 
-        Parameters
-        ----------
-        props : dict
-            Dictionary of the original dependent properties and their values
-        """
-        # Loop over Dependent Properties
-        for prop in list(self.dep_props):
+        files = [self.export_dir / f'{ans.name}.res' for ans in analyses]
+        execute_cmds([f'file analysis write file="{str(file)}" analysis={ans.full_name}'
+                      for ans, file in zip(analyses, files)])
+        self.files.extend(files)
+        for ans in analyses:
+            ans.destroy()
 
-            # Restore the reference
+    def rereference(self):
+        """Restores all references to `self.entities` and the analyses deleted by `dereference`"""
+        # Look up all the referenced objects at once
+        values = iter(get_objects([name for prop in self.dep_props
+                                   for name in (prop.value if isinstance(prop.value, list) else [prop.value])],
+                                  self.mod))
+
+        # Restore the references, removing each property once it is restored
+        while self.dep_props:
+            prop = self.dep_props[0]
             if isinstance(prop.value, list):
-                setattr(prop.entity, prop.name, [get_object(v, self.mod) for v in prop.value])
+                setattr(prop.entity, prop.name, [next(values) for _ in prop.value])
             else:
-                setattr(prop.entity, prop.name, get_object(prop.value, self.mod))
+                setattr(prop.entity, prop.name, next(values))
+            self.dep_props.pop(0)
 
-            self.dep_props.remove(prop)
-        
-        self.entity_copy.destroy()
+        for copy in self.entity_copies:
+            copy.destroy()
+        self.entity_copies = []
 
-        # Load the exported bin files
+        # Load the exported files
+        cmds = []
         for file in self.files:
             if file.suffix == '.bin':
-                Adams.execute_cmd(f'file bin read file="{str(file)}" entity_name={file.stem} alert=no')
-            
+                cmds.append(f'file bin read file="{str(file)}" entity_name={file.stem} alert=no')
             elif file.suffix == '.res':
-                Adams.execute_cmd(f'file analysis read file="{str(file)}" model={self.mod.full_name}')
+                cmds.append(f'file analysis read file="{str(file)}" model={self.mod.full_name}')
+        execute_cmds(cmds)
+        self.files = []
 
         if isinstance(self.export_dir, Path) and self.export_dir.exists():
             try:
                 rmtree(self.export_dir)
             except Exception:
                 pass
+
+
+class Dereferencer(MultiDereferencer):
+    """Temporarily removes all references to `entity`. See `MultiDereferencer`."""
+
+    def __init__(self, entity: Object):
+        super().__init__([entity])
+        self.entity = entity
+
+    @property
+    def entity_copy(self) -> Object:
+        return self.entity_copies[0] if self.entity_copies else None
+
+
+def _key(value) -> str:
+    """Returns the lower case full name of `value` if it is an object, otherwise None"""
+    return value.full_name.lower() if isinstance(value, Object) else None
+
+
+def _as_list(names) -> List[str]:
+    if isinstance(names, str):
+        return [names] if names else []
+    return list(names or [])
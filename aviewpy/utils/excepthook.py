@@ -5,6 +5,9 @@ from typing import List, Type
 
 import Adams  # type: ignore
 
+from ..commands import execute_cmds
+
+
 def aview_excepthook(exc_type: Type[Exception], exc_value: Exception, exc_tb: List[str]):
     """A useful excepthook for developing in Adams using the Python api. Normally, Python exceptions
     are shown in the command window and log file, but not shown in the message window like other 
@@ -37,12 +40,12 @@ def aview_excepthook(exc_type: Type[Exception], exc_value: Exception, exc_tb: Li
         '---------------------------------------------------------------------',
     ]
 
-    for msg in messages:
-        Adams.execute_cmd('interface message severity = error message = "{}"'
-                          .format(msg
-                                  .replace('\\', '\\\\')
-                                  .replace('"', '\\"')
-                                  .rstrip()))
+    execute_cmds(['interface message severity = error message = "{}"'
+                  .format(msg
+                          .replace('\\', '\\\\')
+                          .replace('"', '\\"')
+                          .rstrip())
+                  for msg in messages], on_error='continue')
     Adams.execute_cmd('abort stop_all_commands = yes')
 
     raise exc_type.with_traceback(exc_tb)
@@ -9,6 +9,8 @@ from Object import ObjectSubBase, Object  # type: ignore
 import Adams  # type: ignore
 from aviewpy.ui.turn_on_all_force_graphics import get_graphic, turn_on_force_graphic
 from aviewpy.objects import get_parent_model
+from aviewpy.commands import CommandBatch
+from aviewpy.references import ReferenceGraph
 
 IPART_ATTRS = ['i_part']
 
@@ -42,9 +44,11 @@ def show_fbd(ans: Analysis, part: Part):
         p.visibility = 'off'
 
     # Get all the constraints, forces, and contacts that attach to the part
-    constraints = [c for c in mod.Constraints.values() if is_attached(part, c)]
-    forces = [f for f in mod.Forces.values() if is_attached(part, f)]
-    contacts = [c for c in mod.Contacts.values() if is_attached(part, c)]
+    graph = ReferenceGraph([*mod.Constraints.values(), *mod.Forces.values(), *mod.Contacts.values()],
+                           PART_ATTRS + CHILD_ATTRS)
+    constraints = [c for c in mod.Constraints.values() if is_attached(part, c, graph)]
+    forces = [f for f in mod.Forces.values() if is_attached(part, f, graph)]
+    contacts = [c for c in mod.Contacts.values() if is_attached(part, c, graph)]
 
     # Show only these constraints, forces, and contacts
     for obj in [*mod.Constraints.values(), *mod.Forces.values(), *mod.Contacts.values()]:
@@ -62,7 +66,7 @@ def show_fbd(ans: Analysis, part: Part):
             if isinstance(obj, Contact):
                 graphic = get_graphic(obj) or turn_on_force_graphic(obj)
             else:
-                graphic = turn_on_force_graphic(obj, show_on_ipart=is_ipart(part, obj))
+                graphic = turn_on_force_graphic(obj, show_on_ipart=is_ipart(part, obj, graph))
 
         else:
             # ------------------
@@ -77,97 +81,73 @@ def show_fbd(ans: Analysis, part: Part):
             if graphic:
                 graphic.visibility = 'off'
     page_name: str = Adams.evaluate_exp(f'unique_name_in_hierarchy(".gui.ppt_main.sash1.sash2.gfx.{part.name}_FBD")')
-
-    # Create a new page in the post processor
-    Adams.execute_cmd(f'interface page create'
-                      f' page_name = "{page_name.split(".")[-1]}"'
-                      f' layout = page2x2'
-                      f' set_contents = yes')
-
-    # ----------------------------------------------------------------------------------------------
-    # Plotting
-    # ----------------------------------------------------------------------------------------------
-
-    for idx, direc in enumerate(['X', 'Y', 'Z'], start=2):
-
-        Adams.execute_cmd(f'view activate view=(eval({page_name}.views[{idx}]))')
-        Adams.execute_cmd('interface plot window set_mode mode=plotting')
-        for obf in constraints + forces + contacts:
-            Adams.execute_cmd('xy_plot curve create'
-                              f' curve=(eval(unique_name_in_hierarchy({page_name}.views[{idx}].contents // ".{obf.name}")))'
-                              f' ddata={obf.full_name.replace(mod.full_name, ans.full_name)}.F{direc}'
-                              f' run={ans.full_name}'
-                              f' auto_axis=UNITS')
-        Adams.execute_cmd(f'xy_plots template auto_zoom'
-                          f' plot_name=(eval({page_name}.views[{idx}].contents))')
-        Adams.execute_cmd(f'xy_plot template calculate_axis_limits'
-                          f' plot_name=(eval({page_name}.views[{idx}].contents))')
-        Adams.execute_cmd(f'xy template modify'
-                          f' plot=(eval({page_name}.views[{idx}].contents))'
-                          f' title="{direc} Forces"')
-
-    # ----------------------------------------------------------------------------------------------
-    # Animation
-    # ----------------------------------------------------------------------------------------------
     ani_name = Adams.evaluate_exp(f'unique_name("ani_{part.name}_FBD")')
-    Adams.execute_cmd(f'view activate view_name = (eval({page_name}.views[1]))')
-    Adams.execute_cmd('interface plot window set_mode mode = animation')
-    Adams.execute_cmd(f'animation create '
-                      f' analysis_name = {ans.full_name} '
-                      f' view = (eval({page_name}.views[1]))'
-                      f' animation_name = {ani_name}')
-    Adams.execute_cmd(f'view center'
-                      f' view = (eval({page_name}.views[1]))'
-                      f' object = (eval(loc_global({{0,0,0}}, {part.cm.full_name})))')
-    Adams.execute_cmd(f'animation modify'
-                      f' base = {part.full_name}'
-                      f' animation_name = {ani_name}')
-    Adams.execute_cmd(f'animation modify animation_name = {ani_name} lock_rotation = on')
-    Adams.execute_cmd(f'interface plot window page_display page={page_name}')
-
-
-def is_attached(part: Part, obj: ObjectSubBase):
-
-    for dep_obj in (getattr(obj, a) for a in PART_ATTRS if getattr(obj, a, None) is not None):
-        if dep_obj == part:
-            return True
-
-    for dep_obj in (getattr(obj, a) for a in CHILD_ATTRS
-                    if getattr(obj, a, None) is not None
-                    and getattr(obj, a) is not None
-                    and not isinstance(getattr(obj, a), (list, tuple))):
-        dep_obj: ObjectSubBase
-        if dep_obj.parent == part:
-            return True
-
-    for dep_objs in (getattr(obj, a) for a in CHILD_ATTRS
-                     if getattr(obj, a, None) is not None
-                     and isinstance(getattr(obj, a), (list, tuple))):
-        dep_objs: List[ObjectSubBase]
-        if any(o.parent == part for o in dep_objs):
-            return True
-
-    return False
-
-
-def is_ipart(part: Part, obj: ObjectSubBase):
-    for dep_obj in (getattr(obj, a) for a in IPART_ATTRS if getattr(obj, a, None) is not None):
-        if dep_obj == part:
-            return True
-
-    for dep_obj in (getattr(obj, a) for a in ICHILD_ATTRS
-                    if getattr(obj, a, None) is not None
-                    and getattr(obj, a) is not None
-                    and not isinstance(getattr(obj, a), (list, tuple))):
-        dep_obj: ObjectSubBase
-        if dep_obj.parent == part:
-            return True
-
-    for dep_objs in (getattr(obj, a) for a in ICHILD_ATTRS
-                     if getattr(obj, a, None) is not None
-                     and isinstance(getattr(obj, a), (list, tuple))):
-        dep_objs: List[ObjectSubBase]
-        if any(o.parent == part for o in dep_objs):
-            return True
-
-    return False
+
+    with CommandBatch() as batch:
+
+        # Create a new page in the post processor
+        batch.add(f'interface page create'
+                  f' page_name = "{page_name.split(".")[-1]}"'
+                  f' layout = page2x2'
+                  f' set_contents = yes')
+
+        # ------------------------------------------------------------------------------------------
+        # Plotting
+        # ------------------------------------------------------------------------------------------
+
+        for idx, direc in enumerate(['X', 'Y', 'Z'], start=2):
+
+            batch.add(f'view activate view=(eval({page_name}.views[{idx}]))')
+            batch.add('interface plot window set_mode mode=plotting')
+            for obf in constraints + forces + contacts:
+                batch.add('xy_plot curve create'
+                          f' curve=(eval(unique_name_in_hierarchy({page_name}.views[{idx}].contents // ".{obf.name}")))'
+                          f' ddata={obf.full_name.replace(mod.full_name, ans.full_name)}.F{direc}'
+                          f' run={ans.full_name}'
+                          f' auto_axis=UNITS')
+            batch.add(f'xy_plots template auto_zoom'
+                      f' plot_name=(eval({page_name}.views[{idx}].contents))')
+            batch.add(f'xy_plot template calculate_axis_limits'
+                      f' plot_name=(eval({page_name}.views[{idx}].contents))')
+            batch.add(f'xy template modify'
+                      f' plot=(eval({page_name}.views[{idx}].contents))'
+                      f' title="{direc} Forces"')
+
+        # ------------------------------------------------------------------------------------------
+        # Animation
+        # ------------------------------------------------------------------------------------------
+        batch.add(f'view activate view_name = (eval({page_name}.views[1]))')
+        batch.add('interface plot window set_mode mode = animation')
+        batch.add(f'animation create '
+                  f' analysis_name = {ans.full_name} '
+                  f' view = (eval({page_name}.views[1]))'
+                  f' animation_name = {ani_name}')
+        batch.add(f'view center'
+                  f' view = (eval({page_name}.views[1]))'
+                  f' object = (eval(loc_global({{0,0,0}}, {part.cm.full_name})))')
+        batch.add(f'animation modify'
+                  f' base = {part.full_name}'
+                  f' animation_name = {ani_name}')
+        batch.add(f'animation modify animation_name = {ani_name} lock_rotation = on')
+        batch.add(f'interface plot window page_display page={page_name}')
+
+
+def is_attached(part: Part, obj: ObjectSubBase, graph: ReferenceGraph = None) -> bool:
+    """Returns True if `obj` references `part` or one of its children through `PART_ATTRS` or
+    `CHILD_ATTRS`. Pass a `graph` that has read `obj` to avoid reading its attributes again."""
+    return _references_part(part, obj, graph, PART_ATTRS, CHILD_ATTRS)
+
+
+def is_ipart(part: Part, obj: ObjectSubBase, graph: ReferenceGraph = None) -> bool:
+    """Returns True if `obj` references `part` or one of its children through `IPART_ATTRS` or
+    `ICHILD_ATTRS`. Pass a `graph` that has read `obj` to avoid reading its attributes again."""
+    return _references_part(part, obj, graph, IPART_ATTRS, ICHILD_ATTRS)
+
+
+def _references_part(part: Part, obj: ObjectSubBase, graph: ReferenceGraph,
+                     part_attrs: List[str], child_attrs: List[str]) -> bool:
+    graph = graph if graph is not None else ReferenceGraph([obj], part_attrs + child_attrs)
+    if any(ref.target == part for ref in graph.references(obj, part_attrs)):
+        return True
+
+    return any(ref.target.parent == part for ref in graph.references(obj, child_attrs))
@@ -0,0 +1,404 @@
+"""Helpers for managing external (solver) processes"""
+import json
+import logging
+import os
+import platform
+import signal
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Union
+
+LOG = logging.getLogger(__name__)
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+THREAD_ENV_VARS = ['OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS']
+"""Environment variables set to the number of threads a solver process may use"""
+
+
+def child_pids(pid: int) -> List[int]:
+    """Returns the pids of all descendants of `pid` (Linux only, empty list elsewhere)"""
+    children = []
+    pending = [pid]
+    while pending:
+        parent = pending.pop()
+        for task in Path(f'/proc/{parent}/task').glob('*'):
+            try:
+                pids = [int(p) for p in (task / 'children').read_text().split()]
+            except (OSError, ValueError):
+                continue
+            children.extend(pids)
+            pending.extend(pids)
+
+    return children
+
+
+def kill_process_tree(proc: subprocess.Popen):
+    """Kills `proc` and all of its descendants
+
+    Parameters
+    ----------
+    proc : subprocess.Popen
+        The process to kill
+    """
+    if proc.poll() is not None:
+        return
+
+    if platform.system() == 'Windows':
+        subprocess.run(['taskkill', '/F', '/T', '/PID', str(proc.pid)],
+                       stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL,
+                       check=False)
+    else:
+        for pid in reversed(child_pids(proc.pid)):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError:
+                pass
+
+    try:
+        proc.kill()
+    except OSError:
+        pass
+
+    proc.wait()
+
+
+def terminate_process_tree(proc: subprocess.Popen, grace_period: float = 10.0):
+    """Asks `proc` and all of its descendants to exit, and kills them if they have not exited
+    after `grace_period` seconds. Returns once all of them have exited.
+
+    Parameters
+    ----------
+    proc : subprocess.Popen
+        The process to terminate
+    grace_period : float, optional
+        Time to wait for the processes to exit in seconds, by default 10.0
+    """
+    if proc.poll() is not None:
+        return
+
+    deadline = time.monotonic() + grace_period
+    descendants = []
+    if platform.system() == 'Windows':
+        subprocess.run(['taskkill', '/T', '/PID', str(proc.pid)],
+                       stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL,
+                       check=False)
+    else:
+        descendants = child_pids(proc.pid)
+        for pid in [proc.pid, *descendants]:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+
+    try:
+        proc.wait(timeout=grace_period)
+    except subprocess.TimeoutExpired:
+        kill_process_tree(proc)
+
+    # Descendants are reparented when `proc` exits, so they are waited on by pid
+    while True:
+        descendants = [pid for pid in descendants if not _has_exited(pid)]
+        if not descendants:
+            break
+        if time.monotonic() > deadline:
+            for pid in descendants:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except OSError:
+                    pass
+            deadline = float('inf')
+        time.sleep(0.01)
+
+
+def _has_exited(pid: int) -> bool:
+    """Returns True if `pid` has exited (Linux only). Zombies have exited."""
+    try:
+        stat = Path(f'/proc/{pid}/stat').read_text()
+    except OSError:
+        return True
+    return stat[stat.rindex(')') + 2] in 'ZX'
+
+
+def get_process_tree_info(pid: int) -> List[dict]:
+    """Returns the state, CPU time, wait channel and command line of `pid` and its descendants
+    (Linux only, elsewhere only the pids are returned)"""
+    info = []
+    for child in [pid, *child_pids(pid)]:
+        entry = {'pid': child}
+        try:
+            stat = Path(f'/proc/{child}/stat').read_text()
+            fields = stat[stat.rindex(')') + 2:].split()
+            entry['state'] = fields[0]
+            entry['cpu_time'] = sum(int(f) for f in fields[11:13]) / CLOCK_TICKS
+            entry['wchan'] = Path(f'/proc/{child}/wchan').read_text()
+            entry['cmdline'] = Path(f'/proc/{child}/cmdline').read_text().replace('\0', ' ').strip()
+        except (OSError, ValueError):
+            pass
+        info.append(entry)
+
+    return info
+
+
+class ProcessStats(NamedTuple):
+    """Resource usage of a single process read from /proc"""
+    cpu_time: float
+    """User and system CPU time in seconds, including reaped children"""
+    rss: int
+    """Resident set size in bytes"""
+    read_bytes: int
+    """Bytes read from storage, including reaped children"""
+    write_bytes: int
+    """Bytes written to storage, including reaped children"""
+
+
+def read_process_stats(pid: int) -> Union[ProcessStats, None]:
+    """Returns the resource usage of `pid` (Linux only), or None if it can not be read"""
+    try:
+        stat = Path(f'/proc/{pid}/stat').read_text()
+        status = Path(f'/proc/{pid}/status').read_text()
+    except OSError:
+        return None
+
+    # The command name may contain spaces, so split after its closing bracket
+    fields = stat[stat.rindex(')') + 2:].split()
+    cpu_time = sum(int(f) for f in fields[11:15]) / CLOCK_TICKS
+    rss = next((int(line.split()[1]) * 1024 for line in status.splitlines() if line.startswith('VmRSS:')), 0)
+
+    read_bytes = write_bytes = 0
+    try:
+        for line in Path(f'/proc/{pid}/io').read_text().splitlines():
+            key, _, value = line.partition(':')
+            if key == 'read_bytes':
+                read_bytes = int(value)
+            elif key == 'write_bytes':
+                write_bytes = int(value)
+    except OSError:
+        pass
+
+    return ProcessStats(cpu_time, rss, read_bytes, write_bytes)
+
+
+class ProcessMonitor():
+    """Samples the resource usage of a process and its descendants in a background thread until
+    it exits (Linux only, only the wall time is recorded elsewhere).
+
+    Note
+    ----
+    Usage is sampled, so up to one `interval` of CPU time and I/O at the end of the run may be
+    missed. `peak_rss` is the peak of the total resident memory of the process tree.
+
+    Example
+    -------
+    >>> proc = subprocess.Popen(command)
+    >>> monitor = ProcessMonitor(proc, interval=0.5, output_file='run_1_telemetry.json')
+    >>> monitor.join()
+    >>> monitor.peak_rss / 2**30
+    3.2
+
+    Parameters
+    ----------
+    proc : subprocess.Popen
+        The process to monitor
+    interval : float, optional
+        Time between samples in seconds, by default 1.0
+    output_file : Path, optional
+        JSON file to write the telemetry to when the process exits, by default None
+    """
+
+    def __init__(self, proc: subprocess.Popen, interval: float = 1.0, output_file: Path = None):
+        self.proc = proc
+        self.interval = interval
+        self.output_file = Path(output_file) if output_file is not None else None
+        self.start_time = time.time()
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.peak_rss = 0
+        self.read_bytes = 0
+        self.write_bytes = 0
+        self.samples: List[List[float]] = []
+        """[time, cpu_time, rss, read_bytes, write_bytes] of each sample"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def join(self, timeout: float = None):
+        """Waits for the process to exit and the telemetry to be written"""
+        self._thread.join(timeout)
+
+    def sample(self):
+        """Reads the current resource usage of the process tree"""
+        stats = [s for s in map(read_process_stats, [self.proc.pid, *child_pids(self.proc.pid)])
+                 if s is not None]
+        self.wall_time = time.time() - self.start_time
+        if not stats:
+            return
+
+        # The root's counters include its reaped descendants, so add only the live ones
+        self.cpu_time = max(self.cpu_time, sum(s.cpu_time for s in stats))
+        self.read_bytes = max(self.read_bytes, sum(s.read_bytes for s in stats))
+        self.write_bytes = max(self.write_bytes, sum(s.write_bytes for s in stats))
+        rss = sum(s.rss for s in stats)
+        self.peak_rss = max(self.peak_rss, rss)
+        self.samples.append([round(self.wall_time, 3), self.cpu_time, rss, self.read_bytes, self.write_bytes])
+
+    def to_dict(self) -> dict:
+        return {'pid': self.proc.pid,
+                'args': [str(a) for a in self.proc.args] if isinstance(self.proc.args, list) else str(self.proc.args),
+                'wall_time': self.wall_time,
+                'cpu_time': self.cpu_time,
+                'peak_rss': self.peak_rss,
+                'read_bytes': self.read_bytes,
+                'write_bytes': self.write_bytes,
+                'interval': self.interval,
+                'samples': self.samples}
+
+    def write(self, output_file: Path):
+        """Writes the telemetry to a JSON file"""
+        Path(output_file).write_text(json.dumps(self.to_dict()))
+
+    def _run(self):
+        while True:
+            self.sample()
+            try:
+                self.proc.wait(timeout=self.interval)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+
+        self.wall_time = time.time() - self.start_time
+        if self.output_file is not None:
+            try:
+                self.write(self.output_file)
+            except OSError:
+                LOG.warning(f'Failed to write telemetry to {self.output_file}', exc_info=True)
+
+
+def parse_cpu_list(text: str) -> List[int]:
+    """Parses a Linux cpu list (e.g. '0-3,8,10-11')"""
+    cpus = []
+    for part in text.strip().split(','):
+        if '-' in part:
+            first, last = part.split('-')
+            cpus.extend(range(int(first), int(last) + 1))
+        elif part:
+            cpus.append(int(part))
+
+    return cpus
+
+
+def get_available_cpus() -> List[int]:
+    """Returns the cpus this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def get_numa_nodes() -> Dict[int, List[int]]:
+    """Returns the cpus of each NUMA node (Linux only). Elsewhere, or if the machine has a single
+    node, all cpus are returned as node 0."""
+    nodes = {}
+    for node_dir in Path('/sys/devices/system/node').glob('node[0-9]*'):
+        try:
+            cpus = parse_cpu_list((node_dir / 'cpulist').read_text())
+        except (OSError, ValueError):
+            continue
+        if cpus:
+            nodes[int(node_dir.name[4:])] = cpus
+
+    return dict(sorted(nodes.items())) or {0: list(range(os.cpu_count() or 1))}
+
+
+class CpuAllocator():
+    """Hands out disjoint sets of cpus to concurrent solver processes.
+
+    A request is served from a single NUMA node when possible, choosing the node with the fewest
+    free cpus that still fits it, so that large requests are not blocked by fragmentation.
+    Requests larger than any node are spread over the nodes with the most free cpus.
+
+    Parameters
+    ----------
+    cpus : Iterable[int], optional
+        Cpus to hand out, by default all cpus this process may run on
+    numa : bool, optional
+        Whether to keep each request on a single NUMA node, by default True
+    """
+
+    def __init__(self, cpus: Iterable[int] = None, numa=True):
+        self.cpus = sorted(cpus if cpus is not None else get_available_cpus())
+        if numa:
+            nodes = [[c for c in node if c in self.cpus] for node in get_numa_nodes().values()]
+            self.nodes = [node for node in nodes if node]
+        else:
+            self.nodes = [self.cpus]
+
+        # Cpus that are not listed under any node
+        missing = set(self.cpus).difference(*self.nodes)
+        if missing:
+            self.nodes.append(sorted(missing))
+
+        self._used = set()
+        self._lock = threading.Lock()
+
+    @property
+    def free(self) -> int:
+        """Number of free cpus"""
+        return len(self.cpus) - len(self._used)
+
+    def allocate(self, count: int) -> Union[List[int], None]:
+        """Reserves `count` cpus (at most all of them)
+
+        Returns
+        -------
+        List[int] or None
+            The reserved cpus, or None if not enough cpus are free
+        """
+        count = max(1, min(count, len(self.cpus)))
+        with self._lock:
+            free_nodes = [[c for c in node if c not in self._used] for node in self.nodes]
+            fits = [node for node in free_nodes if len(node) >= count]
+            if fits:
+                cpus = min(fits, key=len)[:count]
+            elif count > max(len(node) for node in self.nodes) and sum(map(len, free_nodes)) >= count:
+                cpus = []
+                for node in sorted(free_nodes, key=len, reverse=True):
+                    cpus += node[:count - len(cpus)]
+            else:
+                return None
+
+            self._used.update(cpus)
+            return cpus
+
+    def release(self, cpus: Iterable[int]):
+        """Returns cpus reserved by `allocate`"""
+        with self._lock:
+            self._used.difference_update(cpus)
+
+
+@contextmanager
+def thread_affinity(cpus: Iterable[int]):
+    """Context manager that restricts the calling thread to `cpus` (Linux only). Processes started
+    inside it inherit the restriction, without affecting other threads."""
+    if not hasattr(os, 'sched_setaffinity'):
+        LOG.warning('Setting the cpu affinity is not supported on this platform')
+        yield
+        return
+
+    # With a pid of 0 the affinity of the calling thread is changed
+    previous = os.sched_getaffinity(0)
+    os.sched_setaffinity(0, cpus)
+    try:
+        yield
+    finally:
+        os.sched_setaffinity(0, previous)
+
+
+def thread_env(threads: int, env: Dict[str, str] = None) -> Dict[str, str]:
+    """Returns a copy of `env` (by default `os.environ`) with `THREAD_ENV_VARS` set to `threads`"""
+    env = dict(env if env is not None else os.environ)
+    env.update({var: str(threads) for var in THREAD_ENV_VARS})
+    return env
@@ -1,8 +1,13 @@
+from __future__ import annotations
 import re
-from typing import List
-from Object import Object  # type: ignore
+from typing import TYPE_CHECKING, List
 from ..files.mac import RE_MACRO_PARAM, get_macro_params  # for backwards compatibility
 
+if TYPE_CHECKING:
+    # Only used in annotations, so that `aviewpy.utils.cache` and `aviewpy.utils.process` can be
+    # imported outside Adams View (e.g. by `aviewpy.worker`)
+    from Object import Object  # type: ignore
+
 DEACTIVAETABLE_TYPES = {
     'beam': [],
     'bushing': [],
@@ -0,0 +1,160 @@
+"""Runs solver jobs from a `JobQueue` on a shared filesystem.
+
+Start one worker per compute node (it does not need Adams View, only Adams Solver)::
+
+    python -m aviewpy.worker //cluster/share/queue --max-jobs 4
+
+Jobs are queued with `JobQueue.put` or `aviewpy.sim.submit(..., queue=...)`.
+"""
+import argparse
+import logging
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Union
+
+from .jobs import Job, JobQueue, QueuedJob
+from .solver import JobResult
+
+LOG = logging.getLogger(__name__)
+
+
+class Worker():
+    """Claims jobs from a `JobQueue` and runs them with `solve`.
+
+    Parameters
+    ----------
+    queue : Union[JobQueue, Path]
+        The queue (or its directory)
+    max_jobs : int, optional
+        Maximum number of jobs to run at once, by default 1
+    heartbeat_interval : float, optional
+        Time between heartbeats in seconds, by default 30
+    stale_after : float, optional
+        Seconds without a heartbeat after which another worker is considered dead and its jobs
+        are requeued, by default 300
+    poll_interval : float, optional
+        Time between checks for new jobs in seconds, by default 5
+    telemetry : bool, optional
+        Whether to record the resource usage of each job. See `solve`. By default False
+    """
+
+    def __init__(self,
+                 queue: Union[JobQueue, Path],
+                 max_jobs: int = 1,
+                 heartbeat_interval: float = 30.0,
+                 stale_after: float = 300.0,
+                 poll_interval: float = 5.0,
+                 telemetry=False):
+        self.queue = queue if isinstance(queue, JobQueue) else JobQueue(queue)
+        self.max_jobs = max_jobs
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.poll_interval = poll_interval
+        self.telemetry = telemetry
+        self.id = f'{socket.gethostname()}_{os.getpid()}'
+        self.completed = 0
+        self._active: Dict[str, threading.Thread] = {}
+        self._stop = threading.Event()
+
+    def run(self, idle_timeout: float = None):
+        """Runs jobs until `stop` is called, or until the queue has been empty and no jobs have
+        been running for `idle_timeout` seconds"""
+        self.queue.heartbeat(self.id)
+        heartbeat = threading.Thread(target=self._heartbeat, daemon=True)
+        heartbeat.start()
+        LOG.info(f'Worker {self.id} started on {self.queue.root}')
+
+        idle_since = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                self.queue.recover(self.stale_after)
+
+                for job_id, thread in list(self._active.items()):
+                    if not thread.is_alive():
+                        del self._active[job_id]
+
+                while len(self._active) < self.max_jobs:
+                    job = self.queue.claim(self.id)
+                    if job is None:
+                        break
+                    thread = threading.Thread(target=self._run_job, args=(job,), daemon=True)
+                    self._active[job.id] = thread
+                    thread.start()
+
+                if self._active:
+                    idle_since = time.monotonic()
+                elif idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout:
+                    break
+
+                self._stop.wait(self.poll_interval)
+
+            for thread in list(self._active.values()):
+                thread.join()
+
+        finally:
+            self._stop.set()
+            heartbeat.join()
+            self.queue.remove_worker(self.id)
+            LOG.info(f'Worker {self.id} stopped after {self.completed} jobs')
+
+    def stop(self):
+        """Stops claiming jobs. `run` returns once the running jobs have finished."""
+        self._stop.set()
+
+    def _run_job(self, queued: QueuedJob):
+        spec = queued.spec
+        LOG.info(f'Running {queued.acf_file}')
+        job = Job(queued.acf_file,
+                  timeout=spec['timeout'],
+                  use_adams_car=spec['use_adams_car'],
+                  telemetry=self.telemetry,
+                  threads=spec['threads'],
+                  stall_timeout=spec.get('stall_timeout'),
+                  retry_commands=spec.get('retry_commands'))
+        job.attempts = spec['attempts']
+        try:
+            result = job.run()
+        except Exception:  # pylint: disable=broad-except
+            LOG.exception(f'Failed to run {queued.acf_file}')
+            result = JobResult(queued.acf_file, None, 0.0, [])
+
+        self.queue.complete(queued, result, self.id)
+        self.completed += 1
+
+    def _heartbeat(self):
+        while not self._stop.wait(self.heartbeat_interval):
+            self.queue.heartbeat(self.id)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m aviewpy.worker', description=__doc__.splitlines()[0])
+    parser.add_argument('queue', type=Path, help='Directory of the job queue')
+    parser.add_argument('--max-jobs', type=int, default=1, help='Maximum number of jobs to run at once')
+    parser.add_argument('--heartbeat-interval', type=float, default=30.0, help='Seconds between heartbeats')
+    parser.add_argument('--stale-after', type=float, default=300.0,
+                        help='Seconds without a heartbeat after which a worker is considered dead')
+    parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds between checks for new jobs')
+    parser.add_argument('--idle-timeout', type=float, default=None,
+                        help='Exit after the queue has been empty for this many seconds')
+    parser.add_argument('--telemetry', action='store_true', help='Record the resource usage of each job')
+    parser.add_argument('--log-level', default='INFO')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+    worker = Worker(args.queue,
+                    max_jobs=args.max_jobs,
+                    heartbeat_interval=args.heartbeat_interval,
+                    stale_after=args.stale_after,
+                    poll_interval=args.poll_interval,
+                    telemetry=args.telemetry)
+    try:
+        worker.run(idle_timeout=args.idle_timeout)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
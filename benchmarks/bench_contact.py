@@ -0,0 +1,29 @@
+import pytest
+
+from aviewpy.contact import get_contact_data
+from aviewpy.cs import CS, MarkerCS
+
+from .synthetic import SCALES, make_contact_model
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def bench_get_contact_data(benchmark, scale):
+    geom, ans, mkr = make_contact_model(n_tracks=SCALES[scale], n_steps=100)
+    df = benchmark(get_contact_data, geom, ans, mkr)
+    assert len(df) == 100 * SCALES[scale]
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def bench_marker_cs(benchmark, scale):
+    _, ans, mkr = make_contact_model(n_tracks=0, n_steps=100 * SCALES[scale])
+    cs = benchmark(MarkerCS, mkr, ans)
+    assert cs.loc.shape == (100 * SCALES[scale], 3)
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def bench_cs_difference(benchmark, scale):
+    _, ans, mkr = make_contact_model(n_tracks=0, n_steps=100 * SCALES[scale])
+    mkr_cs = MarkerCS(mkr, ans)
+    other = CS(mkr_cs.loc * 2, mkr_cs.ori[::-1])
+    diff = benchmark(lambda: other - mkr_cs)
+    assert diff.loc.shape == mkr_cs.loc.shape
@@ -0,0 +1,38 @@
+import pytest
+
+from aviewpy.files.mac import get_macro_params
+from aviewpy.files.msg import get_failed_static_step
+from aviewpy.files.to import read_TO_file
+from aviewpy.sim import static_funnel
+
+from .synthetic import SCALES, make_macro_text, make_msg_text, make_to_text
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def bench_read_TO_file(benchmark, tmp_path, scale):
+    file = tmp_path / 'bench.ssf'
+    file.write_text(make_to_text(5 * SCALES[scale]))
+    params = benchmark(read_TO_file, file)
+    assert len(params) == 5 * SCALES[scale] + 1
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def bench_get_macro_params(benchmark, scale):
+    text = make_macro_text(10 * SCALES[scale])
+    params = benchmark(get_macro_params, text)
+    assert len(params) == 10 * SCALES[scale]
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def bench_get_failed_static_step(benchmark, tmp_path, scale):
+    steps = 10 * SCALES[scale]
+    file = tmp_path / 'bench.msg'
+    file.write_text(make_msg_text(steps, failed_step=steps - 1))
+    assert benchmark(get_failed_static_step, file) == steps - 1
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def bench_static_funnel(benchmark, scale):
+    steps = 10 * SCALES[scale]
+    lines = benchmark(static_funnel, steps, stability=(1e-3, 1e-8), error=(1e-3, 1e-5), maxit=100)
+    assert len(lines) == 2 * steps
@@ -0,0 +1,57 @@
+"""Cold import time of aviewpy.
+
+Each round imports the modules in a fresh interpreter (with the same `sys.path`, so the fake Adams View
+API is used outside Adams View). `bench_import_core` fails if the core modules take longer than
+`IMPORT_BUDGET` to import or if they import any of `HEAVY_MODULES`.
+"""
+import os
+import subprocess
+import sys
+from typing import List, Tuple
+
+import pytest
+
+CORE_MODULES = ['aviewpy', 'aviewpy.commands', 'aviewpy.expressions', 'aviewpy.objects', 'aviewpy.variables',
+                'aviewpy.model', 'aviewpy.results', 'aviewpy.sim', 'aviewpy.utils', 'aviewpy.files.acf',
+                'aviewpy.files.mac', 'aviewpy.files.msg', 'aviewpy.files.shell', 'aviewpy.files.to']
+"""Modules that must be cheap to import inside Adams View"""
+
+HEAVY_MODULES = ['matplotlib', 'numpy', 'pandas', 'PyQt4', 'scipy', 'stl']
+"""Dependencies that the core modules must only import when they are used"""
+
+IMPORT_BUDGET = 0.5
+"""Maximum time in seconds to import `CORE_MODULES`"""
+
+ROUNDS = 5
+
+SCRIPT = '''
+import sys
+import time
+t_0 = time.perf_counter()
+import {modules}
+print(time.perf_counter() - t_0)
+print(' '.join(sorted({heavy!r} & {{m.split('.')[0] for m in sys.modules}})))
+'''
+
+
+def cold_import(modules: List[str]) -> Tuple[float, List[str]]:
+    """Imports `modules` in a new interpreter. Returns the time taken and the heavy modules imported."""
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path), 'MPLBACKEND': 'Agg'}
+    script = SCRIPT.format(modules=', '.join(modules), heavy=set(HEAVY_MODULES))
+    proc = subprocess.run([sys.executable, '-c', script], env=env, capture_output=True, text=True, check=True)
+    import_time, heavy = proc.stdout.splitlines()
+    return float(import_time), heavy.split()
+
+
+def bench_import_core(benchmark):
+    results = [cold_import(CORE_MODULES) for _ in range(ROUNDS)]
+    benchmark.record([import_time for import_time, _ in results])
+
+    import_time, heavy = min(results)
+    assert not heavy, f'Importing the core modules imported {", ".join(heavy)}'
+    assert import_time < IMPORT_BUDGET, f'Importing the core modules took {import_time:.3f} s'
+
+
+@pytest.mark.parametrize('module', ['aviewpy.contact', 'aviewpy.cs'])
+def bench_import(benchmark, module):
+    benchmark.record([cold_import([module])[0] for _ in range(ROUNDS)])
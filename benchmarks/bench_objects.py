@@ -0,0 +1,100 @@
+import pytest
+
+from aviewpy.objects import (AdamsIdAllocator, all_objects, descendant_names, get_index, get_objects,
+                             iter_descendants, unique_object_names)
+from aviewpy.references import ReferenceGraph
+from aviewpy.utils.dereferencer import MultiDereferencer
+
+from .synthetic import SCALES, make_model
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def bench_get_objects(benchmark, scale):
+    mod = make_model(n_parts=10 * SCALES[scale])
+    names = [mkr.full_name for part in mod.Parts.values() for mkr in part.Markers.values()]
+    objects = benchmark(get_objects, names, mod)
+    assert None not in objects
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def bench_build_object_index(benchmark, scale):
+    mod = make_model(n_parts=10 * SCALES[scale])
+    index = get_index(mod)
+    mkr = benchmark.pedantic(index.get, args=('.BENCH.PART_0.MAR_0',), setup=index.invalidate)
+    assert mkr is not None
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def bench_all_objects(benchmark, scale):
+    make_model(n_parts=10 * SCALES[scale])
+    markers = benchmark(lambda: list(all_objects('marker')))
+    assert len(markers) == 110 * SCALES[scale]
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def bench_iter_descendants(benchmark, scale):
+    mod = make_model(n_parts=10 * SCALES[scale])
+    marker_type = type(mod.Parts['PART_0'].Markers['MAR_0'])
+    markers = benchmark(lambda: list(iter_descendants(mod, marker_type)))
+    assert len(markers) == 110 * SCALES[scale]
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def bench_descendant_names(benchmark, scale):
+    mod = make_model(n_parts=10 * SCALES[scale])
+    names = benchmark(descendant_names, mod, 'marker')
+    assert len(names) == 110 * SCALES[scale]
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def bench_allocate_adams_ids(benchmark, scale):
+    mod = make_model(n_parts=10 * SCALES[scale])
+    splines = [mod.DataElements.createSpline(name=f'SPLINE_{idx}') for idx in range(10 * SCALES[scale])]
+    for spline in splines:
+        spline.__dict__['adams_id'] = 1  # As if merged from subsystems
+
+    ids = benchmark(lambda: AdamsIdAllocator(mod).allocate(splines))
+    assert ids == list(range(1, len(splines) + 1))
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def bench_unique_object_names(benchmark, scale):
+    mod = make_model(n_parts=10 * SCALES[scale], n_markers=0)
+    names = benchmark(unique_object_names, '.BENCH.PART', 10 * SCALES[scale])
+    assert len(set(names)) == 10 * SCALES[scale]
+    assert all(name.rsplit('.', 1)[-1] not in mod.Parts for name in names)
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def bench_reference_graph(benchmark, scale):
+    mod = make_model(n_parts=10 * SCALES[scale], n_markers=2)
+    parts = [part for part in mod.Parts.values() if part.name != 'ground']
+    for idx, (part_i, part_j) in enumerate(zip(parts, parts[1:])):
+        mod.Constraints.createRevolute(name=f'JOINT_{idx}', i_marker=part_i.Markers['MAR_0'],
+                                       j_marker=part_j.Markers['MAR_1'])
+    markers = [part.Markers['MAR_0'] for part in parts]
+
+    def build_and_query():
+        graph = ReferenceGraph.from_model(mod, prune=lambda obj: True)
+        return [graph.referrers(mkr) for mkr in markers]
+
+    referrers = benchmark(build_and_query)
+    assert sum(len(refs) for refs in referrers) == len(parts) - 1
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def bench_multi_dereferencer(benchmark, scale):
+    mod = make_model(n_parts=10 * SCALES[scale], n_markers=0)
+    geoms = []
+    for idx, part in enumerate(part for part in mod.Parts.values() if part.name != 'ground'):
+        geoms.append(part.Geometries.createEllipsoid(name='GEOM'))
+        mod.Contacts.create(name=f'CONTACT_{idx}', i_geometry=[geoms[-1]], j_geometry=[])
+
+    def dereference_and_rereference():
+        dereferencer = MultiDereferencer(geoms)
+        dereferencer.dereference()
+        dereferencer.rereference()
+        return dereferencer
+
+    benchmark(dereference_and_rereference)
+    assert all(cont.i_geometry == [geom] for cont, geom in zip(mod.Contacts.values(), geoms))
@@ -0,0 +1,47 @@
+from math import sqrt
+
+import pytest
+
+from aviewpy.files.shell import get_shell_diff_vectors, get_shell_volume, read_shell_file, write_shell_file
+
+from .synthetic import SCALES, make_sphere_shell
+
+
+def n_rings(scale: str) -> int:
+    return int(10 * sqrt(SCALES[scale]))
+
+
+@pytest.fixture(params=SCALES)
+def shell_files(request, tmp_path):
+    points, facets = make_sphere_shell(n_rings(request.param))
+    file_1, file_2 = tmp_path / 'sphere_1.shl', tmp_path / 'sphere_2.shl'
+    write_shell_file(points, facets, file_1, 1.0)
+    write_shell_file([(1.01 * x, 1.01 * y, 1.01 * z) for x, y, z in points], facets, file_2, 1.0)
+    return file_1, file_2
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def bench_write_shell_file(benchmark, tmp_path, scale):
+    points, facets = make_sphere_shell(n_rings(scale))
+    benchmark(write_shell_file, points, facets, tmp_path / 'sphere.shl', 1.0)
+
+
+def bench_read_shell_file(benchmark, shell_files):
+    points, _ = benchmark(read_shell_file, shell_files[0], use_cache=False)
+    assert len(points) > 0
+
+
+def bench_read_cached_shell_file(benchmark, shell_files):
+    read_shell_file(shell_files[0])
+    benchmark(read_shell_file, shell_files[0])
+
+
+def bench_get_shell_volume(benchmark, shell_files):
+    points, facets = read_shell_file(shell_files[0])
+    volume = benchmark(get_shell_volume, points, facets)
+    assert volume == pytest.approx(4 / 3 * 3.14159, rel=0.2)
+
+
+def bench_get_shell_diff_vectors(benchmark, shell_files):
+    df = benchmark(get_shell_diff_vectors, *shell_files)
+    assert len(df) > 0
@@ -0,0 +1,144 @@
+"""Minimal pytest-benchmark style harness for the aviewpy benchmarks.
+
+Run the benchmarks headless and save the results::
+
+    python -m pytest benchmarks --bench-save results.json
+
+Compare against a stored baseline (e.g. results saved on the same CI machine from the main branch).
+The run fails if the median time of any benchmark is more than `--bench-threshold` (a fraction,
+by default 0.25) slower than in the baseline::
+
+    python -m pytest benchmarks --bench-baseline baseline.json --bench-threshold 0.25
+"""
+import json
+import os
+import platform
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import pytest
+
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+from test.fake_adams import install  # noqa: E402 # isort: skip
+
+install()
+
+MIN_TIME = 0.2
+"""Minimum total time in seconds to spend running each benchmark"""
+MAX_ROUNDS = 1000
+MIN_ROUNDS = 3
+
+RESULTS: Dict[str, Dict[str, float]] = {}
+REGRESSIONS: List[str] = []
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('aviewpy benchmarks')
+    group.addoption('--bench-save', type=Path, default=None, help='Save the results to this JSON file')
+    group.addoption('--bench-baseline', type=Path, default=None,
+                    help='Fail if any benchmark is slower than in this JSON file (saved with --bench-save)')
+    group.addoption('--bench-threshold', type=float, default=0.25,
+                    help='Fractional slowdown of the median time that counts as a regression')
+
+
+class Benchmark():
+    """Times a function. Called like the `benchmark` fixture of pytest-benchmark."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.times: List[float] = []
+
+    def __call__(self, func: Callable, *args, **kwargs):
+        result = func(*args, **kwargs)  # Warm up
+        start = time.perf_counter()
+        while len(self.times) < MAX_ROUNDS and (len(self.times) < MIN_ROUNDS
+                                                or time.perf_counter() - start < MIN_TIME):
+            t_0 = time.perf_counter()
+            result = func(*args, **kwargs)
+            self.times.append(time.perf_counter() - t_0)
+
+        self._record()
+        return result
+
+    def pedantic(self, target: Callable, args=(), kwargs=None, setup: Callable = None, rounds=MIN_ROUNDS):
+        """Times `rounds` calls of `target`, calling `setup` (untimed) before each one"""
+        result = None
+        for _ in range(rounds):
+            if setup is not None:
+                setup()
+            t_0 = time.perf_counter()
+            result = target(*args, **(kwargs or {}))
+            self.times.append(time.perf_counter() - t_0)
+
+        self._record()
+        return result
+
+    def record(self, times: List[float]):
+        """Records times measured elsewhere (e.g. in a subprocess)"""
+        self.times.extend(times)
+        self._record()
+
+    def _record(self):
+        RESULTS[self.name] = {'min': min(self.times),
+                              'median': statistics.median(self.times),
+                              'mean': statistics.mean(self.times),
+                              'stddev': statistics.pstdev(self.times),
+                              'rounds': len(self.times)}
+
+
+@pytest.fixture
+def benchmark(request):
+    return Benchmark(request.node.nodeid.split('::', 1)[-1])
+
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    if not RESULTS:
+        return
+
+    save = config.getoption('--bench-save', default=None)
+    if save is not None:
+        Path(save).write_text(json.dumps({'machine': {'node': platform.node(),
+                                                      'python': platform.python_version(),
+                                                      'processor': platform.processor(),
+                                                      'cpus': os.cpu_count()},
+                                          'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                                          'benchmarks': RESULTS}, indent=2))
+
+    baseline = config.getoption('--bench-baseline', default=None)
+    if baseline is not None:
+        threshold = config.getoption('--bench-threshold', default=0.25)
+        REGRESSIONS.extend(compare(json.loads(Path(baseline).read_text())['benchmarks'], threshold))
+        if REGRESSIONS and exitstatus == 0:
+            session.exitstatus = 1
+
+
+def compare(baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """Returns a description of each benchmark whose median time is more than `threshold` slower
+    than in `baseline`"""
+    regressions = []
+    for name, result in RESULTS.items():
+        if name in baseline and result['median'] > baseline[name]['median'] * (1 + threshold):
+            regressions.append(f'{name}: {result["median"]*1e3:.3f} ms vs {baseline[name]["median"]*1e3:.3f} ms '
+                               f'({result["median"] / baseline[name]["median"] - 1:+.0%})')
+    return regressions
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not RESULTS:
+        return
+
+    terminalreporter.section('benchmarks')
+    width = max(len(name) for name in RESULTS)
+    terminalreporter.write_line(f'{"name":<{width}}  {"min (ms)":>10} {"median (ms)":>12} {"rounds":>7}')
+    for name, result in sorted(RESULTS.items()):
+        terminalreporter.write_line(f'{name:<{width}}  {result["min"]*1e3:>10.3f} {result["median"]*1e3:>12.3f} '
+                                    f'{result["rounds"]:>7d}')
+
+    if REGRESSIONS:
+        terminalreporter.section('benchmark regressions', red=True)
+        for line in REGRESSIONS:
+            terminalreporter.write_line(line, red=True)
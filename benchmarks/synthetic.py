@@ -0,0 +1,139 @@
+"""Synthetic inputs for the benchmarks"""
+from math import cos, pi, sin
+from typing import List, Tuple
+
+SCALES = {'small': 1, 'medium': 10, 'large': 100}
+"""Multipliers applied to the base size of each synthetic input"""
+
+
+def make_sphere_shell(n_rings: int, radius=1.0) -> Tuple[List[Tuple[float, float, float]], List[Tuple[int, int, int]]]:
+    """Returns the points and facets of a closed triangulated sphere with about 2*n_rings**2 facets"""
+    n_segments = 2 * n_rings
+    points = [(0.0, 0.0, radius)]
+    for i in range(1, n_rings):
+        theta = pi * i / n_rings
+        points += [(radius * sin(theta) * cos(2 * pi * j / n_segments),
+                    radius * sin(theta) * sin(2 * pi * j / n_segments),
+                    radius * cos(theta)) for j in range(n_segments)]
+    points.append((0.0, 0.0, -radius))
+
+    def ring(i, j):
+        return 1 + (i - 1) * n_segments + j % n_segments
+
+    facets = [(0, ring(1, j), ring(1, j + 1)) for j in range(n_segments)]
+    for i in range(1, n_rings - 1):
+        for j in range(n_segments):
+            facets.append((ring(i, j), ring(i + 1, j), ring(i + 1, j + 1)))
+            facets.append((ring(i, j), ring(i + 1, j + 1), ring(i, j + 1)))
+    south = len(points) - 1
+    facets += [(ring(n_rings - 1, j), south, ring(n_rings - 1, j + 1)) for j in range(n_segments)]
+
+    return points, facets
+
+
+def make_to_text(n_blocks: int, n_rows=20) -> str:
+    """Returns the text of a Tiem Orbit file with `n_blocks` blocks, each with parameters, an array
+    parameter, a subblock and a table"""
+    lines = ['$---------------------------------------------------------------------MDI_HEADER',
+             '[MDI_HEADER]',
+             "FILE_TYPE  =  'ssf'",
+             'FILE_VERSION  =  1.0']
+    for idx in range(n_blocks):
+        lines += [f'$--------------------------------------------------------------------BLOCK_{idx}',
+                  f'[BLOCK_{idx}]',
+                  "Integrator  =  'HHT'",
+                  f'Error  =  {1e-5 * (idx + 1):.2e}',
+                  f'Maxit  =  {idx + 10}',
+                  'Stability  =  1.0e-5, 1.0e-6, 1.0e-7',
+                  '(FUNNEL)',
+                  f'Maxit  =  {idx + 20}',
+                  '{ time  value }']
+        lines += [f' {row * 0.1:.3f}  {row * idx:.3f}' for row in range(n_rows)]
+    return '\n'.join(lines) + '\n'
+
+
+def make_macro_text(n_params: int) -> str:
+    """Returns the text of a macro with `n_params` parameters"""
+    lines = ['!USER_ENTERED_COMMAND bench_macro']
+    for idx in range(n_params):
+        kind = idx % 4
+        if kind == 0:
+            lines.append(f'!$param_{idx}:t=real:d={idx}.5')
+        elif kind == 1:
+            lines.append(f'!$param_{idx}:t=integer:c=1:d={idx}')
+        elif kind == 2:
+            lines.append(f'!$param_{idx}:t=list(a,b,c):d=a')
+        else:
+            lines.append(f'!$param_{idx}:t=marker')
+    lines.append('!END_OF_PARAMETERS')
+    lines += [f'marker modify marker_name = $param_{idx} location = 0, 0, 0' for idx in range(n_params)]
+    return '\n'.join(lines)
+
+
+def make_msg_text(n_steps: int, failed_step: int = None) -> str:
+    """Returns the text of an Adams Solver message file with a static funnel of `n_steps` steps"""
+    lines = [' Process ID:  12345', '']
+    for idx in range(n_steps):
+        lines += [f' command: equilibrium/stability={1e-5 / (idx + 1):.2e}',
+                  ' command: simulate/static',
+                  '   Begin Static Equilibrium Analysis',
+                  *[f'   Iteration {it}  Residual {10 ** -it:.2e}' for it in range(10)]]
+        if idx == failed_step:
+            lines.append(' ---- START: ERROR ----')
+            lines.append(' Static equilibrium analysis has not been successful.')
+        else:
+            lines.append('   Static Equilibrium Analysis completed successfully.')
+    lines.append(' command: stop')
+    return '\n'.join(lines)
+
+
+def make_model(n_parts: int, n_markers=10):
+    """Creates a fake Adams View model with `n_parts` parts of `n_markers` markers each (plus the cm
+    markers). Returns the model.
+
+    Requires the fake Adams View API (`test.fake_adams`).
+    """
+    import Adams  # type: ignore # pylint: disable=import-outside-toplevel
+
+    Adams.reset()
+    mod = Adams.Models.create(name='BENCH')
+    for idx in range(n_parts):
+        part = mod.Parts.create(name=f'PART_{idx}')
+        for jdx in range(n_markers):
+            part.Markers.create(name=f'MAR_{jdx}', location=[0.0, 0.0, float(jdx)])
+
+    return mod
+
+
+def make_contact_model(n_tracks: int, n_steps: int):
+    """Creates a fake Adams View model with a part in contact and an analysis with `n_tracks`
+    contact tracks of `n_steps` steps each. Returns the geometry, analysis and a marker on the part.
+
+    Requires the fake Adams View API (`test.fake_adams`).
+    """
+    import Adams  # type: ignore # pylint: disable=import-outside-toplevel
+
+    Adams.reset()
+    mod = Adams.Models.create(name='BENCH')
+    part = mod.Parts.create(name='PART_1', location=[0.0, 0.0, 1.0], orientation=[30.0, 45.0, 0.0])
+    mkr = part.Markers.create(name='REF', location=[0.1, 0.0, 0.0], orientation=[0.0, 0.0, 90.0])
+    geom = part.Geometries.createEllipsoid(name='GEOM')
+    mod.Contacts.create(name='CONTACT_1', i_geometry=[geom], j_geometry=[])
+    ans = mod.Analyses.create(name='ANS')
+
+    times = [0.01 * step for step in range(n_steps)]
+    ans.create_result_set('TIME', {'TIME': times})
+    ans.create_result_set('PART_1_XFORM', {'X': [0.1 * t for t in times],
+                                           'Y': [0.0] * n_steps,
+                                           'Z': [1.0] * n_steps,
+                                           'PSI': [30.0 + t for t in times],
+                                           'THETA': [45.0] * n_steps,
+                                           'PHI': [10.0 * t for t in times]})
+    for idx in range(1, n_tracks + 1):
+        track = f'CONTACT_1.track_{idx}'
+        xyz = {d: [sin(t * (idx + k)) for t in times] for k, d in enumerate('XYZ')}
+        for result in ('I_Point', 'I_Normal_Force', 'I_Normal_Unit_Vector', 'I_Friction_Force', 'Slip_Velocity'):
+            ans.create_result_set(f'{track}.{result}', xyz)
+        ans.create_result_set(f'{track}.Penetration', {'Depth': [1e-4] * n_steps})
+
+    return geom, ans, mkr
@@ -14,6 +14,7 @@ setuptools.setup(
     long_description_content_type='text/markdown',
     url='https://github.com/bthornton191/aviewpy',
     packages=setuptools.find_packages(exclude=['test',
+                                               'benchmarks',
                                                'pkg',
                                                'env',
                                                'docs',
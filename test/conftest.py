@@ -0,0 +1,5 @@
+"""Lets pytest import the aviewpy modules outside Adams View by falling back to the fake Adams
+View API in `test.fake_adams`"""
+from test.fake_adams import install
+
+install()
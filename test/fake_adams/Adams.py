@@ -0,0 +1,97 @@
+"""Fake of the `Adams` module of the Adams View Python API.
+
+`execute_cmd` records each command and interprets the ones aviewpy relies on (see `_command`).
+`evaluate_exp` evaluates the db_* functions, `loc_global`/`ori_global`, design variables, object
+attributes and result values (see `_expression`). Both, and every object manager access, wait for
+the latency set with `set_latency`.
+"""
+import re
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import DBAccess
+import _command
+import _expression
+from Manager import AdamsManager
+from Model import Model
+
+Models = AdamsManager(None, Model)
+
+COMMANDS: List[str] = []
+"""Commands passed to `execute_cmd` since the last `reset`"""
+
+EXPRESSIONS: List[str] = []
+"""Expressions passed to `evaluate_exp` since the last `reset`"""
+
+CALLS = DBAccess.CALLS
+"""Number of `execute_cmd`, `evaluate_exp` and object manager calls since the last `reset`"""
+
+
+def execute_cmd(cmd: str):
+    DBAccess.round_trip('execute_cmd')
+    COMMANDS.append(cmd)
+    _command.execute(cmd)
+
+
+def evaluate_exp(exp: str):
+    DBAccess.round_trip('evaluate_exp')
+    EXPRESSIONS.append(exp)
+    return _expression.evaluate(exp)
+
+
+def getCurrentModel() -> Model:  # pylint: disable=invalid-name
+    models = list(Models._objects.values())
+    return models[-1] if models else None
+
+
+def write_command_file(file_name: str, model: Model):
+    DBAccess.round_trip('execute_cmd')
+    Path(file_name).write_text(f'model create model_name = {model.full_name}\n')
+
+
+def read_command_file(file_name: str):
+    execute_cmd(f'file command read file_name = "{file_name}"')
+
+
+def set_latency(execute_cmd: float = None, evaluate_exp: float = None, manager: float = None):
+    """Sets the artificial latency in seconds of each kind of call. None leaves it unchanged."""
+    for kind, latency in (('execute_cmd', execute_cmd), ('evaluate_exp', evaluate_exp), ('manager', manager)):
+        if latency is not None:
+            DBAccess.LATENCY[kind] = latency
+
+
+def fail_commands(pattern: str):
+    """Makes commands matching the regular expression `pattern` fail"""
+    _command.FAIL_PATTERNS.append(re.compile(pattern, flags=re.IGNORECASE))
+
+
+def set_log_file(file_name: str):
+    """Appends every command and its errors to `file_name`, like the aview.log session log"""
+    _command.LOG_FILE = file_name
+
+
+def set_command_file_on_error(on_error: str):
+    """Sets whether reading a command file 'continue's after a command fails or 'abort's"""
+    if on_error not in ('continue', 'abort'):
+        raise ValueError(f'on_error must be "continue" or "abort", not {on_error!r}')
+    _command.COMMAND_FILE_ON_ERROR = on_error
+
+
+def register_command(keywords: str, handler: Callable[[Dict[str, List[str]]], None]):
+    """Interprets commands starting with `keywords` with `handler(args)`"""
+    _command.register(keywords, handler)
+
+
+def reset():
+    """Deletes all models and variables, and clears the recorded calls and the latency"""
+    Models._objects.clear()
+    DBAccess.reset()
+    _command.reset()
+    COMMANDS.clear()
+    EXPRESSIONS.clear()
+    _expression.SIM_PREFERENCES.clear()
+    _expression.SIM_PREFERENCES.update(_expression.DEFAULT_SIM_PREFERENCES)
+    set_latency(0.0, 0.0, 0.0)
+
+
+reset()
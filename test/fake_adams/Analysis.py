@@ -0,0 +1,83 @@
+from typing import Dict, List, Sequence
+
+from Manager import AdamsManager
+from Object import ObjectBase, ObjectComment
+
+
+class ResultComponent(ObjectBase):
+    class_name = 'result_set_component'
+    db_types = ('result_set_component',)
+    default_prefix = 'COMPONENT'
+
+    def __init__(self, parent=None, name=None, _manager=None, values=(), units='no_units', **kwargs):
+        super().__init__(parent, name, _manager, values=list(values), units=units, **kwargs)
+
+
+class ResultSet(ObjectBase):
+    """Result set. Holds components and, for contact results, other result sets."""
+    class_name = 'result_set'
+    db_types = ('result_set',)
+    default_prefix = 'RESULT_SET'
+
+    def _init_managers(self):
+        self.__dict__['ResultSets'] = AdamsManager(self, ResultSet)
+        self.__dict__['Components'] = AdamsManager(self, ResultComponent)
+
+    @property
+    def values(self) -> List[float]:
+        """Values of the component named like the result set (e.g. TIME), or of the only component"""
+        components = self.Components._objects
+        component = components.get(self.name.lower())
+        if component is None and len(components) == 1:
+            component = next(iter(components.values()))
+        if component is None:
+            raise AttributeError(f'{self.full_name} has more than one component')
+        return list(component.values)
+
+    def create_component(self, name: str, values: Sequence[float], units='no_units') -> ResultComponent:
+        existing = self.Components._objects.get(name.lower())
+        if existing is not None:
+            existing.values = list(values)
+            return existing
+        return self.Components._create(ResultComponent, name, values=values, units=units)
+
+    def create_result_set(self, name: str) -> 'ResultSet':
+        return self.ResultSets._objects.get(name.lower()) or self.ResultSets._create(ResultSet, name)
+
+    def _items(self) -> Dict[str, ObjectBase]:
+        return {**self.ResultSets._objects, **self.Components._objects}
+
+    def __getitem__(self, name: str):
+        return self._items()[name.lower()]
+
+    def __contains__(self, name: str) -> bool:
+        return name.lower() in self._items()
+
+    def __iter__(self):
+        return iter([obj.name for obj in self._items().values()])
+
+    def keys(self):
+        return list(self)
+
+
+class Analysis(ObjectComment):
+    class_name = 'analysis'
+    db_types = ('analysis',)
+    default_prefix = 'Last_Run'
+
+    def _init_managers(self):
+        super()._init_managers()
+        self.__dict__['results'] = AdamsManager(self, ResultSet)
+
+    def create_result_set(self, path: str, components: Dict[str, Sequence[float]] = None) -> ResultSet:
+        """Creates a result set and its parents, e.g. `create_result_set('CONTACT_1.track_1.I_Point',
+        {'X': [...], 'Y': [...], 'Z': [...]})`"""
+        names = path.split('.')
+        res = self.results._objects.get(names[0].lower()) or self.results._create(ResultSet, names[0])
+        for name in names[1:]:
+            res = res.create_result_set(name)
+
+        for comp_name, values in (components or {}).items():
+            res.create_component(comp_name, values)
+
+        return res
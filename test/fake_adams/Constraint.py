@@ -0,0 +1,25 @@
+from Object import Object
+
+
+class Constraint(Object):
+    class_name = 'constraint'
+    db_types = ('constraint', 'joint')
+    default_prefix = 'JOINT'
+    id_type = 'joint'
+
+
+class JointRevolute(Constraint):
+    class_name = 'revolute_joint'
+
+
+class JointFixed(Constraint):
+    class_name = 'fixed_joint'
+
+
+class JointTranslational(Constraint):
+    class_name = 'translational_joint'
+
+
+CREATORS = {'createRevolute': JointRevolute,
+            'createFixed': JointFixed,
+            'createTranslational': JointTranslational}
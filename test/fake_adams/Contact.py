@@ -0,0 +1,12 @@
+from Object import Object
+
+
+class Contact(Object):
+    class_name = 'contact'
+    db_types = ('contact',)
+    default_prefix = 'CONTACT'
+    id_type = 'contact'
+
+    def __init__(self, parent=None, name=None, _manager=None, i_geometry=(), j_geometry=(), **kwargs):
+        super().__init__(parent, name, _manager, i_geometry=list(i_geometry), j_geometry=list(j_geometry),
+                         **kwargs)
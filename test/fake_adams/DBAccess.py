@@ -0,0 +1,48 @@
+"""Object registry and round trip accounting of the fake Adams View database"""
+import time
+from collections import Counter
+from typing import Dict
+
+LATENCY: Dict[str, float] = {'execute_cmd': 0.0, 'evaluate_exp': 0.0, 'manager': 0.0}
+"""Artificial latency in seconds added to each call of the given kind"""
+
+CALLS = Counter()
+"""Number of calls of each kind since the last `reset`"""
+
+REGISTRY: Dict[str, object] = {}
+"""Database objects keyed on their lower case full name"""
+
+
+class SetValueFailed(Exception):
+    pass
+
+
+def round_trip(kind: str):
+    """Counts a call into the database and waits for its artificial latency"""
+    CALLS[kind] += 1
+    latency = LATENCY.get(kind, 0.0)
+    if latency > 0.002:
+        time.sleep(latency)
+    elif latency > 0:
+        # time.sleep is too coarse for sub-millisecond latencies
+        end = time.perf_counter() + latency
+        while time.perf_counter() < end:
+            pass
+
+
+def find_by_full_name(full_name: str):
+    """Returns the object named `full_name`, or None"""
+    return REGISTRY.get(full_name.lower())
+
+
+def register(obj):
+    REGISTRY[obj.full_name.lower()] = obj
+
+
+def unregister(obj):
+    REGISTRY.pop(obj.full_name.lower(), None)
+
+
+def reset():
+    REGISTRY.clear()
+    CALLS.clear()
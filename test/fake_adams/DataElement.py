@@ -0,0 +1,24 @@
+from Object import Object
+
+
+class DataElement(Object):
+    class_name = 'data_element'
+    db_types = ('data_element',)
+    default_prefix = 'DATA_ELEMENT'
+    id_type = 'data_element'
+
+
+class DataElementSpline(DataElement):
+    class_name = 'spline'
+    db_types = ('data_element', 'spline')
+    default_prefix = 'SPLINE'
+
+
+class DataElementArray(DataElement):
+    class_name = 'array'
+    db_types = ('data_element', 'array')
+    default_prefix = 'ARRAY'
+
+
+CREATORS = {'createSpline': DataElementSpline,
+            'createArray': DataElementArray}
@@ -0,0 +1,24 @@
+from Manager import AdamsManager
+from Object import ObjectBase
+
+
+class DesignVariable(ObjectBase):
+    class_name = 'design_variable'
+    db_types = ('variable', 'design_variable')
+    default_prefix = 'DV'
+
+    def __init__(self, parent=None, name: str = None, _manager: AdamsManager = None, value=None, **kwargs):
+        super().__init__(parent, name, _manager, value=list(value) if value is not None else [], **kwargs)
+
+    def update(self, **kwargs):
+        for attr, value in kwargs.items():
+            setattr(self, attr, list(value) if attr == 'value' else value)
+
+
+class DesignVariableManager(AdamsManager):
+
+    def __init__(self, parent):
+        super().__init__(parent, DesignVariable, {'createString': DesignVariable,
+                                                  'createReal': DesignVariable,
+                                                  'createInteger': DesignVariable,
+                                                  'createObject': DesignVariable})
@@ -0,0 +1,32 @@
+from Object import Object
+
+
+class Force(Object):
+    class_name = 'force'
+    db_types = ('force',)
+    default_prefix = 'SFORCE'
+
+
+class SingleComponentForce(Force):
+    class_name = 'single_component_force'
+    db_types = ('force', 'single_component_force', 'sforce')
+    id_type = 'sforce'
+
+
+class GeneralForce(Force):
+    class_name = 'general_force'
+    db_types = ('force', 'general_force', 'gforce')
+    default_prefix = 'GFORCE'
+    id_type = 'gforce'
+
+
+class ForceVector(Force):
+    class_name = 'force_vector'
+    db_types = ('force', 'force_vector', 'vforce')
+    default_prefix = 'VFORCE'
+    id_type = 'vforce'
+
+
+CREATORS = {'createSingleComponentForce': SingleComponentForce,
+            'createGeneralForce': GeneralForce,
+            'createForceVector': ForceVector}
@@ -0,0 +1,37 @@
+from Object import Object
+
+
+class Geometry(Object):
+    class_name = 'geometry'
+    db_types = ('geometry',)
+    default_prefix = 'GEOM'
+
+
+class GeometryShell(Geometry):
+    class_name = 'shell'
+    db_types = ('geometry', 'shell')
+    default_prefix = 'SHELL'
+
+
+class GeometryEllipsoid(Geometry):
+    class_name = 'ellipsoid'
+    db_types = ('geometry', 'ellipsoid')
+    default_prefix = 'ELLIPSOID'
+
+
+class GeometryForce(Geometry):
+    class_name = 'graphic_force'
+    db_types = ('geometry', 'force_graphic')
+    default_prefix = 'FORCE_GRAPHIC'
+
+
+class GeometryGContact(Geometry):
+    class_name = 'graphic_contact'
+    db_types = ('geometry', 'contact_graphic')
+    default_prefix = 'CONTACT_GRAPHIC'
+
+
+CREATORS = {'createShell': GeometryShell,
+            'createEllipsoid': GeometryEllipsoid,
+            'createForce': GeometryForce,
+            'createGContact': GeometryGContact}
@@ -0,0 +1,10 @@
+from Object import Object
+
+
+class Group(Object):
+    class_name = 'group'
+    db_types = ('group',)
+    default_prefix = 'GROUP'
+
+    def __init__(self, parent=None, name=None, _manager=None, objects=(), **kwargs):
+        super().__init__(parent, name, _manager, objects=list(objects), **kwargs)
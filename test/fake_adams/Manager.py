@@ -0,0 +1,91 @@
+from typing import Dict
+
+import DBAccess
+
+
+class AdamsManager():
+    """Mapping of the child objects of one type, keyed on their names
+
+    Parameters
+    ----------
+    parent : ObjectBase
+        The object the managed objects belong to
+    managed_class : type
+        Class of the objects created by `create`
+    creators : Dict[str, type], optional
+        Classes created by other `create*` methods, e.g. {'createSingleComponentForce': ...}
+    """
+
+    def __init__(self, parent, managed_class: type, creators: Dict[str, type] = None):
+        self._parent = parent
+        self._class = managed_class
+        self._creators = creators or {}
+        self._objects: Dict[str, object] = {}
+
+    def create(self, name: str = None, **kwargs):
+        DBAccess.round_trip('manager')
+        return self._create(self._class, name, **kwargs)
+
+    def __getattr__(self, attr: str):
+        creators = self.__dict__.get('_creators', {})
+        if attr not in creators:
+            raise AttributeError(attr)
+
+        def create(name: str = None, **kwargs):
+            DBAccess.round_trip('manager')
+            return self._create(creators[attr], name, **kwargs)
+
+        return create
+
+    def __getitem__(self, name: str):
+        DBAccess.round_trip('manager')
+        return self._objects[name.lower()]
+
+    def __contains__(self, name) -> bool:
+        DBAccess.round_trip('manager')
+        return getattr(name, 'name', name).lower() in self._objects
+
+    def __iter__(self):
+        DBAccess.round_trip('manager')
+        return iter([obj.name for obj in self._objects.values()])
+
+    def __len__(self):
+        DBAccess.round_trip('manager')
+        return len(self._objects)
+
+    def keys(self):
+        DBAccess.round_trip('manager')
+        return [obj.name for obj in self._objects.values()]
+
+    def values(self):
+        DBAccess.round_trip('manager')
+        return list(self._objects.values())
+
+    def items(self):
+        DBAccess.round_trip('manager')
+        return [(obj.name, obj) for obj in self._objects.values()]
+
+    def get(self, name: str, default=None):
+        DBAccess.round_trip('manager')
+        return self._objects.get(name.lower(), default)
+
+    def _create(self, cls: type, name: str = None, **kwargs):
+        if name is None:
+            idx = len(self._objects) + 1
+            while f'{cls.default_prefix}_{idx}'.lower() in self._objects:
+                idx += 1
+            name = f'{cls.default_prefix}_{idx}'
+
+        if name.lower() in self._objects or DBAccess.find_by_full_name(self._child_name(name)):
+            raise ValueError(f'An object named {self._child_name(name)} already exists')
+
+        return cls(self._parent, name, _manager=self, **kwargs)
+
+    def _child_name(self, name: str) -> str:
+        return f'{self._parent.full_name}.{name}' if self._parent is not None else f'.{name}'
+
+    def _add(self, obj):
+        self._objects[obj.name.lower()] = obj
+
+    def _remove(self, obj):
+        self._objects.pop(obj.name.lower(), None)
@@ -0,0 +1,21 @@
+from Object import Object
+
+import _transforms as transforms
+
+
+class Marker(Object):
+    """Marker. `location` and `orientation` are relative to the parent part."""
+    class_name = 'marker'
+    db_types = ('marker',)
+    default_prefix = 'MARKER'
+    id_type = 'marker'
+
+    def __init__(self, parent=None, name=None, _manager=None, location=(0.0, 0.0, 0.0),
+                 orientation=(0.0, 0.0, 0.0), relative_to=None, **kwargs):
+        if relative_to is not None and relative_to != parent:
+            location, orientation = transforms.relative_to(parent, *transforms.to_global(relative_to, location, orientation))
+        super().__init__(parent, name, _manager, location=list(location), orientation=list(orientation), **kwargs)
+
+    @property
+    def location_global(self):
+        return transforms.to_global(self, (0.0, 0.0, 0.0), (0.0, 0.0, 0.0))[0]
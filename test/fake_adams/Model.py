@@ -0,0 +1,37 @@
+import Constraint
+import DataElement
+import Force
+from Analysis import Analysis
+from Contact import Contact
+from Group import Group
+from Manager import AdamsManager
+from Object import ObjectComment
+from Part import Part
+from Simulation import Simulation
+from UDE import UserDefinedInstance
+
+
+class Model(ObjectComment):
+    class_name = 'model'
+    db_types = ('model',)
+    default_prefix = 'MODEL'
+
+    def __init__(self, parent=None, name=None, _manager=None, **kwargs):
+        super().__init__(parent, name, _manager, **kwargs)
+        self.Parts._create(Part, 'ground')
+
+    def _init_managers(self):
+        super()._init_managers()
+        self.__dict__['Parts'] = AdamsManager(self, Part, {'createRigidBody': Part})
+        self.__dict__['Constraints'] = AdamsManager(self, Constraint.Constraint, Constraint.CREATORS)
+        self.__dict__['Forces'] = AdamsManager(self, Force.SingleComponentForce, Force.CREATORS)
+        self.__dict__['Contacts'] = AdamsManager(self, Contact)
+        self.__dict__['DataElements'] = AdamsManager(self, DataElement.DataElement, DataElement.CREATORS)
+        self.__dict__['Analyses'] = AdamsManager(self, Analysis)
+        self.__dict__['Simulations'] = AdamsManager(self, Simulation)
+        self.__dict__['Groups'] = AdamsManager(self, Group)
+        self.__dict__['UDEInstances'] = AdamsManager(self, UserDefinedInstance)
+
+    @property
+    def ground_part(self) -> Part:
+        return self.Parts._objects['ground']
@@ -0,0 +1,164 @@
+from typing import List
+
+import DBAccess
+from Manager import AdamsManager
+
+
+class DuplicateAttributeError(Exception):
+    pass
+
+
+class ObjectBase():
+    """Base class of the fake database objects
+
+    Class Attributes
+    ----------------
+    class_name : str
+        Returned by `className()`
+    db_types : tuple
+        Type names matched by the db_* expression functions (e.g. "part")
+    default_prefix : str
+        Prefix of the names given to objects created without one
+    id_type : str
+        Type whose adams ids must be unique within a model, or None if the object has no adams id
+    """
+    class_name = 'object'
+    db_types = ('object',)
+    default_prefix = 'OBJECT'
+    id_type = None
+
+    def __init__(self, parent=None, name: str = None, _manager: AdamsManager = None, **kwargs):
+        self.__dict__['_parent'] = parent
+        self.__dict__['_name'] = name
+        self.__dict__['_manager_ref'] = (_manager,)  # Not an attribute, so get_managers skips it
+        self._init_managers()
+        if self.id_type is not None:
+            self.__dict__['adams_id'] = kwargs.pop('adams_id', None) or self._next_adams_id()
+
+        if _manager is not None:
+            _manager._add(self)
+        DBAccess.register(self)
+
+        for attr, value in kwargs.items():
+            setattr(self, attr, value)
+
+    def _init_managers(self):
+        pass
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @name.setter
+    def name(self, value: str):
+        descendants = [self, *self._descendants()]
+        for obj in descendants:
+            DBAccess.unregister(obj)
+        if self._manager is not None:
+            self._manager._remove(self)
+        self.__dict__['_name'] = value
+        if self._manager is not None:
+            self._manager._add(self)
+        for obj in descendants:
+            DBAccess.register(obj)
+
+    @property
+    def _manager(self) -> AdamsManager:
+        return self._manager_ref[0]
+
+    @property
+    def parent(self):
+        return self._parent
+
+    @property
+    def full_name(self) -> str:
+        return f'{self._parent.full_name}.{self._name}' if self._parent is not None else f'.{self._name}'
+
+    @property
+    def properties(self) -> List[str]:
+        return [attr for attr, value in self.__dict__.items()
+                if not attr.startswith('_') and not isinstance(value, AdamsManager)]
+
+    def className(self) -> str:  # pylint: disable=invalid-name
+        return self.class_name
+
+    def __setattr__(self, attr: str, value):
+        if attr == 'adams_id' and self.id_type is not None:
+            self._check_adams_id(value)
+        super().__setattr__(attr, value)
+
+    def destroy(self):
+        for obj in [self, *self._descendants()]:
+            DBAccess.unregister(obj)
+        if self._manager is not None:
+            self._manager._remove(self)
+
+    def copy(self, new_name: str = None):
+        """Copies the object (but not its children) into the same manager"""
+        if new_name is None:
+            idx = 2
+            while self._manager._child_name(f'{self.name}_{idx}').lower() in DBAccess.REGISTRY:
+                idx += 1
+            new_name = f'{self.name}_{idx}'
+
+        kwargs = {attr: getattr(self, attr) for attr in self.properties if attr != 'adams_id'}
+        return self._manager._create(type(self), new_name, **kwargs)
+
+    def _managers(self) -> List[AdamsManager]:
+        return [mgr for mgr in self.__dict__.values() if isinstance(mgr, AdamsManager)]
+
+    def _children(self) -> list:
+        return [obj for mgr in self._managers() for obj in mgr._objects.values()]
+
+    def _descendants(self) -> list:
+        descendants = []
+        for child in self._children():
+            descendants.append(child)
+            descendants.extend(child._descendants())
+        return descendants
+
+    def _model(self):
+        obj = self
+        while obj._parent is not None:
+            obj = obj._parent
+        return obj
+
+    def _next_adams_id(self) -> int:
+        model = self._model()
+        next_ids = model.__dict__.setdefault('_next_ids', {})
+        next_ids[self.id_type] = next_ids.get(self.id_type, 0) + 1
+        return next_ids[self.id_type]
+
+    def _check_adams_id(self, adams_id: int):
+        if not adams_id:
+            return
+        model = self._model()
+        for obj in DBAccess.REGISTRY.values():
+            if (obj is not self and obj.id_type == self.id_type and obj.__dict__.get('adams_id') == adams_id
+                    and obj._model() is model):
+                raise DuplicateAttributeError(f'adams_id {adams_id} is already used by {obj.full_name}')
+
+    def __eq__(self, other):
+        return isinstance(other, ObjectBase) and self.full_name.lower() == other.full_name.lower()
+
+    def __hash__(self):
+        return hash(self.full_name.lower())
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {self.full_name}>'
+
+
+class ObjectComment(ObjectBase):
+    """Object that can own design variables"""
+
+    def _init_managers(self):
+        from DesignVariable import DesignVariableManager  # pylint: disable=import-outside-toplevel
+        self.__dict__['DesignVariables'] = DesignVariableManager(self)
+
+
+class ObjectSubBase(ObjectComment):
+    pass
+
+
+class Object(ObjectSubBase):
+    pass
@@ -0,0 +1,28 @@
+import Geometry
+from Manager import AdamsManager
+from Marker import Marker
+from Object import Object
+
+
+class Part(Object):
+    """Rigid body part. `location` and `orientation` are global."""
+    class_name = 'rigid_body'
+    db_types = ('part', 'rigid_body')
+    default_prefix = 'PART'
+    id_type = 'part'
+
+    def __init__(self, parent=None, name=None, _manager=None, location=(0.0, 0.0, 0.0),
+                 orientation=(0.0, 0.0, 0.0), mass=1.0, **kwargs):
+        super().__init__(parent, name, _manager, location=list(location), orientation=list(orientation),
+                         mass=mass, **kwargs)
+        if name.lower() != 'ground':
+            self.Markers._create(Marker, 'cm')
+
+    def _init_managers(self):
+        super()._init_managers()
+        self.__dict__['Markers'] = AdamsManager(self, Marker)
+        self.__dict__['Geometries'] = AdamsManager(self, Geometry.Geometry, Geometry.CREATORS)
+
+    @property
+    def cm(self) -> Marker:
+        return self.Markers._objects.get('cm')
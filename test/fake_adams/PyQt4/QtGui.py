@@ -0,0 +1,28 @@
+class QApplication():
+
+    @staticmethod
+    def instance():
+        """There is never a running application, so aviewpy skips its GUI updates"""
+        return None
+
+
+class QMessageBox():
+    Warning = 2
+    Ok = 0x400
+
+    def __getattr__(self, _):
+        return lambda *args, **kwargs: None
+
+    def exec_(self):
+        return self.Ok
+
+
+class QFileDialog():
+
+    @staticmethod
+    def getOpenFileName(*_, **__):  # pylint: disable=invalid-name
+        return ''
+
+    @staticmethod
+    def getSaveFileName(*_, **__):  # pylint: disable=invalid-name
+        return ''
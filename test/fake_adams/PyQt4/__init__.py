@@ -0,0 +1 @@
+"""Headless stand-in for the parts of PyQt4 (shipped with Adams View) that aviewpy imports"""
@@ -0,0 +1,18 @@
+from Object import ObjectComment
+
+
+class Simulation(ObjectComment):
+    class_name = 'simulation_script'
+    db_types = ('simulation_script', 'sim_script')
+    default_prefix = 'SIM_SCRIPT'
+
+    def __init__(self, parent=None, name=None, _manager=None, end_time=1.0, number_of_steps=10,
+                 script_type='simple', commands=(), **kwargs):
+        super().__init__(parent, name, _manager, end_time=end_time, number_of_steps=number_of_steps,
+                         script_type=script_type, commands=list(commands), **kwargs)
+
+    def simulate(self):
+        """Replaces the Last_Run analysis of the model with one holding only TIME results"""
+        import Adams  # pylint: disable=import-outside-toplevel
+        Adams.execute_cmd(f'simulation single_run scripted model_name={self.parent.full_name} '
+                          f'sim_script_name={self.full_name}')
@@ -0,0 +1,15 @@
+from Object import Object
+
+
+class UserDefinedElement(Object):
+    class_name = 'user_defined_element'
+    db_types = ('ude',)
+    default_prefix = 'UDE'
+
+    def __init__(self, parent=None, name=None, _manager=None, objects=(), **kwargs):
+        super().__init__(parent, name, _manager, objects=list(objects), **kwargs)
+
+
+class UserDefinedInstance(UserDefinedElement):
+    class_name = 'user_defined_instance'
+    db_types = ('ude', 'ude_instance')
@@ -0,0 +1,44 @@
+"""In-memory stand-in for the subset of the Adams View Python API that aviewpy uses.
+
+Lets aviewpy modules be imported, tested and benchmarked without Adams View.
+
+Example
+-------
+>>> from test.fake_adams import install
+>>> Adams = install()
+>>> mod = Adams.Models.create(name='MOD')
+>>> part = mod.Parts.create(name='PART_1', location=[1.0, 0.0, 0.0])
+>>> Adams.set_latency(evaluate_exp=1e-3)
+>>> Adams.evaluate_exp('loc_global({0,0,0}, .MOD.PART_1.cm)')
+[1.0, 0.0, 0.0]
+"""
+import importlib
+import sys
+from pathlib import Path
+
+FAKE_ADAMS_DIR = Path(__file__).parent
+
+
+def install(force=False):
+    """Makes the fake Adams modules importable and returns the `Adams` module.
+
+    Parameters
+    ----------
+    force : bool, optional
+        If True, use the fake even if the real Adams View API can be imported, by default False
+    """
+    if not force:
+        try:
+            return importlib.import_module('Adams')
+        except ImportError:
+            pass
+
+    if str(FAKE_ADAMS_DIR) not in sys.path:
+        sys.path.insert(0, str(FAKE_ADAMS_DIR))
+
+    return importlib.import_module('Adams')
+
+
+def is_fake(adams_module) -> bool:
+    """Returns True if `adams_module` is the fake"""
+    return Path(getattr(adams_module, '__file__', '') or '').parent == FAKE_ADAMS_DIR
@@ -0,0 +1,328 @@
+"""Interpreter for the subset of Adams View commands used by aviewpy.
+
+Commands that are not recognised are only recorded.
+"""
+import re
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import DBAccess
+import _expression
+from Analysis import Analysis
+from DesignVariable import DesignVariableManager
+from Object import ObjectBase
+
+ROOT_VARIABLES = DesignVariableManager(None)
+"""Design variables that do not belong to an object (e.g. `.aviewpy_command_batch_progress`)"""
+
+GROUPS: Dict[str, List[str]] = {}
+"""Members of the command-language groups (e.g. SELECT_LIST), keyed on the lower case group name"""
+
+FAIL_PATTERNS: List[re.Pattern] = []
+"""Commands matching any of these raise a `CommandError`"""
+
+EXECUTED: List[str] = []
+"""Every command executed, including those read from command files"""
+
+LOG_FILE: Path = None
+"""Session log (like aview.log) that every command and its errors are appended to, if set"""
+
+COMMAND_FILE_ON_ERROR = 'continue'
+"""'continue' to read the rest of a command file after a command fails, or 'abort' to stop"""
+
+SOLVER_PREFERENCES = ['internal', 'external', 'write_files_only']
+
+
+class CommandError(RuntimeError):
+    pass
+
+
+def execute(cmd: str):
+    """Executes a single command"""
+    EXECUTED.append(cmd)
+    _log(cmd)
+    try:
+        if any(pattern.search(cmd) for pattern in FAIL_PATTERNS):
+            raise CommandError(f'ERROR: {cmd}')
+
+        keywords, args = parse(cmd)
+        handler = _get_handler(keywords)
+        if handler is not None:
+            handler(args)
+    except Exception as err:
+        _log(f'! ERROR: {err}')
+        raise
+
+
+def _log(line: str):
+    if LOG_FILE is not None:
+        with open(LOG_FILE, 'a') as fid:
+            fid.write(line + '\n')
+
+
+def parse(cmd: str) -> Tuple[List[str], Dict[str, List[str]]]:
+    """Splits a command into its keywords and its arguments"""
+    tokens = _tokenize(cmd)
+    keywords = []
+    idx = 0
+    while idx < len(tokens) and not (idx + 1 < len(tokens) and tokens[idx + 1] == '='):
+        keywords.append(tokens[idx].lower())
+        idx += 1
+
+    args: Dict[str, List[str]] = {}
+    while idx + 1 < len(tokens):
+        name = tokens[idx].lower()
+        idx += 2
+        values = []
+        while idx < len(tokens) and not (idx + 1 < len(tokens) and tokens[idx + 1] == '='):
+            if tokens[idx] != ',':
+                values.append(tokens[idx])
+            idx += 1
+        args[name] = values
+
+    return keywords, args
+
+
+def register(keywords: str, handler: Callable[[Dict[str, List[str]]], None]):
+    """Registers a handler for commands starting with `keywords` (e.g. 'marker modify')"""
+    HANDLERS.insert(0, (tuple(keywords.lower().split()), handler))
+
+
+def reset():
+    global LOG_FILE, COMMAND_FILE_ON_ERROR  # pylint: disable=global-statement
+    ROOT_VARIABLES._objects.clear()
+    GROUPS.clear()
+    FAIL_PATTERNS.clear()
+    EXECUTED.clear()
+    LOG_FILE = None
+    COMMAND_FILE_ON_ERROR = 'continue'
+
+
+def _tokenize(cmd: str) -> List[str]:
+    tokens = []
+    pos = 0
+    while pos < len(cmd):
+        char = cmd[pos]
+        if char.isspace():
+            pos += 1
+        elif char == '!':
+            break
+        elif char in '"\'':
+            end = cmd.index(char, pos + 1)
+            tokens.append(cmd[pos:end + 1])
+            pos = end + 1
+        elif char == '(':
+            depth, end = 0, pos
+            for end in range(pos, len(cmd)):
+                depth += {'(': 1, ')': -1}.get(cmd[end], 0)
+                if depth == 0:
+                    break
+            tokens.append(cmd[pos:end + 1])
+            pos = end + 1
+        elif char in '=,':
+            tokens.append(char)
+            pos += 1
+        else:
+            end = pos
+            while end < len(cmd) and not cmd[end].isspace() and cmd[end] not in '=,!':
+                end += 1
+            tokens.append(cmd[pos:end])
+            pos = end
+
+    return tokens
+
+
+def _get_handler(keywords: List[str]):
+    for pattern, handler in HANDLERS:
+        if len(keywords) >= len(pattern) and all(p.startswith(k) for k, p in zip(keywords, pattern)):
+            return handler
+    return None
+
+
+def _arg(args: Dict[str, List[str]], name: str, default=None) -> List[str]:
+    """Returns the values of the argument `name`, which may be abbreviated in the command"""
+    for key, values in args.items():
+        if name.startswith(key):
+            return values
+    return default
+
+
+def _value(token: str):
+    if token[0] in '"\'':
+        return token[1:-1]
+    if token.startswith('('):
+        return _expression.evaluate(token[1:-1])
+    try:
+        return int(token)
+    except ValueError:
+        pass
+    try:
+        return float(token)
+    except ValueError:
+        return DBAccess.find_by_full_name(token) or token
+
+
+def _object(token: str) -> ObjectBase:
+    value = _value(token)
+    obj = value if isinstance(value, ObjectBase) else DBAccess.find_by_full_name(str(value))
+    if obj is None:
+        raise CommandError(f'ERROR: The object {token} does not exist')
+    return obj
+
+
+def _split_name(full_name: str) -> Tuple[ObjectBase, str]:
+    parent_name, name = full_name.rsplit('.', 1)
+    return (_object(parent_name) if parent_name else None), name
+
+
+def _file_command_read(args):
+    file_name = Path(_value(_arg(args, 'file_name')[0]))
+    if not file_name.suffix:
+        file_name = file_name.with_suffix('.cmd')
+
+    statement = ''
+    for line in file_name.read_text().splitlines():
+        line = line.split('!', 1)[0].rstrip() if not line.lstrip().startswith('!') else ''
+        if line.endswith('&'):
+            statement += line[:-1] + ' '
+            continue
+        statement += line
+        if statement.strip():
+            try:
+                execute(statement.strip())
+            except Exception:  # pylint: disable=broad-except
+                # The error is in the log. Whether Adams View reads on depends on the session.
+                if COMMAND_FILE_ON_ERROR == 'abort':
+                    raise
+        statement = ''
+
+
+def _variable_set(args):
+    parent, name = _split_name(_arg(args, 'variable_name')[0])
+    manager = parent.DesignVariables if parent is not None else ROOT_VARIABLES
+    for arg_name, convert in (('integer_value', int), ('real_value', float), ('string_value', str),
+                              ('object_value', None)):
+        tokens = _arg(args, arg_name)
+        if tokens is not None:
+            value = [convert(_value(t)) if convert is not None else _object(t) for t in tokens]
+            break
+    else:
+        value = []
+
+    dv = manager._objects.get(name.lower())
+    if dv is None:
+        manager._create(manager._class, name, value=value)
+    else:
+        dv.value = value
+
+
+def _variable_delete(args):
+    _object(_arg(args, 'variable_name')[0]).destroy()
+
+
+def _numeric_results_create(args):
+    full_name = _arg(args, 'new_result_set_component_name')[0]
+    ans = DBAccess.find_by_full_name(full_name.rsplit('.', 2)[0])
+    if not isinstance(ans, Analysis):
+        raise CommandError(f'ERROR: {full_name} is not in an analysis')
+    res_name, comp_name = full_name.rsplit('.', 2)[1:]
+    values = [float(_value(v)) for v in _arg(args, 'values')]
+    ans.create_result_set(res_name).create_component(comp_name, values, *(_arg(args, 'units') or []))
+
+
+def _group_empty(args):
+    GROUPS[_arg(args, 'group_name')[0].lower()] = []
+
+
+def _group_object_add(args):
+    GROUPS.setdefault(_arg(args, 'group_name')[0].lower(), []).extend(_arg(args, 'objects_in_group'))
+
+
+def _delete_macro(_):
+    for name in GROUPS.get('select_list', []):
+        obj = DBAccess.find_by_full_name(name)
+        if obj is None:
+            raise CommandError(f'ERROR: The object {name} does not exist')
+        obj.destroy()
+    GROUPS['select_list'] = []
+
+
+def _entity_delete(args):
+    for name in _arg(args, 'entity_name'):
+        _object(name).destroy()
+
+
+def _simulation_set(args):
+    for key, values in args.items():
+        value = _value(values[0])
+        if key == 'solver_preference':
+            value = SOLVER_PREFERENCES.index(str(value).lower())
+        _expression.SIM_PREFERENCES[key] = value
+
+
+def _simulation_single_run_scripted(args):
+    sim = _object(_arg(args, 'sim_script_name')[0])
+    model = sim.parent
+    prefs = {**_expression.DEFAULT_SIM_PREFERENCES, **_expression.SIM_PREFERENCES}
+    if prefs['solver_preference'] == SOLVER_PREFERENCES.index('write_files_only'):
+        _write_solver_files(sim, str(prefs['file_prefix']) or sim.name)
+        return
+
+    if 'last_run' in model.Analyses._objects:
+        model.Analyses._objects['last_run'].destroy()
+
+    ans = model.Analyses._create(Analysis, 'Last_Run')
+    steps = int(sim.number_of_steps)
+    ans.create_result_set('TIME', {'TIME': [sim.end_time * i / steps for i in range(steps + 1)]})
+
+
+def _write_solver_files(sim, prefix: str):
+    """Writes the .adm and .acf of `sim` like Adams View does, with `prefix` as given in both"""
+    Path(f'{prefix}.adm').write_text(f'ADAMS/View model name: {sim.parent.name}\nEND\n')
+    Path(f'{prefix}.acf').write_text(f'{prefix}.adm\n{prefix}\n'
+                                     f'simulate/dynamic, end={sim.end_time}, steps={sim.number_of_steps}\n'
+                                     'stop\n')
+
+
+def _create(args, name_arg: str, manager_name: str, **defaults):
+    parent, name = _split_name(_arg(args, name_arg)[0])
+    kwargs = {**defaults}
+    for key, tokens in args.items():
+        if key != name_arg:
+            values = [_value(t) for t in tokens]
+            kwargs[key] = values if key in ('location', 'orientation') else values[0]
+    manager = getattr(parent, manager_name)
+    return manager._create(manager._class, name, **kwargs)
+
+
+def _modify(args, name_arg: str):
+    obj = _object(_arg(args, name_arg)[0])
+    for key, tokens in args.items():
+        if key != name_arg:
+            values = [_value(t) for t in tokens]
+            setattr(obj, key, values if key in ('location', 'orientation') else values[0])
+
+
+def _model_create(args):
+    import Adams  # pylint: disable=import-outside-toplevel
+    Adams.Models._create(Adams.Models._class, _arg(args, 'model_name')[0].lstrip('.'))
+
+
+HANDLERS: List[Tuple[Tuple[str, ...], Callable]] = [
+    (('file', 'command', 'read'), _file_command_read),
+    (('variable', 'set'), _variable_set),
+    (('variable', 'delete'), _variable_delete),
+    (('numeric_results', 'create', 'values'), _numeric_results_create),
+    (('group', 'empty'), _group_empty),
+    (('group', 'object', 'add'), _group_object_add),
+    (('mdi', 'delete_macro'), _delete_macro),
+    (('entity', 'delete'), _entity_delete),
+    (('entity', 'modify'), lambda a: _modify(a, 'entity_name')),
+    (('simulation', 'set'), _simulation_set),
+    (('simulation', 'single_run', 'scripted'), _simulation_single_run_scripted),
+    (('model', 'create'), _model_create),
+    (('part', 'create', 'rigid_body', 'name_and_position'), lambda a: _create(a, 'part_name', 'Parts')),
+    (('part', 'modify', 'rigid_body', 'name_and_position'), lambda a: _modify(a, 'part_name')),
+    (('marker', 'create'), lambda a: _create(a, 'marker_name', 'Markers')),
+    (('marker', 'modify'), lambda a: _modify(a, 'marker_name')),
+]
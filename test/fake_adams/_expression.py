@@ -0,0 +1,254 @@
+"""Evaluator for the subset of the Adams View expression language used by aviewpy"""
+import re
+from fnmatch import fnmatch
+from typing import Any, Callable, Dict, List
+
+import DBAccess
+import _transforms as transforms
+from DesignVariable import DesignVariable
+from Object import ObjectBase
+
+RE_TOKEN = re.compile(r'\s*(?:(?P<str>"[^"]*"|\'[^\']*\')|(?P<num>\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?)'
+                      r'|(?P<name>\.?[A-Za-z_][\w.]*(?:\[\d+\])?(?:\.[A-Za-z_]\w*)*)|(?P<op>//|==|!=|<=|>=|[-+*/(){},<>]))')
+
+SIM_PREFERENCES: Dict[str, Any] = {}
+"""Values of the `.sim_preferences` object"""
+
+DEFAULT_SIM_PREFERENCES = {'solver_preference': 0, 'file_prefix': '', 'save_files': 'no'}
+
+
+class ExpressionError(Exception):
+    pass
+
+
+def evaluate(exp: str):
+    """Returns the value of `exp` as `Adams.evaluate_exp` would"""
+    parser = _Parser(exp)
+    value = parser.parse_expression()
+    if parser.pos < len(parser.tokens):
+        raise ExpressionError(f'Unexpected {parser.tokens[parser.pos][1]!r} in {exp!r}')
+    return _output(value)
+
+
+def resolve(name: str):
+    """Returns the object or attribute value named `name`"""
+    obj = DBAccess.find_by_full_name(name)
+    if obj is not None:
+        return obj
+
+    if name.lower().startswith('.sim_preferences.'):
+        key = name.split('.', 2)[-1].lower()
+        if key in SIM_PREFERENCES:
+            return SIM_PREFERENCES[key]
+
+    if '.' in name.strip('.'):
+        parent_name, attr = name.rsplit('.', 1)
+        parent = resolve(parent_name)
+        if isinstance(parent, ObjectBase):
+            for candidate in (attr, attr.lower()):
+                try:
+                    return getattr(parent, candidate)
+                except AttributeError:
+                    pass
+
+    raise ExpressionError(f'Unknown object or attribute {name}')
+
+
+def _output(value, top=True):
+    if top and isinstance(value, DesignVariable):
+        return _output(value.value)
+    if isinstance(value, ObjectBase):
+        return value.full_name
+    if isinstance(value, (list, tuple)):
+        value = [_output(v, top=False) for v in value]
+        return value[0] if len(value) == 1 else value
+    return value
+
+
+def _object(value) -> ObjectBase:
+    if isinstance(value, ObjectBase):
+        return value
+    obj = DBAccess.find_by_full_name(str(value))
+    if obj is None:
+        raise ExpressionError(f'Unknown object {value}')
+    return obj
+
+
+def _objects(value) -> List[ObjectBase]:
+    if isinstance(value, (list, tuple)):
+        return [_object(v) for v in value]
+    if value in ('', None):
+        return []
+    return [_object(value)]
+
+
+def _matches(obj: ObjectBase, obj_type: str) -> bool:
+    return obj_type.lower() in ('all', '*') or obj_type.lower() in obj.db_types
+
+
+def _db_exists(name) -> int:
+    return int(isinstance(name, ObjectBase) or DBAccess.find_by_full_name(str(name)) is not None)
+
+
+def _db_children(parent, obj_type: str) -> List[ObjectBase]:
+    return [child for child in _object(parent)._children() if _matches(child, obj_type)]
+
+
+def _db_descendants(parent, obj_type: str, *_) -> List[ObjectBase]:
+    return [obj for obj in _object(parent)._descendants() if _matches(obj, obj_type)]
+
+
+def _db_ancestor(obj, obj_type: str) -> ObjectBase:
+    ancestor = _object(obj).parent
+    while ancestor is not None and not _matches(ancestor, obj_type):
+        ancestor = ancestor.parent
+    return ancestor if ancestor is not None else ''
+
+
+def _db_dependents(obj, obj_type: str) -> List[ObjectBase]:
+    obj = _object(obj)
+    dependents = []
+    for other in list(DBAccess.REGISTRY.values()):
+        if other is obj or not _matches(other, obj_type):
+            continue
+        for attr in other.properties:
+            value = other.__dict__[attr]
+            if value == obj or (isinstance(value, list) and obj in value):
+                dependents.append(other)
+                break
+    return dependents
+
+
+def _db_filter_name(objects, pattern: str) -> List[ObjectBase]:
+    return [obj for obj in _objects(objects) if fnmatch(obj.name.lower(), pattern.lower())]
+
+
+def _unique_name(name: str) -> str:
+    if DBAccess.find_by_full_name(name) is None:
+        return name
+    idx = 2
+    while DBAccess.find_by_full_name(f'{name}_{idx}') is not None:
+        idx += 1
+    return f'{name}_{idx}'
+
+
+def _loc_global(loc, frame) -> List[float]:
+    return transforms.to_global(_object(frame), loc, (0.0, 0.0, 0.0))[0]
+
+
+def _ori_global(ori, frame) -> List[float]:
+    return transforms.to_global(_object(frame), (0.0, 0.0, 0.0), ori)[1]
+
+
+FUNCTIONS: Dict[str, Callable] = {
+    'db_exists': _db_exists,
+    'db_children': _db_children,
+    'db_immediate_children': _db_children,
+    'db_descendants': _db_descendants,
+    'db_ancestor': _db_ancestor,
+    'db_dependents': _db_dependents,
+    'db_filter_name': _db_filter_name,
+    'db_object_count': lambda objects: len(_objects(objects)),
+    'unique_name': _unique_name,
+    'unique_name_in_hierarchy': _unique_name,
+    'loc_global': _loc_global,
+    'ori_global': _ori_global,
+    'user_string': lambda _: '',
+    'status_print': lambda _: 0,
+    'eval': lambda value: value,
+}
+
+
+class _Parser():
+
+    def __init__(self, exp: str):
+        self.tokens = []
+        pos = 0
+        exp = exp.strip()
+        while pos < len(exp):
+            match = RE_TOKEN.match(exp, pos)
+            if match is None or match.end() == pos:
+                raise ExpressionError(f'Can not parse {exp[pos:]!r}')
+            self.tokens.append((match.lastgroup, match.group(match.lastgroup)))
+            pos = match.end()
+            while pos < len(exp) and exp[pos].isspace():
+                pos += 1
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, op: str = None):
+        kind, text = self.peek()
+        if op is not None and text != op:
+            raise ExpressionError(f'Expected {op!r}, not {text!r}')
+        self.pos += 1
+        return kind, text
+
+    def parse_expression(self):
+        left = self.parse_sum()
+        while self.peek()[1] in ('==', '!=', '<', '>', '<=', '>='):
+            op = self.take()[1]
+            right = self.parse_sum()
+            left = int({'==': left == right, '!=': left != right, '<': left < right,
+                        '>': left > right, '<=': left <= right, '>=': left >= right}[op])
+        return left
+
+    def parse_sum(self):
+        left = self.parse_product()
+        while self.peek()[1] in ('+', '-', '//'):
+            op = self.take()[1]
+            right = self.parse_product()
+            if op == '//':
+                left = f'{_output(left)}{_output(right)}'
+            elif isinstance(left, list):
+                left = [a + b if op == '+' else a - b for a, b in zip(left, right)]
+            else:
+                left = left + right if op == '+' else left - right
+        return left
+
+    def parse_product(self):
+        left = self.parse_unary()
+        while self.peek()[1] in ('*', '/'):
+            op = self.take()[1]
+            right = self.parse_unary()
+            left = left * right if op == '*' else left / right
+        return left
+
+    def parse_unary(self):
+        if self.peek()[1] == '-':
+            self.take()
+            value = self.parse_unary()
+            return [-v for v in value] if isinstance(value, list) else -value
+        return self.parse_atom()
+
+    def parse_atom(self):
+        kind, text = self.take()
+        if kind == 'str':
+            return text[1:-1]
+        if kind == 'num':
+            return float(text) if any(c in text for c in '.eE') else int(text)
+        if text == '(':
+            value = self.parse_expression()
+            self.take(')')
+            return value
+        if text == '{':
+            return self.parse_list('}')
+        if kind == 'name':
+            if self.peek()[1] == '(':
+                self.take()
+                function = FUNCTIONS.get(text.lower())
+                if function is None:
+                    raise ExpressionError(f'Unknown function {text}')
+                return function(*self.parse_list(')'))
+            return resolve(text)
+        raise ExpressionError(f'Unexpected {text!r}')
+
+    def parse_list(self, close: str) -> list:
+        values = []
+        while self.peek()[1] != close:
+            values.append(self.parse_expression())
+            if self.peek()[1] == ',':
+                self.take()
+        self.take(close)
+        return values
@@ -0,0 +1,71 @@
+"""Body 3-1-3 (ZXZ) Euler angle transforms, in degrees, without numpy"""
+from math import acos, atan2, cos, degrees, radians, sin
+from typing import List, Sequence, Tuple
+
+Matrix = List[List[float]]
+
+
+def rotation(ori: Sequence[float]) -> Matrix:
+    psi, theta, phi = (radians(a) for a in ori)
+    return matmul(matmul(_rz(psi), _rx(theta)), _rz(phi))
+
+
+def euler(rot: Matrix) -> List[float]:
+    cos_theta = max(-1.0, min(1.0, rot[2][2]))
+    theta = acos(cos_theta)
+    if abs(sin(theta)) < 1e-12:
+        psi = atan2(rot[1][0], rot[0][0])
+        phi = 0.0
+    else:
+        psi = atan2(rot[0][2], -rot[1][2])
+        phi = atan2(rot[2][0], rot[2][1])
+    return [degrees(psi), degrees(theta), degrees(phi)]
+
+
+def matmul(a: Matrix, b: Matrix) -> Matrix:
+    return [[sum(a[i][k] * b[k][j] for k in range(3)) for j in range(3)] for i in range(3)]
+
+
+def apply(rot: Matrix, vec: Sequence[float]) -> List[float]:
+    return [sum(rot[i][k] * vec[k] for k in range(3)) for i in range(3)]
+
+
+def transpose(rot: Matrix) -> Matrix:
+    return [[rot[j][i] for j in range(3)] for i in range(3)]
+
+
+def frame(obj) -> Tuple[List[float], Matrix]:
+    """Returns the global location and rotation matrix of a part or marker"""
+    if obj is None or not hasattr(obj, 'location'):
+        return [0.0, 0.0, 0.0], rotation((0.0, 0.0, 0.0))
+
+    loc, rot = list(obj.location), rotation(obj.orientation)
+    if obj.class_name == 'marker':
+        part_loc, part_rot = frame(obj.parent)
+        loc = [p + d for p, d in zip(part_loc, apply(part_rot, loc))]
+        rot = matmul(part_rot, rot)
+
+    return loc, rot
+
+
+def to_global(obj, loc: Sequence[float], ori: Sequence[float]) -> Tuple[List[float], List[float]]:
+    """Converts a location and orientation relative to `obj` to global"""
+    frame_loc, frame_rot = frame(obj)
+    return ([f + d for f, d in zip(frame_loc, apply(frame_rot, loc))],
+            euler(matmul(frame_rot, rotation(ori))))
+
+
+def relative_to(obj, loc: Sequence[float], ori: Sequence[float]) -> Tuple[List[float], List[float]]:
+    """Converts a global location and orientation to be relative to `obj`"""
+    frame_loc, frame_rot = frame(obj)
+    inv = transpose(frame_rot)
+    return (apply(inv, [g - f for g, f in zip(loc, frame_loc)]),
+            euler(matmul(inv, rotation(ori))))
+
+
+def _rz(angle: float) -> Matrix:
+    return [[cos(angle), -sin(angle), 0.0], [sin(angle), cos(angle), 0.0], [0.0, 0.0, 1.0]]
+
+
+def _rx(angle: float) -> Matrix:
+    return [[1.0, 0.0, 0.0], [0.0, cos(angle), -sin(angle)], [0.0, sin(angle), cos(angle)]]
@@ -0,0 +1,76 @@
+"""Stand-in for Adams Solver used by the tests that run solver processes.
+
+`install` writes a `common/mdi.bat` script that is run the way `aviewpy.solver` runs Adams Solver
+(`mdi.bat -c ru-standard i <acf file> exit`). It appends the output prefix to `solved.log` in
+the working directory, writes `<prefix>.msg` and, unless the run fails, `<prefix>.res`. Lines
+after the output prefix in the .acf file control what it does:
+
+- `sleep=<seconds>`: sleeps
+- `msg=<text>`: writes a line to the .msg file
+- `env=<name>`: writes `<name>=<value>` of the environment variable to the .msg file
+- `child`: starts a child process that sleeps for a minute and writes its pid to `<prefix>.child`
+- `ignore_sigterm`: ignores SIGTERM from then on
+- `fail`: exits with return code 3 at the end
+
+Other lines (e.g. solver commands) are ignored.
+
+Example
+-------
+>>> env = {**os.environ, 'TOPDIR': str(install(tmp_dir))}
+"""
+import stat
+import sys
+from pathlib import Path
+
+SCRIPT = '''\
+#!{python}
+import os, signal, subprocess, sys, time
+acf_file = sys.argv[sys.argv.index('i') + 1]
+lines = open(acf_file).read().splitlines()
+prefix = lines[1].strip() or os.path.splitext(acf_file)[0]
+with open('solved.log', 'a') as fid:
+    fid.write(prefix + '\\n')
+
+msg = open(prefix + '.msg', 'w', buffering=1)
+msg.write('solved by %d\\n' % os.getppid())
+returncode = 0
+for line in lines[2:]:
+    cmd, _, arg = line.strip().partition('=')
+    if cmd == 'sleep':
+        time.sleep(float(arg))
+    elif cmd == 'msg':
+        msg.write(arg + '\\n')
+    elif cmd == 'env':
+        msg.write('%s=%s\\n' % (arg, os.environ.get(arg, '')))
+    elif cmd == 'child':
+        child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])
+        open(prefix + '.child', 'w').write(str(child.pid))
+    elif cmd == 'ignore_sigterm':
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    elif cmd == 'fail':
+        returncode = 3
+
+msg.write('finished\\n')
+if returncode == 0:
+    open(prefix + '.res', 'w').write('res')
+sys.exit(returncode)
+'''
+
+
+def install(directory: Path) -> Path:
+    """Writes the fake solver under `directory` and returns the directory to use as `TOPDIR`"""
+    topdir = Path(directory) / 'topdir'
+    mdi = topdir / 'common' / 'mdi.bat'
+    mdi.parent.mkdir(parents=True, exist_ok=True)
+    mdi.write_text(SCRIPT.format(python=sys.executable))
+    mdi.chmod(mdi.stat().st_mode | stat.S_IEXEC)
+    return topdir
+
+
+def is_running(pid: int) -> bool:
+    """Returns True if `pid` is running (Linux only). Zombies are not running."""
+    try:
+        stat_line = Path(f'/proc/{pid}/stat').read_text()
+    except OSError:
+        return False
+    return stat_line[stat_line.rindex(')') + 2] != 'Z'
@@ -0,0 +1,118 @@
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from aviewpy.files.acf_text import get_model_file, patch_acf
+from aviewpy.files.adm_text import AdmPatcher, get_dataset_dependencies
+
+TEST_ADM = '''\
+ADAMS/View model name: MODEL_1
+!
+!                              adams_view_name='PART_2'
+PART/2
+, MASS = 1.0
+, CM = 3
+, IP = 1, 1, 1
+!
+!                              adams_view_name='SFORCE_1'
+SFORCE/1
+, TRANSLATIONAL
+, I = 4
+, J = 5
+, FUNCTION = STEP(time, 0, 0, 1, DX(4, 5))
+!
+!                              adams_view_name='SPLINE_1'
+SPLINE/3
+, X = 0, 1, 2, 3
+, 4
+, Y = 0, 1, 4, 9, 16
+!
+END
+'''
+
+TEST_ACF = '''\
+base.adm
+base
+INTEGRATOR/GSTIFF, ERROR=1e-3
+SIM/DYN, END=1, STEPS=100
+STOP
+'''
+
+
+class Test_AdmPatcher(unittest.TestCase):
+    """Tests patching argument values in .adm text"""
+
+    def setUp(self):
+        self.patcher = AdmPatcher(TEST_ADM)
+
+    def test_statements(self):
+        """Tests that statements are found with their Adams View names"""
+        self.assertEqual([(s.type, s.id, s.view_name) for s in self.patcher.statements],
+                         [('PART', 2, 'PART_2'),
+                          ('SFORCE', 1, 'SFORCE_1'),
+                          ('SPLINE', 3, 'SPLINE_1')])
+
+    def test_patch_by_name_and_id(self):
+        """Tests that statements can be addressed by Adams View name or adams id"""
+        text = self.patcher.patch({('PART', 'PART_2', 'MASS'): 2.5, ('PART', 2, 'CM'): 7})
+        self.assertIn(', MASS = 2.5\n, CM = 7\n, IP = 1, 1, 1\n', text)
+
+    def test_patch_function(self):
+        """Tests that commas inside a function expression are part of the value"""
+        text = self.patcher.patch({('SFORCE', 1, 'FUNCTION'): '100.0'})
+        self.assertIn(', FUNCTION = 100.0\n!', text)
+
+    def test_patch_continued_list(self):
+        """Tests that a value continued over several lines is replaced"""
+        text = self.patcher.patch({('SPLINE', 'SPLINE_1', 'X'): [0, 2, 4, 6, 8, 10]})
+        self.assertIn(', X = 0, 2, 4, 6, 8\n, 10\n, Y = 0, 1, 4, 9, 16', text)
+
+    def test_insert_missing_argument(self):
+        """Tests that an argument that is not in the statement is appended to it"""
+        text = self.patcher.patch({('PART', 2, 'IM'): 5})
+        self.assertIn(', IP = 1, 1, 1\n, IM = 5\n!', text)
+
+    def test_base_is_unchanged(self):
+        """Tests that patching with no values returns the base text"""
+        self.assertEqual(self.patcher.patch({}), TEST_ADM)
+
+
+class Test_PatchAcf(unittest.TestCase):
+    """Tests patching .acf text"""
+
+    def test_header(self):
+        """Tests that the model file and output prefix are replaced"""
+        lines = patch_acf(TEST_ACF, 'run_1.adm', 'run_1').splitlines()
+        self.assertEqual(lines[:2], ['run_1.adm', 'run_1'])
+
+    def test_replace_command(self):
+        """Tests that an existing solver command is replaced"""
+        text = patch_acf(TEST_ACF, commands={'INTEGRATOR': 'INTEGRATOR/HHT'})
+        self.assertEqual(text.splitlines()[2], 'INTEGRATOR/HHT')
+
+    def test_insert_command(self):
+        """Tests that a new solver command is inserted before the first simulate command"""
+        text = patch_acf(TEST_ACF, commands={'OUTPUT': 'OUTPUT/NOSEPARATOR'})
+        self.assertEqual(text.splitlines()[3:5], ['OUTPUT/NOSEPARATOR', 'SIM/DYN, END=1, STEPS=100'])
+
+
+class Test_DatasetDependencies(unittest.TestCase):
+    """Tests finding the files a dataset depends on"""
+
+    def test_file_arguments(self):
+        """Tests that FILE arguments are found and resolved against the dataset directory"""
+        with TemporaryDirectory() as tmp_dir:
+            adm_file = Path(tmp_dir) / 'base.adm'
+            adm_file.write_text(TEST_ADM.replace('END\n', 'GRAPHICS/1, EXTERNAL, FILE = box.shl\n'
+                                                            '!GRAPHICS/2, FILE = old.shl\n'
+                                                            'SPLINE/4, FILE = "road.csv", BLOCK=1\n'
+                                                            'END\n'))
+            self.assertEqual(get_dataset_dependencies(adm_file),
+                             [Path(tmp_dir) / 'box.shl', Path(tmp_dir) / 'road.csv'])
+
+    def test_model_file(self):
+        """Tests that the model file of an .acf gets an .adm extension if it has none"""
+        with TemporaryDirectory() as tmp_dir:
+            acf_file = Path(tmp_dir) / 'base.acf'
+            acf_file.write_text(patch_acf(TEST_ACF, model_file='base'))
+            self.assertEqual(get_model_file(acf_file), Path(tmp_dir) / 'base.adm')
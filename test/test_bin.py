@@ -0,0 +1,88 @@
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from test.fake_adams import install
+
+install()
+
+from aviewpy.files.bin import BinCatalog, get_bin_version, is_version_compatible, read_bin_header  # noqa: E402
+
+TEST_HEADER = b'Adams View version 2023.1.0.1234567 \x01\x02'
+
+
+class Test_BinHeader(unittest.TestCase):
+    """Tests reading the version from the header of a .bin file"""
+
+    def setUp(self):
+        self.tmp_dir = TemporaryDirectory()
+        self.bin_file = Path(self.tmp_dir.name) / 'model.bin'
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_get_bin_version(self):
+        """Tests that get_bin_version returns the version in the header"""
+        self.bin_file.write_bytes(TEST_HEADER + b'\n' + bytes(1000))
+        self.assertEqual(get_bin_version(self.bin_file), '2023_1_1234567')
+
+    def test_header_without_newline_is_bounded(self):
+        """Tests that read_bin_header does not read past `size` bytes if there is no newline"""
+        self.bin_file.write_bytes(TEST_HEADER + b'x' * 100_000)
+        self.assertLessEqual(len(read_bin_header(self.bin_file, size=256)), 256)
+        self.assertEqual(get_bin_version(self.bin_file), '2023_1_1234567')
+
+    def test_is_version_compatible(self):
+        """Tests that versions are compared numerically"""
+        self.assertTrue(is_version_compatible('2022_2', '2023_1'))
+        self.assertTrue(is_version_compatible('2023_1', '2023_1'))
+        self.assertFalse(is_version_compatible('2024', '2023_1'))
+        self.assertFalse(is_version_compatible('2023_10', '2023_9'))
+
+
+class Test_BinCatalog(unittest.TestCase):
+    """Tests the BinCatalog class"""
+
+    def setUp(self):
+        self.tmp_dir = TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        (self.root / 'sub' / 'deeper').mkdir(parents=True)
+        (self.root / 'old.bin').write_bytes(b'Adams View version 2021.2\n')
+        (self.root / 'sub' / 'new.bin').write_bytes(b'Adams View version 2024.1\n')
+        (self.root / 'sub' / 'deeper' / 'bad.bin').write_bytes(b'not a bin file')
+        self.catalog_file = self.root / 'catalog.json'
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_scan_finds_all_files(self):
+        """Tests that scan finds bin files in all subdirectories"""
+        catalog = BinCatalog(self.catalog_file)
+        catalog.scan(self.root)
+        self.assertEqual(len(catalog.entries), 3)
+
+    def test_compatible(self):
+        """Tests that compatible only returns files readable by the given version"""
+        catalog = BinCatalog(self.catalog_file)
+        catalog.scan(self.root)
+        self.assertEqual(catalog.compatible('2023_1'), [self.root / 'old.bin'])
+
+    def test_rescan_is_incremental(self):
+        """Tests that unchanged files are not re-read when the catalog is rescanned"""
+        catalog = BinCatalog(self.catalog_file)
+        catalog.scan(self.root)
+        catalog.save()
+
+        catalog = BinCatalog.load(self.catalog_file)
+        self.assertEqual(catalog.scan(self.root), [])
+
+        (self.root / 'old.bin').write_bytes(b'Adams View version 2022.1 \n')
+        self.assertEqual(catalog.scan(self.root), [str(self.root / 'old.bin')])
+
+    def test_save(self):
+        """Tests that the catalog is persisted as json"""
+        catalog = BinCatalog(self.catalog_file)
+        catalog.scan(self.root)
+        catalog.save()
+        self.assertEqual(len(json.loads(self.catalog_file.read_text())), 3)
@@ -0,0 +1,97 @@
+import errno
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from aviewpy.utils.cache import evict_lru, link_or_copy
+
+
+class Test_LinkOrCopy(unittest.TestCase):
+    """Tests placing cached files without copying them where possible"""
+
+    def setUp(self):
+        self._tmp_dir = TemporaryDirectory()
+        self.tmp_dir = Path(self._tmp_dir.name)
+        self.src = self.tmp_dir / 'src.res'
+        self.src.write_text('results')
+        self.dst = self.tmp_dir / 'dst.res'
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def test_link(self):
+        """Tests that an existing destination is replaced by a hard link"""
+        self.dst.write_text('old')
+        self.assertEqual(link_or_copy(self.src, self.dst), 'link')
+        self.assertEqual(os.stat(self.dst).st_ino, os.stat(self.src).st_ino)
+
+    def test_other_device(self):
+        """Tests that files on other devices are reflinked if supported, otherwise copied"""
+        with mock.patch('os.link', side_effect=OSError(errno.EXDEV, 'Invalid cross-device link')):
+            method = link_or_copy(self.src, self.dst)
+
+        self.assertIn(method, ['reflink', 'copy'])
+        self.assertNotEqual(os.stat(self.dst).st_ino, os.stat(self.src).st_ino)
+        self.assertEqual(self.dst.read_text(), 'results')
+
+    def test_copy(self):
+        """Tests the fallback to a copy that keeps the modification time"""
+        os.utime(self.src, (1e9, 1e9))
+        with mock.patch('os.link', side_effect=OSError(errno.EXDEV, 'Invalid cross-device link')), \
+                mock.patch('aviewpy.utils.cache._reflink', return_value=False):
+            self.assertEqual(link_or_copy(self.src, self.dst), 'copy')
+
+        self.assertEqual(self.dst.read_text(), 'results')
+        self.assertEqual(os.stat(self.dst).st_mtime, 1e9)
+
+
+class Test_EvictLru(unittest.TestCase):
+    """Tests deleting the least recently used cache entries"""
+
+    def setUp(self):
+        self._tmp_dir = TemporaryDirectory()
+        self.tmp_dir = Path(self._tmp_dir.name)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _entry(self, name: str, mtime: float, size: int = 10) -> Path:
+        path = self.tmp_dir / name
+        if path.suffix:
+            path.write_text('x' * size)
+        else:
+            path.mkdir()
+            (path / 'model.res').write_text('x' * size)
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_oldest_first(self):
+        """Tests that the entries used longest ago are deleted until the cache fits"""
+        old = self._entry('old.bin', 1e9)
+        mid = self._entry('mid.bin', 2e9)
+        new = self._entry('new.bin', 3e9)
+
+        self.assertEqual(evict_lru(self.tmp_dir, 20), [old])
+        self.assertEqual(evict_lru(self.tmp_dir, 10), [mid])
+        self.assertTrue(new.exists())
+        self.assertEqual(evict_lru(self.tmp_dir, 10), [])
+
+    def test_directories(self):
+        """Tests that directory entries are sized by their contents and deleted as a whole"""
+        old = self._entry('old', 1e9, size=100)
+        new = self._entry('new.bin', 2e9)
+
+        self.assertEqual(evict_lru(self.tmp_dir, 50), [old])
+        self.assertFalse(old.exists())
+        self.assertTrue(new.exists())
+
+    def test_pattern(self):
+        """Tests that entries not matching the pattern are neither counted nor deleted"""
+        other = self._entry('other.res', 1e9, size=100)
+        cached = self._entry('model.bin', 2e9)
+
+        self.assertEqual(evict_lru(self.tmp_dir, 10, pattern='*.bin'), [])
+        self.assertEqual(evict_lru(self.tmp_dir, 0, pattern='*.bin'), [cached])
+        self.assertTrue(other.exists())
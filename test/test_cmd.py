@@ -0,0 +1,216 @@
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from test.fake_adams import install, is_fake
+
+Adams = install()
+
+from aviewpy.files.cmd import (cached_model_import, get_cmd_dependencies, index_cmd_file,  # noqa: E402
+                               iter_cmd_statements)
+
+TEST_CMD = '''\
+!---------------------------------- Model ----------------------------------!
+model create model_name = .MOD  ! trailing comment
+part create rigid_body name_and_position  &
+   part_name = .MOD.PART_1  &  ! comment after a continuation
+   location = 0.0, 1.0, 2.0  &
+   comments = "not a ! comment = or argument"
+marker create marker_name = .MOD.PART_1.MAR_1 adams_id = 3
+constraint create joint revolute  &
+   joint_name = .MOD.JOINT_1  &
+   i_marker_name = .MOD.PART_1.MAR_1  &
+   j_marker_name = .MOD.ground.MAR_9
+file command read file_name = "included.cmd"
+geom cre shape shell shell_name = .MOD.PART_1.SHELL_1 file_name = "tooth.shl"
+data_element create spline spline_name = .MOD.SPLINE_1 file_name = "spline.csv"
+file bin write file_name = "output.bin"
+if condition = (eval(DB_EXISTS(".MOD.PART_2") == 0))
+end
+'''
+
+
+class Test_CmdStatements(unittest.TestCase):
+    """Tests tokenizing Adams View command files"""
+
+    def setUp(self):
+        self.tmp_dir = TemporaryDirectory()
+        self.cmd_file = Path(self.tmp_dir.name) / 'model.cmd'
+        self.cmd_file.write_text(TEST_CMD)
+        self.statements = list(iter_cmd_statements(self.cmd_file))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_statement_count(self):
+        """Tests that comments are skipped and continued lines are joined"""
+        self.assertEqual(len(self.statements), 10)
+
+    def test_continuation(self):
+        """Tests that arguments on continuation lines are parsed"""
+        stmt = self.statements[1]
+        self.assertEqual(stmt.keyword, 'part create rigid_body name_and_position')
+        self.assertEqual(stmt.args['part_name'], '.MOD.PART_1')
+        self.assertEqual(stmt.args['location'], '0.0, 1.0, 2.0')
+        self.assertEqual(stmt.line, 3)
+
+    def test_quoted_string(self):
+        """Tests that `!` and `=` inside quoted strings are kept"""
+        self.assertEqual(self.statements[1].args['comments'], '"not a ! comment = or argument"')
+
+    def test_expression(self):
+        """Tests that `==` inside an expression is not treated as an argument"""
+        self.assertEqual(self.statements[-2].keyword, 'if')
+        self.assertEqual(list(self.statements[-2].args), ['condition'])
+
+    def test_line_numbers(self):
+        """Tests that statements report the line they start on"""
+        self.assertEqual([s.line for s in self.statements],
+                         [2, 3, 7, 8, 12, 13, 14, 15, 16, 17])
+
+
+class Test_CmdIndex(unittest.TestCase):
+    """Tests indexing Adams View command files"""
+
+    def setUp(self):
+        self.tmp_dir = TemporaryDirectory()
+        self.cmd_file = Path(self.tmp_dir.name) / 'model.cmd'
+        self.cmd_file.write_text(TEST_CMD)
+        (Path(self.tmp_dir.name) / 'included.cmd').write_text('file command read file="nested.cmd"\n')
+        (Path(self.tmp_dir.name) / 'nested.cmd').write_text('file command read file="sub"\n')
+        (Path(self.tmp_dir.name) / 'sub.cmd').write_text('! empty\n')
+        self.index = index_cmd_file(self.cmd_file)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_models_and_parts(self):
+        """Tests that the defined models and parts are found"""
+        self.assertEqual(self.index.models, ['.mod'])
+        self.assertEqual(self.index.parts, ['.mod.part_1'])
+
+    def test_abbreviated_name_arguments(self):
+        """Tests that abbreviated entity name arguments are indexed"""
+        self.cmd_file.write_text('model create model = .M\n'
+                                 'part create rigid part = .M.P\n'
+                                 'mar cre marker = .M.P.MAR\n'
+                                 'constraint create joint fixed joint = .M.J  i_marker = .M.P.MAR  j_marker = .M.G.MAR\n'
+                                 'part modify rigid mass_properties part = .M.P  mass = 1.0  location = 0, 0, 0\n')
+        index = index_cmd_file(self.cmd_file)
+        self.assertEqual(index.models, ['.m'])
+        self.assertEqual(index.parts, ['.m.p'])
+        self.assertEqual(index.find('marker create'), ['.m.p.mar'])
+        self.assertDictEqual(index.references, {'.m.p.mar': 1, '.m.g.mar': 1, '.m.p': 1})
+
+    def test_statements_by_keyword(self):
+        """Tests that statement line numbers are indexed by keyword"""
+        self.assertEqual(list(self.index.statements['marker create']), [7])
+
+    def test_external_references(self):
+        """Tests that references to entities not defined in the file are found"""
+        self.assertEqual(self.index.external_references, ['.mod.ground.mar_9'])
+
+    def test_dependencies(self):
+        """Tests that files read by the command file are found and files written are not"""
+        self.assertEqual([(d.file_name, d.kind) for d in self.index.dependencies],
+                         [('included.cmd', 'command'),
+                          ('tooth.shl', 'shell'),
+                          ('spline.csv', 'spline')])
+
+    def test_nested_dependencies(self):
+        """Tests that get_cmd_dependencies follows included command files, with or without the
+        .cmd extension"""
+        names = [d.name for d in get_cmd_dependencies(self.cmd_file)]
+        self.assertEqual(names, ['included.cmd', 'tooth.shl', 'spline.csv', 'nested.cmd', 'sub.cmd'])
+
+
+@unittest.skipUnless(is_fake(Adams), 'Uses the fake Adams View API')
+class Test_CachedModelImport(unittest.TestCase):
+    """Tests importing models through the binary model cache"""
+
+    def setUp(self):
+        Adams.reset()
+        self._tmp_dir = TemporaryDirectory()
+        self.tmp_dir = Path(self._tmp_dir.name)
+        self.cache_dir = self.tmp_dir / 'cache'
+        self.included_file = self.tmp_dir / 'parts.cmd'
+        self.included_file.write_text('part create rigid_body name_and_position part_name = .MOD.PART_1\n')
+        self.cmd_file = self.tmp_dir / 'model.cmd'
+        self.cmd_file.write_text('model create model_name = .MOD\n'
+                                 f'file command read file_name = "{self.included_file.as_posix()}"\n')
+
+        patchers = [mock.patch.dict(os.environ, {'VERSION': '2023_1'}),
+                    mock.patch('aviewpy.files.cmd.write_bin_file', side_effect=self._write_bin_file),
+                    mock.patch('aviewpy.files.cmd.read_bin_file')]
+        self.read_bin_file = [patcher.start() for patcher in patchers][-1]
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    @staticmethod
+    def _write_bin_file(filename, mod):
+        Path(filename).write_text(mod.full_name)
+
+    def _import(self, **kwargs):
+        Adams.reset()
+        with mock.patch.object(Adams, 'read_command_file', wraps=Adams.read_command_file) as read_command_file:
+            cached_model_import(self.cmd_file, cache_dir=self.cache_dir, **kwargs)
+        return read_command_file.call_count == 1
+
+    def test_cache_hit(self):
+        """Tests that the second import reads the cached binary file, even after the files are touched"""
+        self.assertTrue(self._import())
+        self.assertIn('PART_1', Adams.Models['MOD'].Parts)
+        cached_files = list(self.cache_dir.glob('2023_1_*.bin'))
+        self.assertEqual(len(cached_files), 1)
+
+        os.utime(self.included_file, (1e9, 1e9))
+        self.assertFalse(self._import(mod_name='MOD_2'))
+        self.read_bin_file.assert_called_once_with(cached_files[0], 'MOD_2', alert=False)
+
+    def test_dependency_changed(self):
+        """Tests that editing a file read by the command file invalidates the cached model"""
+        self._import()
+        self.included_file.write_text('part create rigid_body name_and_position part_name = .MOD.PART_2\n')
+
+        self.assertTrue(self._import())
+        self.assertIn('PART_2', Adams.Models['MOD'].Parts)
+        self.assertEqual(len(list(self.cache_dir.glob('*.bin'))), 2)
+        self.read_bin_file.assert_not_called()
+
+    def test_extensionless_dependency_changed(self):
+        """Tests that editing a nested command file included without its .cmd extension
+        invalidates the cached model"""
+        sub_file = self.tmp_dir / 'sub.cmd'
+        sub_file.write_text('part create rigid_body name_and_position part_name = .MOD.PART_2\n')
+        with self.included_file.open('a') as fid:
+            fid.write(f'file command read file_name = "{sub_file.with_suffix("").as_posix()}"\n')
+        self.assertIn(sub_file, get_cmd_dependencies(self.cmd_file))
+
+        self._import()
+        sub_file.write_text('part create rigid_body name_and_position part_name = .MOD.PART_3\n')
+
+        self.assertTrue(self._import())
+        self.assertIn('PART_3', Adams.Models['MOD'].Parts)
+        self.read_bin_file.assert_not_called()
+
+    def test_version_changed(self):
+        """Tests that models cached by another Adams version are not read"""
+        self._import()
+        with mock.patch.dict(os.environ, {'VERSION': '2024_1'}):
+            self.assertTrue(self._import())
+
+    def test_evict(self):
+        """Tests that the least recently used models are deleted when the cache is full"""
+        self._import()
+        old_file = next(self.cache_dir.glob('*.bin'))
+        os.utime(old_file, (1e9, 1e9))
+        self.included_file.write_text('part create rigid_body name_and_position part_name = .MOD.PART_2\n')
+
+        self._import(max_cache_size=old_file.stat().st_size)
+        self.assertFalse(old_file.exists())
+        self.assertEqual(len(list(self.cache_dir.glob('*.bin'))), 1)
@@ -0,0 +1,82 @@
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from test.fake_adams import install, is_fake
+
+Adams = install()
+
+from aviewpy.commands import CommandBatch, CommandBatchError, execute_cmds  # noqa: E402
+
+
+@unittest.skipUnless(is_fake(Adams), 'Uses the fake Adams View API')
+class Test_CommandBatch(unittest.TestCase):
+    """Tests executing many commands from a single command file"""
+
+    def setUp(self):
+        Adams.reset()
+        self.mod = Adams.Models.create(name='MOD')
+
+    def test_command_batch_error(self):
+        """Tests finding the failed command when Adams View stops reading the command file"""
+        Adams.set_command_file_on_error('abort')
+        Adams.fail_commands('bad')
+        with self.assertRaises(CommandBatchError) as context:
+            with CommandBatch() as batch:
+                batch.extend(['var set var=.MOD.a int=1', 'bad command', 'var set var=.MOD.b int=1'])
+
+        self.assertEqual(context.exception.index, 1)
+        self.assertListEqual(context.exception.remaining, ['var set var=.MOD.b int=1'])
+        self.assertEqual(Adams.evaluate_exp('db_exists(".MOD.a")'), 1)
+        self.assertEqual(Adams.evaluate_exp('db_exists(".MOD.b")'), 0)
+
+    def test_command_batch_error_logged(self):
+        """Tests finding the failed commands in the session log when Adams View reads on"""
+        Adams.fail_commands('bad')
+        cmds = ['var set var=.MOD.a int=1', 'bad command', 'var set var=.MOD.b int=1', 'bad again']
+        with TemporaryDirectory() as tmp_dir:
+            log_file = Path(tmp_dir) / 'aview.log'
+            log_file.write_text('! ERROR: from before the batch\n')
+            Adams.set_log_file(log_file)
+            with mock.patch('aviewpy.commands.SESSION_LOG_FILE', log_file):
+                with self.assertRaises(CommandBatchError) as context:
+                    execute_cmds(cmds)
+                batch = execute_cmds(cmds, on_error='continue')
+
+        self.assertEqual(context.exception.index, 1)
+        self.assertListEqual(context.exception.remaining, [])
+        self.assertEqual(Adams.evaluate_exp('db_exists(".MOD.b")'), 1)
+        self.assertListEqual([error.index for error in batch.errors], [1, 3])
+        self.assertEqual(batch.executed, 2)
+
+    def test_session_log_file_cwd(self):
+        """Tests that the session log is looked up in the working directory when the batch runs"""
+        Adams.fail_commands('bad')
+        cwd = os.getcwd()
+        self.addCleanup(os.chdir, cwd)
+        with TemporaryDirectory() as tmp_dir:
+            os.chdir(tmp_dir)
+            Adams.set_log_file(Path(tmp_dir) / 'aview.log')
+            batch = execute_cmds(['var set var=.MOD.a int=1', 'bad command'], on_error='continue')
+            os.chdir(cwd)
+
+        self.assertListEqual([error.index for error in batch.errors], [1])
+
+    def test_single_command_error_logged(self):
+        """Tests that a failed command in a batch of one is found in the session log when it does
+        not raise an exception"""
+        with TemporaryDirectory() as tmp_dir:
+            log_file = Path(tmp_dir) / 'aview.log'
+
+            def execute_cmd(cmd):
+                with log_file.open('a') as fid:
+                    fid.write(f'{cmd}\n! ERROR: failed\n')
+
+            with mock.patch('aviewpy.commands.SESSION_LOG_FILE', log_file), \
+                    mock.patch.object(Adams, 'execute_cmd', side_effect=execute_cmd):
+                batch = execute_cmds(['bad command'], on_error='continue')
+
+        self.assertListEqual([error.command for error in batch.errors], ['bad command'])
+        self.assertEqual(batch.executed, 0)
@@ -0,0 +1,75 @@
+import unittest
+
+from test.fake_adams import install, is_fake
+
+Adams = install()
+
+from aviewpy.utils.dereferencer import Dereferencer, MultiDereferencer  # noqa: E402
+
+
+@unittest.skipUnless(is_fake(Adams), 'Uses the fake Adams View API')
+class Test_Dereferencer(unittest.TestCase):
+    """Tests temporarily removing the references to entities of a model"""
+
+    def setUp(self):
+        Adams.reset()
+        self.mod = Adams.Models.create(name='MOD')
+        self.part = self.mod.Parts.create(name='PART_1', location=[1.0, 0.0, 0.0], orientation=[90.0, 0.0, 0.0])
+        self.mkr = self.part.Markers.create(name='MAR_1', location=[1.0, 0.0, 0.0], orientation=[0.0, 90.0, 0.0])
+
+    def test_dereferencer(self):
+        """Tests that a reference is pointed at the copy and restored"""
+        joint = self.mod.Constraints.createRevolute(name='JOINT_1', i_marker=self.mkr, j_marker=self.part.cm)
+
+        dereferencer = Dereferencer(self.mkr)
+        dereferencer.dereference()
+        self.assertNotEqual(joint.i_marker, self.mkr)
+        dereferencer.rereference()
+        self.assertEqual(joint.i_marker, self.mkr)
+
+    def test_dereferencer_direct_children(self):
+        """Tests that only references from direct children of the model are removed, not from the
+        objects of groups"""
+        part_2 = self.mod.Parts.create(name='PART_2')
+        mkr_2 = part_2.Markers.create(name='MAR_2', node_id=self.mkr)
+        self.mod.Groups.create(name='GROUP_1', objects=[mkr_2])
+        joint = self.mod.Constraints.createRevolute(name='JOINT_1', i_marker=self.mkr, j_marker=mkr_2)
+
+        dereferencer = Dereferencer(self.mkr)
+        dereferencer.dereference()
+        self.assertListEqual([prop.entity for prop in dereferencer.dep_props], [joint])
+        self.assertEqual(mkr_2.node_id, self.mkr)
+        dereferencer.rereference()
+
+    def test_rereference_failed(self):
+        """Tests that the properties that were not restored remain in `dep_props`"""
+        joints = [self.mod.Constraints.createRevolute(name=f'JOINT_{idx}', i_marker=self.mkr, j_marker=self.part.cm)
+                  for idx in range(3)]
+        dereferencer = Dereferencer(self.mkr)
+        dereferencer.dereference()
+
+        failing = dereferencer.dep_props[1]._replace(entity=object())
+        dereferencer.dep_props[1] = failing
+        with self.assertRaises(AttributeError):
+            dereferencer.rereference()
+        self.assertEqual(joints[0].i_marker, self.mkr)
+        self.assertEqual(len(dereferencer.dep_props), 2)
+        self.assertEqual(dereferencer.dep_props[0], failing)
+
+    def test_multi_dereferencer(self):
+        """Tests dereferencing several entities, including from list properties, at once"""
+        geoms = [self.part.Geometries.createEllipsoid(name=f'GEOM_{idx}') for idx in range(3)]
+        contact = self.mod.Contacts.create(name='CONTACT_1', i_geometry=geoms[:2], j_geometry=[geoms[2]])
+        joint = self.mod.Constraints.createRevolute(name='JOINT_1', i_marker=self.mkr, j_marker=self.part.cm)
+
+        dereferencer = MultiDereferencer([*geoms[1:], self.mkr])
+        dereferencer.dereference()
+        self.assertListEqual(contact.i_geometry, [geoms[0]])
+        self.assertListEqual(contact.j_geometry, [dereferencer.entity_copies[1]])
+        self.assertEqual(joint.i_marker, dereferencer.entity_copies[2])
+
+        dereferencer.rereference()
+        self.assertListEqual(contact.i_geometry, geoms[:2])
+        self.assertListEqual(contact.j_geometry, [geoms[2]])
+        self.assertEqual(joint.i_marker, self.mkr)
+        self.assertFalse(Adams.evaluate_exp(f'db_exists("{self.mkr.full_name}_2")'))
@@ -0,0 +1,116 @@
+import unittest
+from itertools import count
+from unittest import mock
+
+from test.fake_adams import install, is_fake
+
+Adams = install()
+
+from aviewpy.expressions import (expression_cache, is_read_only_command, normalize_expression,  # noqa: E402
+                                 query_batch)
+from aviewpy.variables import get_dv, set_dv  # noqa: E402
+
+
+class Test_Expressions(unittest.TestCase):
+    """Tests normalizing expressions and classifying commands"""
+
+    def test_normalize_expression(self):
+        """Tests that whitespace and case are removed except inside quoted strings"""
+        self.assertEqual(normalize_expression('DB_EXISTS( ".MOD.Part 1" ) + .MOD.PART_1.Mass'),
+                         'db_exists(".MOD.Part 1")+.mod.part_1.mass')
+
+    def test_read_only_command(self):
+        """Tests that only whole read only command keywords are recognized"""
+        self.assertTrue(is_read_only_command('List_Info  model model_name=.MOD'))
+        self.assertTrue(is_read_only_command('view zoom'))
+        self.assertFalse(is_read_only_command('view_management create'))
+        self.assertFalse(is_read_only_command('part create rigid_body name_and_position part_name=.MOD.P'))
+
+
+@unittest.skipUnless(is_fake(Adams), 'Uses the fake Adams View API')
+class Test_ExpressionCache(unittest.TestCase):
+    """Tests caching `Adams.evaluate_exp` results"""
+
+    def setUp(self):
+        Adams.reset()
+        self.mod = Adams.Models.create(name='MOD')
+        self.part = self.mod.Parts.create(name='PART_1')
+
+    def test_expression_cache_invalidated(self):
+        """Tests that cached expressions are evaluated again after a command changes the model"""
+        with expression_cache() as cache:
+            for _ in range(3):
+                get_dv(self.part, 'dv_1', default=[0])
+            set_dv(self.part.full_name, 'dv_1', [1.0])
+            value = get_dv(self.part, 'dv_1')
+
+        self.assertListEqual(value, [1.0])
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.invalidations, 1)
+
+    def test_read_only_commands(self):
+        """Tests that read only commands do not clear the cache"""
+        with mock.patch.object(Adams, 'execute_cmd'), expression_cache() as cache:
+            Adams.evaluate_exp('.MOD.PART_1.mass')
+            Adams.execute_cmd('list_info model model_name = .MOD')
+            Adams.evaluate_exp('.MOD.PART_1.mass')
+            Adams.execute_cmd('part modify rigid_body mass_properties part_name = .MOD.PART_1 mass = 2')
+            Adams.evaluate_exp('.MOD.PART_1.mass')
+
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(cache.invalidations, 1)
+
+    def test_read_command_file(self):
+        """Tests that reading a command file clears the cache"""
+        with mock.patch.object(Adams, 'read_command_file') as read_command_file, expression_cache() as cache:
+            Adams.evaluate_exp('.MOD.PART_1.mass')
+            Adams.read_command_file('model.cmd')
+            Adams.evaluate_exp('.MOD.PART_1.mass')
+
+        read_command_file.assert_called_once_with('model.cmd')
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(cache.invalidations, 1)
+
+    def test_query_batch(self):
+        """Tests that commands do not clear the cache of a query batch"""
+        with mock.patch.object(Adams, 'execute_cmd'), mock.patch.object(Adams, 'read_command_file'):
+            with query_batch() as cache:
+                Adams.evaluate_exp('.MOD.PART_1.mass')
+                Adams.execute_cmd('part modify rigid_body mass_properties part_name = .MOD.PART_1 mass = 2')
+                Adams.read_command_file('model.cmd')
+                Adams.evaluate_exp('.MOD.PART_1.mass')
+
+        self.assertTrue(cache.read_only)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.invalidations, 0)
+
+    def test_uncacheable(self):
+        """Tests that functions whose value changes between calls are always evaluated"""
+        with mock.patch.object(Adams, 'evaluate_exp', side_effect=count()), expression_cache() as cache:
+            values = [Adams.evaluate_exp(exp) for exp in ['RAND(1)', 'rand(1)', 'UNIQUE_NAME("MAR")',
+                                                          'unique_name("MAR")', '.MOD.PART_1.mass',
+                                                          '.MOD.PART_1.MASS']]
+
+        self.assertListEqual(values, [0, 1, 2, 3, 4, 4])
+        self.assertEqual(cache.uncacheable, 4)
+        self.assertEqual(cache.hits, 1)
+
+    def test_cached_lists_copied(self):
+        """Tests that changing a returned list does not change the cached value"""
+        with mock.patch.object(Adams, 'evaluate_exp', return_value=[1.0, 2.0]), expression_cache():
+            Adams.evaluate_exp('.MOD.PART_1.location').append(3.0)
+            self.assertListEqual(Adams.evaluate_exp('.MOD.PART_1.location'), [1.0, 2.0])
+
+    def test_report(self):
+        """Tests the hit rate and the most frequently cached expressions in the report"""
+        with mock.patch.object(Adams, 'evaluate_exp', return_value=1.0), expression_cache() as cache:
+            for exp in ['.MOD.a'] * 3 + ['.MOD.b'] * 2 + ['rand(1)']:
+                Adams.evaluate_exp(exp)
+
+        self.assertAlmostEqual(cache.hit_rate, 3 / 6)
+        self.assertDictEqual(cache.stats(), {'hits': 3, 'misses': 2, 'uncacheable': 1, 'invalidations': 0,
+                                             'hit_rate': 0.5})
+        self.assertListEqual(cache.report(top=1).splitlines(),
+                             ['Expression cache: 3 hits, 2 misses, 1 uncacheable, 0 invalidations (50.0% hit rate)',
+                              '       2  .mod.a'])
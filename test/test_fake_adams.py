@@ -0,0 +1,52 @@
+import unittest
+
+from test.fake_adams import install, is_fake
+
+Adams = install()
+
+from aviewpy.cs import MarkerCS  # noqa: E402
+from aviewpy.variables import get_dv, set_dv  # noqa: E402
+
+
+@unittest.skipUnless(is_fake(Adams), 'Uses the fake Adams View API')
+class Test_FakeAdams(unittest.TestCase):
+    """Tests aviewpy helpers against the coordinate systems, variables and results of the fake
+    Adams View API"""
+
+    def setUp(self):
+        Adams.reset()
+        self.mod = Adams.Models.create(name='MOD')
+        self.part = self.mod.Parts.create(name='PART_1', location=[1.0, 0.0, 0.0], orientation=[90.0, 0.0, 0.0])
+        self.mkr = self.part.Markers.create(name='MAR_1', location=[1.0, 0.0, 0.0], orientation=[0.0, 90.0, 0.0])
+
+    def test_marker_cs(self):
+        """Tests the global location and orientation of a marker on a rotated part"""
+        cs = MarkerCS(self.mkr)
+        self.assertListEqual([round(v, 6) for v in cs.loc], [1.0, 1.0, 0.0])
+        self.assertListEqual([round(v, 6) for v in cs.ori], [90.0, 90.0, 0.0])
+
+    def test_design_variables(self):
+        """Tests setting, appending to and reading design variables"""
+        set_dv(self.part, 'dv_1', [1.0, 2.0])
+        set_dv(self.part.full_name, 'dv_2', ['a'])
+        set_dv(self.part.full_name, 'dv_2', ['b'], append=True)
+
+        self.assertListEqual(get_dv(self.part, 'dv_1'), [1.0, 2.0])
+        self.assertListEqual(get_dv(self.part.full_name, 'dv_2'), ['a', 'b'])
+        self.assertListEqual(get_dv(self.part, 'dv_3', default=[0]), [0])
+
+    def test_results(self):
+        """Tests reading result set components through the API and expressions"""
+        ans = self.mod.Analyses.create(name='ANS')
+        ans.create_result_set('TIME', {'TIME': [0.0, 0.5, 1.0]})
+        ans.create_result_set('PART_1_XFORM', {'X': [1.0, 2.0, 3.0]})
+
+        self.assertListEqual(ans.results['TIME'].values, [0.0, 0.5, 1.0])
+        self.assertListEqual(Adams.evaluate_exp('.MOD.ANS.PART_1_XFORM.X.values'), [1.0, 2.0, 3.0])
+
+    def test_call_counts(self):
+        """Tests that the fake counts the calls into the Adams View API"""
+        Adams.CALLS.clear()
+        Adams.set_latency(evaluate_exp=1e-4)
+        get_dv(self.part, 'dv_1', default=[0])
+        self.assertEqual(Adams.CALLS['evaluate_exp'], 1)
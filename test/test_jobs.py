@@ -0,0 +1,105 @@
+import os
+import platform
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from aviewpy.jobs import JobScheduler
+from test.fake_solver import install, is_running
+
+
+@unittest.skipIf(platform.system() == 'Windows', 'The fake solver is a posix script')
+class Test_JobScheduler(unittest.TestCase):
+    """Tests running solver jobs in parallel on the local machine"""
+
+    def setUp(self):
+        self._tmp_dir = TemporaryDirectory()
+        self.tmp_dir = Path(self._tmp_dir.name)
+        patcher = mock.patch.dict(os.environ, {'TOPDIR': str(install(self.tmp_dir))})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _acf(self, name: str, *lines: str) -> Path:
+        acf_file = self.tmp_dir / f'{name}.acf'
+        acf_file.write_text('\n'.join([f'{name}.adm', name, *lines, 'STOP']) + '\n')
+        return acf_file
+
+    def test_priority(self):
+        """Tests that queued jobs are started in priority order, then in submission order"""
+        with JobScheduler(max_workers=1) as scheduler:
+            scheduler.submit(self._acf('first', 'sleep=0.5'))
+            for name, priority in [('low', -1), ('normal_1', 0), ('high', 5), ('normal_2', 0)]:
+                scheduler.submit(self._acf(name), priority=priority)
+
+        self.assertListEqual((self.tmp_dir / 'solved.log').read_text().split(),
+                             ['first', 'high', 'normal_1', 'normal_2', 'low'])
+
+    def test_large_job_not_starved(self):
+        """Tests that smaller jobs are not started ahead of a higher priority job that does not fit yet"""
+        with JobScheduler(max_workers=2) as scheduler:
+            scheduler.submit(self._acf('first', 'sleep=0.5'))
+            scheduler.submit(self._acf('large'), priority=5, threads=2)
+            for idx in range(3):
+                scheduler.submit(self._acf(f'small_{idx}'))
+
+        solved = (self.tmp_dir / 'solved.log').read_text().split()
+        self.assertListEqual(solved[:2], ['first', 'large'])
+        self.assertSetEqual(set(solved[2:]), {'small_0', 'small_1', 'small_2'})
+
+    def test_threads(self):
+        """Tests that the thread environment variables are only set for jobs that declare threads"""
+        with mock.patch.dict(os.environ):
+            os.environ.pop('OMP_NUM_THREADS', None)
+            with JobScheduler(max_workers=2) as scheduler:
+                scheduler.submit(self._acf('default', 'env=OMP_NUM_THREADS'))
+                scheduler.submit(self._acf('threaded', 'env=OMP_NUM_THREADS'), threads=2)
+
+        self.assertIn('OMP_NUM_THREADS=\n', (self.tmp_dir / 'default.msg').read_text())
+        self.assertIn('OMP_NUM_THREADS=2\n', (self.tmp_dir / 'threaded.msg').read_text())
+
+    def test_retries(self):
+        """Tests that failed jobs are rerun until their retries are used up"""
+        with JobScheduler(max_workers=2) as scheduler:
+            failed = scheduler.submit(self._acf('failed', 'fail'), retries=2)
+            passed = scheduler.submit(self._acf('passed'), retries=2)
+
+        self.assertFalse(failed.result().succeeded)
+        self.assertEqual(failed.result().returncode, 3)
+        self.assertEqual(failed.result().attempts, 3)
+        self.assertTrue(passed.result().succeeded)
+        self.assertEqual(passed.result().attempts, 1)
+        self.assertEqual(passed.result().res_file, self.tmp_dir / 'passed.res')
+
+    def test_timeout(self):
+        """Tests that a job that exceeds its timeout is killed with its child processes and retried"""
+        with mock.patch('aviewpy.solver.WATCHDOG_POLL_INTERVAL', 0.1):
+            with JobScheduler(max_workers=1) as scheduler:
+                result = scheduler.submit(self._acf('hung', 'child', 'sleep=30'), timeout=0.5, retries=1).result()
+
+        self.assertTrue(result.timed_out)
+        self.assertEqual(result.timeout_reason, 'wall_time')
+        self.assertIsNone(result.returncode)
+        self.assertEqual(result.attempts, 2)
+        self.assertLess(result.wall_time, 10.0)
+        self.assertFalse(is_running(int((self.tmp_dir / 'hung.child').read_text())))
+
+    def test_retry_commands(self):
+        """Tests that each retry solves a copy of the .acf with the retry commands of that attempt"""
+        acf_file = self._acf('run', 'INTEGRATOR/GSTIFF', 'fail', 'SIMULATE/DYNAMIC, END=1.0')
+        retry_commands = [{'INTEGRATOR': 'INTEGRATOR/HHT'}, {'INTEGRATOR': 'INTEGRATOR/WSTIFF', 'FAIL': ''}]
+
+        with JobScheduler(max_workers=1) as scheduler:
+            result = scheduler.submit(acf_file, retries=3, retry_commands=retry_commands).result()
+
+        self.assertTrue(result.succeeded)
+        self.assertEqual(result.attempts, 3)
+        self.assertEqual(result.acf_file, self.tmp_dir / 'run_retry2.acf')
+        self.assertEqual((self.tmp_dir / 'run_retry1.acf').read_text(),
+                         'run.adm\nrun\nINTEGRATOR/HHT\nfail\nSIMULATE/DYNAMIC, END=1.0\nSTOP\n')
+        self.assertEqual((self.tmp_dir / 'run_retry2.acf').read_text(),
+                         'run.adm\nrun\nINTEGRATOR/WSTIFF\n\nSIMULATE/DYNAMIC, END=1.0\nSTOP\n')
+        self.assertEqual((self.tmp_dir / 'solved.log').read_text().split(), ['run'] * 3)
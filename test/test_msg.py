@@ -0,0 +1,35 @@
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from aviewpy.files.msg import get_failed_static_step
+
+TEST_MSG = '''\
+ command: equilibrium/stability=1.00e+01
+ command: simulate/static
+   Static Simulation completed successfully
+ command: equilibrium/stability=1.00e-02
+ command: sim/stat
+ ---- START: ERROR ----
+   Static equilibrium analysis failed to converge
+ ---- END: ERROR ----
+ command: simulate/dynamic, end=1.0, steps=100
+'''
+
+
+class Test_FailedStaticStep(unittest.TestCase):
+    """Tests finding failed static simulations in .msg files"""
+
+    def test_failed_step(self):
+        """Tests that the index of the first failed static simulation is returned"""
+        with TemporaryDirectory() as tmp_dir:
+            msg_file = Path(tmp_dir) / 'run.msg'
+            msg_file.write_text(TEST_MSG)
+            self.assertEqual(get_failed_static_step(msg_file), 1)
+
+    def test_no_failure(self):
+        """Tests that None is returned if every static simulation converged"""
+        with TemporaryDirectory() as tmp_dir:
+            msg_file = Path(tmp_dir) / 'run.msg'
+            msg_file.write_text(TEST_MSG.split(' ---- START')[0])
+            self.assertIsNone(get_failed_static_step(msg_file))
@@ -0,0 +1,157 @@
+import unittest
+from unittest import mock
+
+from test.fake_adams import install, is_fake
+
+Adams = install()
+
+from DataElement import DataElement  # type: ignore # noqa: E402
+from Object import ObjectBase  # type: ignore # noqa: E402
+
+from aviewpy.objects import (AdamsIdAllocator, delete_objects, descendant_names,  # noqa: E402
+                             get_index, get_object, get_objects, iter_descendants,
+                             reserved_names, set_unique_adams_id, unique_object_name,
+                             unique_object_names)
+from aviewpy.utils.dereferencer import Dereferencer  # noqa: E402
+
+
+@unittest.skipUnless(is_fake(Adams), 'Uses the fake Adams View API')
+class Test_Objects(unittest.TestCase):
+    """Tests looking up, traversing, numbering and naming the objects of a model"""
+
+    def setUp(self):
+        Adams.reset()
+        self.mod = Adams.Models.create(name='MOD')
+        self.part = self.mod.Parts.create(name='PART_1', location=[1.0, 0.0, 0.0], orientation=[90.0, 0.0, 0.0])
+        self.mkr = self.part.Markers.create(name='MAR_1', location=[1.0, 0.0, 0.0], orientation=[0.0, 90.0, 0.0])
+
+    def test_delete_objects(self):
+        """Tests that deleted objects are removed from the database and their managers"""
+        delete_objects([self.mkr])
+        self.assertEqual(Adams.evaluate_exp(f'db_exists("{self.mkr.full_name}")'), 0)
+        self.assertNotIn('MAR_1', self.part.Markers)
+
+    def test_object_index(self):
+        """Tests that the index finds objects created, renamed and deleted after it was built"""
+        self.assertIs(get_object('.mod.part_1.mar_1', self.mod), self.mkr)
+
+        # Created, renamed and deleted after the index was built
+        new_mkr = self.part.Markers.create(name='MAR_2')
+        self.mkr.name = 'MAR_3'
+        part_2 = self.mod.Parts.create(name='PART_2')
+        delete_objects([part_2])
+
+        self.assertListEqual(get_objects(['.MOD.PART_1.MAR_2', '.MOD.PART_1.MAR_1', '.MOD.PART_1.MAR_3',
+                                          '.MOD.PART_2', '.MOD.PART_3'], self.mod),
+                             [new_mkr, None, self.mkr, None, None])
+        self.assertNotIn('.mod.part_2', get_index(self.mod).objects)
+
+    def test_object_index_destroyed(self):
+        """Tests that the index does not return objects destroyed without `delete_objects`, but
+        the new objects that replaced them"""
+        geom = self.part.Geometries.createEllipsoid(name='GEOM_1')
+        contact = self.mod.Contacts.create(name='CONTACT_1', i_geometry=[geom], j_geometry=[])
+        self.assertIs(get_object('.MOD.PART_1.GEOM_1', self.mod), geom)
+
+        # Destroyed without delete_objects and replaced by a new object with the same name
+        geom.destroy()
+        self.assertIsNone(get_object('.MOD.PART_1.GEOM_1', self.mod))
+        new_geom = self.part.Geometries.createEllipsoid(name='GEOM_1')
+        self.assertIs(get_object('.MOD.PART_1.GEOM_1', self.mod), new_geom)
+
+        geom_2 = self.part.Geometries.createEllipsoid(name='GEOM_2')
+        contact.i_geometry = [new_geom, geom_2]
+        geom_2.destroy()
+        geom_2 = self.part.Geometries.createEllipsoid(name='GEOM_2')
+        dereferencer = Dereferencer(new_geom)
+        dereferencer.dereference()
+        dereferencer.rereference()
+        self.assertListEqual(contact.i_geometry, [new_geom, geom_2])
+        self.assertIs(contact.i_geometry[1], geom_2)
+
+    def test_object_index_not_rebuilt(self):
+        """Tests that new objects are added to the index without rebuilding it, and that names
+        that cannot be found are only looked up once"""
+        index = get_index(self.mod)
+        index.rebuild()
+        with mock.patch.object(index, 'rebuild') as rebuild:
+            part_2 = self.mod.Parts.create(name='PART_2')
+            mkr_2 = part_2.Markers.create(name='MAR_2')
+            self.assertIs(get_object('.MOD.PART_2.MAR_2', self.mod), mkr_2)
+
+            # Exists in the database but not in the managers
+            ObjectBase(parent=part_2, name='HIDDEN')
+            with mock.patch.object(Adams, 'evaluate_exp', wraps=Adams.evaluate_exp) as evaluate_exp:
+                self.assertIsNone(get_object('.MOD.PART_2.HIDDEN', self.mod))
+                self.assertIsNone(get_object('.MOD.PART_2.HIDDEN', self.mod))
+            self.assertEqual(evaluate_exp.call_count, 1)
+
+        rebuild.assert_not_called()
+
+    def test_iter_descendants(self):
+        """Tests filtering the descendants by type and pruning their subtrees"""
+        part_2 = self.mod.Parts.create(name='PART_2')
+        markers = list(iter_descendants(self.mod, type(self.mkr)))
+        self.assertIn(self.mkr, markers)
+        self.assertIn(part_2.Markers['cm'], markers)
+        self.assertListEqual(sorted(m.full_name for m in markers), sorted(descendant_names(self.mod, 'marker')))
+
+        pruned = list(iter_descendants(self.mod, prune=lambda obj: obj is not part_2))
+        self.assertIn(self.part, pruned)
+        self.assertNotIn(self.mkr, pruned)
+        self.assertIn(part_2.Markers['cm'], pruned)
+
+    def test_iter_descendants_pruned_objects(self):
+        """Tests that the objects of a pruned group or UDE instance are still yielded"""
+        part_2 = self.mod.Parts.create(name='PART_2')
+        self.mod.Groups.create(name='GROUP_1', objects=[self.mkr])
+
+        pruned = list(iter_descendants(self.mod, prune=lambda obj: True))
+        self.assertIn(self.mkr, pruned)
+        self.assertNotIn(part_2.cm, pruned)
+
+    def test_adams_id_allocator(self):
+        """Tests that duplicate adams ids are renumbered per id class"""
+        splines = [self.mod.DataElements.createSpline(name=f'SPLINE_{idx}') for idx in range(3)]
+        array = self.mod.DataElements.createArray(name='ARRAY_1')
+        for ent in [*splines, array]:
+            ent.__dict__['adams_id'] = 1  # As if merged from subsystems
+
+        self.assertListEqual(AdamsIdAllocator(self.mod).assign(splines), [2, 3, 4])
+        self.assertListEqual([ent.adams_id for ent in [*splines, array]], [2, 3, 4, 1])
+
+        mkr_2 = self.part.Markers.create(name='MAR_2')
+        mkr_2.__dict__['adams_id'] = self.mkr.adams_id
+        self.assertNotEqual(set_unique_adams_id(mkr_2), self.mkr.adams_id)
+        self.assertEqual(set_unique_adams_id(self.mkr), self.mkr.adams_id)
+
+    def test_adams_id_allocate_no_side_effects(self):
+        """Tests that allocate only returns ids and that assign records them for reuse"""
+        splines = [self.mod.DataElements.createSpline(name=f'SPLINE_{idx}') for idx in range(3)]
+        for ent in splines:
+            ent.__dict__['adams_id'] = 1
+
+        allocator = AdamsIdAllocator(self.mod)
+        self.assertListEqual(allocator.allocate(splines), [1, 2, 3])
+        self.assertListEqual(allocator.allocate(splines[1:]), [2, 3])
+        self.assertDictEqual(allocator.owners[DataElement], {1: ['.mod.spline_0', '.mod.spline_1', '.mod.spline_2']})
+        self.assertListEqual([ent.adams_id for ent in splines], [1, 1, 1])
+
+        with mock.patch('aviewpy.objects.iter_descendants', wraps=iter_descendants) as walk:
+            self.assertEqual(set_unique_adams_id(splines[1], allocator), 2)
+            self.assertEqual(set_unique_adams_id(splines[2], allocator), 3)
+        walk.assert_not_called()
+        self.assertDictEqual(allocator.owners[DataElement],
+                             {1: ['.mod.spline_0'], 2: ['.mod.spline_1'], 3: ['.mod.spline_2']})
+
+    def test_unique_object_names(self):
+        """Tests that unique names skip existing and reserved names"""
+        self.part.Markers.create(name='MAR_2')
+        self.assertEqual(unique_object_name('.MOD.PART_1.MAR_0'), '.MOD.PART_1.MAR_0')
+        self.assertEqual(unique_object_name('.MOD.PART_1.MAR_1'), '.MOD.PART_1.MAR_3')
+        self.assertListEqual(unique_object_names('.MOD.PART_1.MAR', 2), ['.MOD.PART_1.MAR', '.MOD.PART_1.MAR_3'])
+
+        with reserved_names('.MOD.PART_1.MAR', 2) as names:
+            self.assertListEqual(unique_object_names('.MOD.PART_1.MAR', 2), ['.MOD.PART_1.MAR_4', '.MOD.PART_1.MAR_5'])
+        self.assertListEqual(names, ['.MOD.PART_1.MAR', '.MOD.PART_1.MAR_3'])
+        self.assertEqual(unique_object_name('.MOD.PART_1.MAR'), '.MOD.PART_1.MAR')
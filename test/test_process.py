@@ -0,0 +1,142 @@
+import json
+import platform
+import subprocess
+import sys
+import time
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from aviewpy.utils.process import (CpuAllocator, ProcessMonitor, parse_cpu_list, read_process_stats,
+                                   terminate_process_tree)
+from test.fake_solver import is_running
+
+PROC_FILES = {
+    '/proc/1234/stat': ('1234 (adams (solver) 2023) R 1 1234 1234 0 -1 4194304 5000 0 0 0 '
+                        '250 50 30 20 20 0 4 0 100 1000000 2048 18446744073709551615\n'),
+    '/proc/1234/status': 'Name:\tadams\nVmPeak:\t  99999 kB\nVmRSS:\t  20480 kB\nThreads:\t4\n',
+    '/proc/1234/io': 'rchar: 1\nwchar: 2\nread_bytes: 4096\nwrite_bytes: 8192\ncancelled_write_bytes: 0\n',
+}
+"""Canned /proc files of a solver process whose command name contains spaces and brackets"""
+
+# Burns CPU time, touches 50 MB of memory and writes a file for about half a second
+CHILD_SCRIPT = '''
+import sys, time
+data = bytearray(50 * 2**20)
+end = time.time() + 0.5
+while time.time() < end:
+    sum(range(1000))
+open(sys.argv[1], 'wb').write(bytes(2**20))
+'''
+
+PARENT_SCRIPT = '''
+import subprocess, sys, time
+child = subprocess.Popen([sys.executable, '-c', 'import signal, sys, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); '
+                          'open(sys.argv[1], "w").write("ready"); time.sleep(60)', sys.argv[1]])
+while open(sys.argv[1]).read() != 'ready':
+    time.sleep(0.01)
+open(sys.argv[1], 'w').write(str(child.pid))
+time.sleep(60)
+'''
+
+
+class Test_CpuAllocator(unittest.TestCase):
+    """Tests handing out disjoint cpu sets"""
+
+    def setUp(self):
+        self.allocator = CpuAllocator(range(8), numa=False)
+        self.allocator.nodes = [[0, 1, 2, 3], [4, 5, 6, 7]]
+
+    def test_parse_cpu_list(self):
+        """Tests parsing a Linux cpu list"""
+        self.assertEqual(parse_cpu_list('0-3,8,10-11\n'), [0, 1, 2, 3, 8, 10, 11])
+
+    def test_single_node(self):
+        """Tests that requests are kept on one node, filling the fullest node that fits first"""
+        self.assertEqual(self.allocator.allocate(3), [0, 1, 2])
+        self.assertEqual(self.allocator.allocate(2), [4, 5])
+        self.assertEqual(self.allocator.allocate(1), [3])
+        self.assertIsNone(self.allocator.allocate(3))
+
+    def test_span_nodes(self):
+        """Tests that requests larger than a node are spread over the nodes"""
+        self.assertEqual(sorted(self.allocator.allocate(6)), [0, 1, 2, 3, 4, 5])
+        self.assertEqual(self.allocator.free, 2)
+
+    def test_release(self):
+        """Tests that released cpus are handed out again"""
+        cpus = self.allocator.allocate(4)
+        self.allocator.release(cpus)
+        self.assertEqual(self.allocator.free, 8)
+
+
+class Test_ProcessStats(unittest.TestCase):
+    """Tests reading the resource usage of processes"""
+
+    def _read_text(self, path: Path, *_, **__) -> str:
+        try:
+            return PROC_FILES[path.as_posix()]
+        except KeyError:
+            raise FileNotFoundError(path) from None
+
+    def test_read_process_stats(self):
+        """Tests parsing canned /proc files"""
+        with mock.patch.object(Path, 'read_text', autospec=True, side_effect=self._read_text), \
+                mock.patch('aviewpy.utils.process.CLOCK_TICKS', 100):
+            stats = read_process_stats(1234)
+
+        self.assertEqual(stats.cpu_time, 3.5)
+        self.assertEqual(stats.rss, 20480 * 1024)
+        self.assertEqual(stats.read_bytes, 4096)
+        self.assertEqual(stats.write_bytes, 8192)
+
+    def test_missing_process(self):
+        """Tests that None is returned for a process that does not exist"""
+        with mock.patch.object(Path, 'read_text', autospec=True, side_effect=self._read_text):
+            self.assertIsNone(read_process_stats(4321))
+
+    @unittest.skipUnless(platform.system() == 'Linux', 'Resource usage is only sampled on Linux')
+    def test_process_monitor(self):
+        """Tests monitoring a short lived process and the telemetry it writes"""
+        with TemporaryDirectory() as tmp_dir:
+            output_file = Path(tmp_dir) / 'run_telemetry.json'
+            proc = subprocess.Popen([sys.executable, '-c', CHILD_SCRIPT, str(Path(tmp_dir) / 'out.bin')])
+            monitor = ProcessMonitor(proc, interval=0.05, output_file=output_file)
+            monitor.join(timeout=30)
+            telemetry = json.loads(output_file.read_text())
+
+        self.assertEqual(proc.returncode, 0)
+        self.assertEqual(telemetry['pid'], proc.pid)
+        self.assertEqual(telemetry['args'][0], sys.executable)
+        self.assertGreaterEqual(telemetry['wall_time'], 0.5)
+        self.assertGreater(telemetry['cpu_time'], 0.1)
+        self.assertGreater(telemetry['peak_rss'], 50 * 2**20)
+        self.assertEqual(telemetry['interval'], 0.05)
+        self.assertGreater(len(telemetry['samples']), 3)
+        self.assertTrue(all(len(sample) == 5 for sample in telemetry['samples']))
+        self.assertListEqual([sample[0] for sample in telemetry['samples']],
+                             sorted(sample[0] for sample in telemetry['samples']))
+
+
+@unittest.skipUnless(platform.system() == 'Linux', 'Descendants are only found on Linux')
+class Test_TerminateProcessTree(unittest.TestCase):
+    """Tests terminating a process and its descendants"""
+
+    def test_descendant_ignoring_sigterm(self):
+        """Tests that a descendant ignoring SIGTERM is killed after the grace period, even though
+        its parent exited"""
+        with TemporaryDirectory() as tmp_dir:
+            pid_file = Path(tmp_dir) / 'child.pid'
+            pid_file.write_text('')
+            proc = subprocess.Popen([sys.executable, '-c', PARENT_SCRIPT, str(pid_file)])
+            while not pid_file.read_text().isdigit():
+                time.sleep(0.01)
+            child_pid = int(pid_file.read_text())
+
+            start = time.monotonic()
+            terminate_process_tree(proc, grace_period=0.5)
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.5)
+        self.assertIsNotNone(proc.poll())
+        self.assertFalse(is_running(child_pid))
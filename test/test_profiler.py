@@ -0,0 +1,141 @@
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from test.fake_adams import install, is_fake
+
+Adams = install()
+
+from Manager import AdamsManager  # type: ignore # noqa: E402
+
+from aviewpy.expressions import expression_cache  # noqa: E402
+from aviewpy.profiler import Profiler, get_command_keyword, get_expression_function, profile  # noqa: E402
+from aviewpy.variables import get_dv, set_dv  # noqa: E402
+
+
+class Test_ProfilerNames(unittest.TestCase):
+    """Tests naming the profiled calls"""
+
+    def test_command_keyword(self):
+        """Tests that only the keywords before the first argument are kept"""
+        self.assertEqual(get_command_keyword('Part Create Rigid_Body name_and_position part_name = .M.P'),
+                         'part create rigid_body')
+        self.assertEqual(get_command_keyword('variable set variable_name=.M.V integer_value=1'), 'variable set')
+
+    def test_expression_function(self):
+        """Tests that the outermost function is returned"""
+        self.assertEqual(get_expression_function('DB_EXISTS(".M.P")'), 'db_exists')
+        self.assertEqual(get_expression_function('.M.P.mass'), '(value)')
+
+
+@unittest.skipUnless(is_fake(Adams), 'Uses the fake Adams View API')
+class Test_Profiler(unittest.TestCase):
+    """Tests profiling the Adams View API calls of aviewpy helpers"""
+
+    def setUp(self):
+        Adams.reset()
+        self.mod = Adams.Models.create(name='MOD')
+        self.part = self.mod.Parts.create(name='PART_1')
+        self._tmp_dir = TemporaryDirectory()
+        self.tmp_dir = Path(self._tmp_dir.name)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _counts(self, prof: Profiler) -> dict:
+        return {(s.kind, s.name, s.caller): s.calls for s in prof.stats()}
+
+    def test_call_counts(self):
+        """Tests that the calls are counted per command, expression function, manager method and caller"""
+        Adams.CALLS.clear()
+        with Profiler() as prof:
+            for _ in range(3):
+                get_dv(self.part, 'dv_1', default=[0])
+            set_dv(self.part.full_name, 'dv_1', [1.0])
+            list(self.mod.Parts.values())
+
+        counts = self._counts(prof)
+        exp_calls = sum(calls for (kind, _, _), calls in counts.items() if kind == 'exp')
+        cmd_calls = sum(calls for (kind, _, _), calls in counts.items() if kind == 'cmd')
+        self.assertEqual(exp_calls, Adams.CALLS['evaluate_exp'])
+        self.assertEqual(cmd_calls, Adams.CALLS['execute_cmd'])
+        self.assertEqual(sum(calls for (kind, _, caller), calls in counts.items()
+                             if kind == 'exp' and caller == 'aviewpy.variables.get_dv'), 3)
+        self.assertTrue(any(kind == 'cmd' and caller.startswith('aviewpy.variables.') for kind, _, caller in counts))
+        self.assertEqual(counts[('manager', f'{type(self.mod.Parts).__name__}.values', 'test_call_counts')], 1)
+        self.assertIn('Adams API calls took', prof.report(top=3))
+        self.assertEqual(len(prof.report(top=3).splitlines()), 5)
+
+    def test_uninstalled(self):
+        """Tests that the API is only restored when the last active profiler stops"""
+        execute_cmd, evaluate_exp = Adams.execute_cmd, Adams.evaluate_exp
+        values = AdamsManager.__dict__['values']
+
+        outer = Profiler().start()
+        with Profiler() as inner:
+            self.assertIsNot(Adams.evaluate_exp, evaluate_exp)
+            self.assertIsNot(AdamsManager.__dict__['values'], values)
+            Adams.evaluate_exp('1')
+
+        self.assertIsNot(Adams.evaluate_exp, evaluate_exp)
+        Adams.evaluate_exp('1')
+        outer.stop()
+
+        self.assertIs(Adams.execute_cmd, execute_cmd)
+        self.assertIs(Adams.evaluate_exp, evaluate_exp)
+        self.assertIs(AdamsManager.__dict__['values'], values)
+        self.assertEqual(sum(s.calls for s in inner.stats()), 1)
+        self.assertEqual(sum(s.calls for s in outer.stats()), 2)
+
+        Adams.evaluate_exp('1')
+        self.assertEqual(sum(s.calls for s in outer.stats()), 2)
+
+    def test_interleaved_expression_cache(self):
+        """Tests stopping a profiler and an expression cache out of order, which leaves the wrapper
+        of the one started first in the call chain of the other"""
+        execute_cmd, evaluate_exp = Adams.execute_cmd, Adams.evaluate_exp
+
+        for first, second in [('cache', 'profiler'), ('profiler', 'cache')]:
+            cache_context = expression_cache()
+            started = {}
+            for name in (first, second):
+                started[name] = cache_context.__enter__() if name == 'cache' else Profiler().start()
+            cache_context.__exit__(None, None, None)
+            started['profiler'].stop()
+
+            # A stale wrapper passes calls through to Adams View
+            self.assertEqual(Adams.evaluate_exp('1'), 1)
+            Adams.execute_cmd('variable set variable_name = .MOD.V integer_value = 1')
+
+            # Starting again reuses it, and the last one to stop restores the API
+            with expression_cache() as cache, Profiler() as prof:
+                get_dv(self.part, 'dv_1', default=[0])
+                get_dv(self.part, 'dv_1', default=[0])
+            self.assertEqual(cache.hits, 1)
+            self.assertEqual(sum(s.calls for s in prof.stats() if s.kind == 'exp'), 2)
+            self.assertIs(Adams.execute_cmd, execute_cmd)
+            self.assertIs(Adams.evaluate_exp, evaluate_exp)
+
+    def test_trace(self):
+        """Tests the Chrome trace event file written by the `profile` decorator"""
+        trace_file = self.tmp_dir / 'trace.json'
+
+        @profile(trace_file=trace_file)
+        def make_dvs():
+            set_dv(self.part.full_name, 'dv_1', [1.0])
+            return get_dv(self.part, 'dv_1')
+
+        self.assertListEqual(make_dvs(), [1.0])
+        trace = json.loads(trace_file.read_text())
+
+        self.assertEqual(trace['displayTimeUnit'], 'ms')
+        self.assertEqual(len(trace['traceEvents']), len(make_dvs.profiler.events))
+        self.assertLessEqual({'cmd', 'exp'}, {event['cat'] for event in trace['traceEvents']})
+        for event in trace['traceEvents']:
+            self.assertSetEqual(set(event), {'name', 'cat', 'ph', 'ts', 'dur', 'pid', 'tid', 'args'})
+            self.assertEqual(event['ph'], 'X')
+            self.assertGreaterEqual(event['ts'], 0)
+            self.assertGreaterEqual(event['dur'], 0)
+            self.assertSetEqual(set(event['args']), {'caller', 'text'})
+        self.assertIn('dv_1', trace['traceEvents'][0]['args']['text'])
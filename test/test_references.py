@@ -0,0 +1,38 @@
+import unittest
+
+from test.fake_adams import install, is_fake
+
+Adams = install()
+
+from aviewpy.references import ReferenceGraph  # noqa: E402
+from aviewpy.utils.fbd import is_attached, is_ipart  # noqa: E402
+
+
+@unittest.skipUnless(is_fake(Adams), 'Uses the fake Adams View API')
+class Test_ReferenceGraph(unittest.TestCase):
+    """Tests querying the references between the objects of a model"""
+
+    def setUp(self):
+        Adams.reset()
+        self.mod = Adams.Models.create(name='MOD')
+        self.part = self.mod.Parts.create(name='PART_1', location=[1.0, 0.0, 0.0], orientation=[90.0, 0.0, 0.0])
+        self.mkr = self.part.Markers.create(name='MAR_1', location=[1.0, 0.0, 0.0], orientation=[0.0, 90.0, 0.0])
+
+    def test_reference_graph(self):
+        """Tests the references from and to objects, and updating them after the model changes"""
+        part_2 = self.mod.Parts.create(name='PART_2')
+        mkr_2 = part_2.Markers.create(name='MAR_2')
+        joint = self.mod.Constraints.createRevolute(name='JOINT_1', i_marker=self.mkr, j_marker=mkr_2)
+
+        graph = ReferenceGraph.from_model(self.mod)
+        self.assertListEqual([(ref.source, ref.attribute) for ref in graph.referrers(self.mkr)],
+                             [(joint, 'i_marker')])
+        self.assertListEqual([ref.target for ref in graph.references(joint, ['j_marker'])], [mkr_2])
+        self.assertTrue(is_attached(self.part, joint, graph))
+        self.assertFalse(is_ipart(part_2, joint, graph))
+
+        joint.i_marker = part_2.cm
+        graph.invalidate(joint)
+        self.assertListEqual(graph.referrers(self.mkr), [])
+        graph.discard(mkr_2)
+        self.assertListEqual([ref.target for ref in graph.references(joint)], [part_2.cm])
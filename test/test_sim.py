@@ -0,0 +1,154 @@
+import os
+import re
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+from unittest import mock
+
+from test.fake_adams import install, is_fake
+
+Adams = install()
+
+from aviewpy.sim import _prefix_path, adaptive_static_funnel, temp_sim_prefs, write_simulation_files  # noqa: E402
+
+EQUILIBRIUM_PATTERN = re.compile(r'^equilibrium/alimit=(\S+)$', flags=re.MULTILINE)
+
+
+def fake_solve(acf_file: Path, **_):
+    """Stands in for `solve`. Writes a .msg in which a static step fails if it moves the funnel
+    parameter more than 0.3 from the previous step."""
+    acf_file = Path(acf_file)
+    prefix = acf_file.read_text().splitlines()[1]
+
+    lines, previous = [], 0.0
+    for value in map(float, EQUILIBRIUM_PATTERN.findall(acf_file.read_text())):
+        lines += [f' command: equilibrium/alimit={value:.2e}', ' command: simulate/static']
+        if value - previous > 0.3:
+            lines.append(' ---- START: ERROR ----')
+        previous = value
+
+    acf_file.with_name(f'{prefix}.msg').write_text('\n'.join(lines) + '\n')
+    return SimpleNamespace(returncode=0)
+
+
+class Test_AdaptiveStaticFunnel(unittest.TestCase):
+    """Tests adding static steps where a funnel fails"""
+
+    def setUp(self):
+        self._tmp_dir = TemporaryDirectory()
+        self.tmp_dir = Path(self._tmp_dir.name)
+        self.acf_file = self.tmp_dir / 'run.acf'
+        self.acf_file.write_text('run.adm\nrun\nsimulate/dynamic, end=1.0, steps=10\nSTOP\n')
+        (self.tmp_dir / 'run.adm').write_text('ADAMS/View model name: run\nEND\n')
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _funnel(self, **kwargs):
+        with mock.patch('aviewpy.sim.solve', side_effect=fake_solve) as solve:
+            result = adaptive_static_funnel(self.acf_file, steps=3, schedule_dir=self.tmp_dir / 'funnels',
+                                            alimit=(0.0, 1.0), **kwargs)
+        return result, solve.call_count
+
+    def test_bisection(self):
+        """Tests that steps are only added before the steps that fail and that the converged funnel
+        is saved and reused"""
+        result, runs = self._funnel()
+
+        self.assertTrue(result.converged)
+        self.assertEqual(result.runs, runs)
+        self.assertEqual(runs, 4)
+        self.assertListEqual([round(f, 4) for f in result.fractions],
+                             [0.1667, 0.3333, 0.5, 0.6667, 0.8333, 1.0])
+        self.assertIn('simulate/dynamic', (self.tmp_dir / 'run_funnel.acf').read_text())
+
+        saved, runs = self._funnel()
+        self.assertTrue(saved.converged)
+        self.assertEqual(runs, 1)
+        self.assertListEqual(saved.fractions, result.fractions)
+
+    def test_max_runs(self):
+        """Tests that the last funnel is returned unconverged when the runs are used up"""
+        result, runs = self._funnel(max_runs=2)
+        self.assertFalse(result.converged)
+        self.assertEqual(runs, 2)
+        self.assertEqual(len(result.fractions), 5)
+        self.assertFalse(list((self.tmp_dir / 'funnels').glob('*.json')))
+
+        with self.assertRaises(ValueError):
+            self._funnel(max_runs=0)
+
+
+@unittest.skipUnless(is_fake(Adams), 'Uses the fake Adams View API')
+class Test_JobDir(unittest.TestCase):
+    """Tests writing simulation files to an isolated job directory"""
+
+    def setUp(self):
+        Adams.reset()
+        mod = Adams.Models.create(name='MOD')
+        self.sim = mod.Simulations.create(name='SIM_1', end_time=2.0)
+        self._tmp_dir = TemporaryDirectory()
+        self.tmp_dir = Path(self._tmp_dir.name)
+        self.aux_file = self.tmp_dir / 'road.rdf'
+        self.aux_file.write_text('road')
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _write(self):
+        return write_simulation_files(self.sim, 'run_1', self.tmp_dir / 'jobs', aux_files=[self.aux_file],
+                                      scratch=True)
+
+    def test_job_dir(self):
+        """Tests that the .acf refers to the files by name and that the aux files are linked"""
+        job_dir = self._write()
+
+        self.assertEqual(job_dir, self.tmp_dir / 'jobs' / 'run_1')
+        self.assertListEqual(sorted(f.name for f in job_dir.iterdir()), ['road.rdf', 'run_1.acf', 'run_1.adm'])
+        self.assertListEqual((job_dir / 'run_1.acf').read_text().splitlines()[:3],
+                             ['run_1.adm', 'run_1', 'simulate/dynamic, end=2.0, steps=10'])
+        self.assertEqual(os.stat(job_dir / 'road.rdf').st_ino, os.stat(self.aux_file).st_ino)
+        self.assertEqual(Adams.evaluate_exp('.sim_preferences.file_prefix'), '')
+
+    def test_replace_job_dir(self):
+        """Tests that an existing job directory is swapped out and no scratch directories are left"""
+        stale_file = self._write() / 'run_1.res'
+        stale_file.write_text('stale')
+
+        job_dir = self._write()
+        self.assertFalse(stale_file.exists())
+        self.assertTrue((job_dir / 'run_1.acf').is_file())
+        self.assertListEqual([f.name for f in job_dir.parent.iterdir()], ['run_1'])
+
+    def test_failed_write(self):
+        """Tests that a failed write leaves the existing job directory untouched"""
+        job_dir = self._write()
+        with mock.patch.object(type(self.sim), 'simulate', side_effect=RuntimeError('license')):
+            with self.assertRaises(RuntimeError):
+                self._write()
+
+        self.assertListEqual([f.name for f in job_dir.parent.iterdir()], ['run_1'])
+        self.assertTrue((job_dir / 'run_1.acf').is_file())
+
+    def test_prefix_path(self):
+        """Tests that separators are only converted to backslashes on Windows, where Adams View expects
+        them. Scratch directories are written with absolute prefixes, which must stay valid elsewhere."""
+        with mock.patch('platform.system', return_value='Linux'):
+            self.assertEqual(_prefix_path('/scratch/.run_1_x/run_1'), '/scratch/.run_1_x/run_1')
+        with mock.patch('platform.system', return_value='Windows'):
+            self.assertEqual(_prefix_path('C:/scratch/run_1'), r'C:\\scratch\\run_1')
+
+
+@unittest.skipUnless(is_fake(Adams), 'Uses the fake Adams View API')
+class Test_SimPrefs(unittest.TestCase):
+    """Tests temporarily changing the simulation preferences"""
+
+    def setUp(self):
+        Adams.reset()
+
+    def test_sim_prefs_restored(self):
+        """Tests that the preferences are restored when the block exits"""
+        with temp_sim_prefs(solver_preference='external'):
+            self.assertEqual(Adams.evaluate_exp('.sim_preferences.solver_preference'), 1)
+        self.assertEqual(Adams.evaluate_exp('.sim_preferences.solver_preference'), 0)
@@ -0,0 +1,275 @@
+import asyncio
+import json
+import os
+import platform
+import threading
+import time
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from aviewpy import solver
+from aviewpy.solver import (CachedProcess, _tail_file, gather_solves, get_result_key, run_in_background, solve,
+                            solve_async)
+from aviewpy.utils.process import terminate_process_tree
+from test.fake_solver import install, is_running
+
+
+@unittest.skipIf(platform.system() == 'Windows', 'The fake solver is a posix script')
+class Test_Watchdog(unittest.TestCase):
+    """Tests terminating solver runs that exceed their limits"""
+
+    def setUp(self):
+        self._tmp_dir = TemporaryDirectory()
+        self.tmp_dir = Path(self._tmp_dir.name)
+        patcher = mock.patch.dict(os.environ, {'TOPDIR': str(install(self.tmp_dir))})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _acf(self, name: str, *lines: str) -> Path:
+        acf_file = self.tmp_dir / f'{name}.acf'
+        acf_file.write_text('\n'.join([f'{name}.adm', name, *lines, 'STOP']) + '\n')
+        return acf_file
+
+    def test_stalled(self):
+        """Tests that a run whose .msg stops growing is terminated and diagnosed"""
+        acf_file = self._acf('stall', 'msg=last words', 'child', 'sleep=30')
+        with mock.patch('aviewpy.solver.WATCHDOG_POLL_INTERVAL', 0.1):
+            proc = solve(acf_file, wait=True, stall_time=1.0)
+
+        self.assertEqual(proc.watchdog.reason, 'stalled')
+        self.assertNotEqual(proc.returncode, 0)
+        self.assertFalse(is_running(int((self.tmp_dir / 'stall.child').read_text())))
+
+        diagnostics = json.loads((self.tmp_dir / 'stall_watchdog.json').read_text())
+        self.assertEqual(diagnostics['reason'], 'stalled')
+        self.assertGreaterEqual(diagnostics['since_progress'], 1.0)
+        self.assertIn('last words', diagnostics['tails']['stall.msg'])
+        self.assertEqual(diagnostics['processes'][0]['pid'], proc.pid)
+        self.assertGreaterEqual(len(diagnostics['processes']), 2)
+
+    def test_wall_time(self):
+        """Tests that a run that is still making progress is terminated at its wall clock limit"""
+        acf_file = self._acf('slow', *['msg=step', 'sleep=0.1'] * 100)
+        with mock.patch('aviewpy.solver.WATCHDOG_POLL_INTERVAL', 0.1):
+            proc = solve(acf_file, wait=True, wall_time=1.0, stall_time=1.0)
+
+        self.assertEqual(proc.watchdog.reason, 'wall_time')
+        self.assertEqual(json.loads((self.tmp_dir / 'slow_watchdog.json').read_text())['reason'], 'wall_time')
+
+    def test_no_limit_hit(self):
+        """Tests that a run within its limits is left alone"""
+        proc = solve(self._acf('quick'), wait=True, wall_time=30.0)
+        self.assertIsNone(proc.watchdog.reason)
+        self.assertEqual(proc.returncode, 0)
+        self.assertFalse((self.tmp_dir / 'quick_watchdog.json').exists())
+
+    def test_terminate_process_tree(self):
+        """Tests that the children are terminated and that a process ignoring SIGTERM is killed
+        after the grace period"""
+        proc = solve(self._acf('stubborn', 'child', 'ignore_sigterm', 'sleep=30'))
+        child_file = self.tmp_dir / 'stubborn.child'
+        while not child_file.exists() or not child_file.read_text():
+            time.sleep(0.05)
+
+        start = time.monotonic()
+        terminate_process_tree(proc, grace_period=0.5)
+        self.assertGreaterEqual(time.monotonic() - start, 0.5)
+        self.assertIsNotNone(proc.poll())
+        self.assertFalse(is_running(int(child_file.read_text())))
+
+
+@unittest.skipIf(platform.system() == 'Windows', 'The fake solver is a posix script')
+class Test_SolveAsync(unittest.TestCase):
+    """Tests solving on an asyncio event loop"""
+
+    def setUp(self):
+        self._tmp_dir = TemporaryDirectory()
+        self.tmp_dir = Path(self._tmp_dir.name)
+        patcher = mock.patch.dict(os.environ, {'TOPDIR': str(install(self.tmp_dir))})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _acf(self, name: str, *lines: str) -> Path:
+        acf_file = self.tmp_dir / f'{name}.acf'
+        acf_file.write_text('\n'.join([f'{name}.adm', name, *lines, 'STOP']) + '\n')
+        return acf_file
+
+    def test_gather_solves(self):
+        """Tests that no more than `max_concurrent` solvers run at once and that the results are in order"""
+        running, peak = 0, 0
+
+        async def counting_solve_async(acf_file, **kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            try:
+                return await solve_async(acf_file, **kwargs)
+            finally:
+                running -= 1
+
+        acf_files = [self._acf(f'run_{idx}', 'sleep=0.2', *(['fail'] if idx == 3 else [])) for idx in range(6)]
+        with mock.patch('aviewpy.solver.solve_async', counting_solve_async):
+            results = asyncio.run(gather_solves(acf_files, max_concurrent=2))
+
+        self.assertEqual(peak, 2)
+        self.assertListEqual([r.acf_file for r in results], acf_files)
+        self.assertListEqual([r.succeeded for r in results], [True, True, True, False, True, True])
+        self.assertEqual(results[0].res_file, self.tmp_dir / 'run_0.res')
+
+    def test_msg_callback(self):
+        """Tests that every line of the .msg file is passed to the callback while the solver runs"""
+        lines = []
+        acf_file = self._acf('run', 'msg=first', 'sleep=0.3', 'msg=second')
+        with mock.patch('aviewpy.solver.MSG_POLL_INTERVAL', 0.05):
+            result = asyncio.run(solve_async(acf_file, msg_callback=lines.append))
+
+        self.assertTrue(result.succeeded)
+        self.assertListEqual(lines[1:], ['first', 'second', 'finished'])
+
+    def test_tail_file(self):
+        """Tests that appended lines are passed on once complete and the rest when cancelled"""
+        file = self.tmp_dir / 'run.msg'
+        file.write_text('old\n')
+        lines = []
+
+        async def tail():
+            task = asyncio.ensure_future(_tail_file(file, lines.append))
+            with file.open('a') as fid:
+                fid.write('line 1\nline ')
+                fid.flush()
+                await asyncio.sleep(0.15)
+                self.assertListEqual(lines, ['old', 'line 1'])
+                fid.write('2')
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        with mock.patch('aviewpy.solver.MSG_POLL_INTERVAL', 0.05):
+            asyncio.run(tail())
+        self.assertListEqual(lines, ['old', 'line 1', 'line 2'])
+
+    def test_run_in_background(self):
+        """Tests that coroutines run on one event loop in a background thread"""
+        async def thread_id():
+            return threading.get_ident()
+
+        future = run_in_background(gather_solves([self._acf('run')]))
+        self.assertTrue(future.result(timeout=30)[0].succeeded)
+
+        loop = solver._BACKGROUND_LOOP
+        self.assertNotEqual(run_in_background(thread_id()).result(timeout=30), threading.get_ident())
+        self.assertIs(solver._BACKGROUND_LOOP, loop)
+
+    def test_run_in_background_threads(self):
+        """Tests that concurrent first calls from several threads start a single event loop"""
+        async def thread_id():
+            return threading.get_ident()
+
+        new_event_loop = asyncio.new_event_loop
+
+        def slow_new_event_loop():
+            time.sleep(0.05)
+            return new_event_loop()
+
+        barrier = threading.Barrier(4)
+        futures = []
+
+        def submit():
+            barrier.wait()
+            futures.append(run_in_background(thread_id()))
+
+        with mock.patch.object(solver, '_BACKGROUND_LOOP', None), \
+                mock.patch('asyncio.new_event_loop', side_effect=slow_new_event_loop) as new_loop:
+            threads = [threading.Thread(target=submit) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            loop = solver._BACKGROUND_LOOP
+
+        self.assertEqual(new_loop.call_count, 1)
+        self.assertEqual(len({future.result(timeout=30) for future in futures}), 1)
+        loop.call_soon_threadsafe(loop.stop)
+
+
+@unittest.skipIf(platform.system() == 'Windows', 'The fake solver is a posix script')
+class Test_ResultCache(unittest.TestCase):
+    """Tests storing solver outputs in the result cache and restoring them"""
+
+    def setUp(self):
+        self._tmp_dir = TemporaryDirectory()
+        self.tmp_dir = Path(self._tmp_dir.name)
+        self.cache_dir = self.tmp_dir / 'cache'
+        patcher = mock.patch.dict(os.environ, {'TOPDIR': str(install(self.tmp_dir))})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _acf(self, name: str, *lines: str) -> Path:
+        acf_file = self.tmp_dir / f'{name}.acf'
+        acf_file.write_text('\n'.join([f'{name}.adm', name, *lines, 'STOP']) + '\n')
+        return acf_file
+
+    def _solved(self):
+        return (self.tmp_dir / 'solved.log').read_text().splitlines()
+
+    def test_round_trip(self):
+        """Tests that a stored run is restored as hard links without running the solver again"""
+        acf_file = self._acf('run', 'msg=first')
+        proc = solve(acf_file, wait=True, cache=True, cache_dir=self.cache_dir)
+        self.assertEqual(proc.returncode, 0)
+
+        entry = self.cache_dir / get_result_key(acf_file)
+        self.assertEqual(sorted(file.name for file in entry.iterdir()), ['result.msg', 'result.res'])
+
+        proc = solve(acf_file, wait=True, cache=True, cache_dir=self.cache_dir)
+        self.assertIsInstance(proc, CachedProcess)
+        self.assertEqual(self._solved(), ['run'])
+        self.assertEqual(sorted(file.name for file in proc.files), ['run.msg', 'run.res'])
+        self.assertEqual((self.tmp_dir / 'run.msg').stat().st_ino, (entry / 'result.msg').stat().st_ino)
+
+    def test_resolve_after_restore(self):
+        """Tests that solving again after a restore writes new files instead of the cached ones"""
+        acf_file = self._acf('run', 'msg=first')
+        solve(acf_file, wait=True, cache=True, cache_dir=self.cache_dir)
+        entry = self.cache_dir / get_result_key(acf_file)
+        solve(acf_file, wait=True, cache=True, cache_dir=self.cache_dir)
+
+        self._acf('run', 'msg=second')
+        proc = solve(acf_file, wait=True, cache=True, cache_dir=self.cache_dir)
+        self.assertNotIsInstance(proc, CachedProcess)
+        self.assertEqual(self._solved(), ['run', 'run'])
+
+        msg_file = self.tmp_dir / 'run.msg'
+        self.assertIn('second', msg_file.read_text())
+        self.assertNotEqual(msg_file.stat().st_ino, (entry / 'result.msg').stat().st_ino)
+        self.assertIn('first', (entry / 'result.msg').read_text())
+        self.assertNotIn('second', (entry / 'result.msg').read_text())
+
+        # Both runs are cached and the first is restored again
+        self._acf('run', 'msg=first')
+        proc = solve(acf_file, wait=True, cache=True, cache_dir=self.cache_dir)
+        self.assertIsInstance(proc, CachedProcess)
+        self.assertIn('first', msg_file.read_text())
+        self.assertEqual(len(list(self.cache_dir.iterdir())), 2)
+
+    def test_failed_not_stored(self):
+        """Tests that the outputs of failed runs are not cached"""
+        acf_file = self._acf('run', 'fail')
+        proc = solve(acf_file, wait=True, cache=True, cache_dir=self.cache_dir)
+        self.assertEqual(proc.returncode, 3)
+        self.assertFalse((self.cache_dir / get_result_key(acf_file)).exists())
+
+        proc = solve(acf_file, wait=True, cache=True, cache_dir=self.cache_dir)
+        self.assertNotIsInstance(proc, CachedProcess)
+        self.assertEqual(self._solved(), ['run', 'run'])
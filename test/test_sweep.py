@@ -0,0 +1,108 @@
+import os
+import platform
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from test.fake_adams import install
+
+install()
+
+from aviewpy.jobs import JobScheduler  # noqa: E402
+from aviewpy.sweep import ParameterSweep  # noqa: E402
+from test import fake_solver  # noqa: E402
+from test.test_adm import TEST_ACF, TEST_ADM  # noqa: E402
+
+MASS = ('PART', 'PART_2', 'MASS')
+FUNCTION = ('SFORCE', 1, 'FUNCTION')
+
+
+class Test_ParameterSweep(unittest.TestCase):
+    """Tests generating and solving variants of a base dataset"""
+
+    def setUp(self):
+        self._tmp_dir = TemporaryDirectory()
+        self.tmp_dir = Path(self._tmp_dir.name)
+        (self.tmp_dir / 'base.adm').write_text(TEST_ADM)
+        (self.tmp_dir / 'base.acf').write_text(TEST_ACF)
+        self.sweep = ParameterSweep(self.tmp_dir / 'base.adm', self.tmp_dir / 'base.acf', self.tmp_dir / 'doe')
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def test_add_grid(self):
+        """Tests that grid variants are numbered in cartesian order, with the last key varying fastest"""
+        variants = self.sweep.add_grid('run', {MASS: [1.0, 2.0]}, {'INTEGRATOR': ['INTEGRATOR/HHT', 'INTEGRATOR/SI2']})
+
+        self.assertListEqual([v.name for v in variants], ['run_0000', 'run_0001', 'run_0002', 'run_0003'])
+        self.assertListEqual([(v.adm[MASS], v.acf['INTEGRATOR']) for v in variants],
+                             [(1.0, 'INTEGRATOR/HHT'), (1.0, 'INTEGRATOR/SI2'),
+                              (2.0, 'INTEGRATOR/HHT'), (2.0, 'INTEGRATOR/SI2')])
+        self.assertListEqual(list(self.sweep.variants), [v.name for v in variants])
+
+    def test_write(self):
+        """Tests that each variant gets a patched .adm and an .acf pointing at it"""
+        self.sweep.add('heavy', adm={MASS: 5.5, FUNCTION: '100'}, acf={'INTEGRATOR': 'INTEGRATOR/HHT'})
+        acf_files = self.sweep.write()
+
+        doe_dir = self.tmp_dir / 'doe'
+        self.assertListEqual(acf_files, [doe_dir / 'heavy.acf'])
+        adm_text = (doe_dir / 'heavy.adm').read_text()
+        self.assertIn(', MASS = 5.5\n', adm_text)
+        self.assertIn(', FUNCTION = 100\n', adm_text)
+        self.assertListEqual(acf_files[0].read_text().splitlines()[:3],
+                             ['heavy.adm', 'heavy', 'INTEGRATOR/HHT'])
+        self.assertEqual((self.tmp_dir / 'base.adm').read_text(), TEST_ADM)
+
+    def test_write_names(self):
+        """Tests that only the named variants are written"""
+        self.sweep.add_grid('run', {MASS: [1.5, 2.5, 3.5]})
+        acf_files = self.sweep.write(['run_0002'])
+
+        self.assertListEqual([f.name for f in acf_files], ['run_0002.acf'])
+        self.assertListEqual(sorted(f.name for f in (self.tmp_dir / 'doe').iterdir()),
+                             ['run_0002.acf', 'run_0002.adm'])
+        self.assertIn(', MASS = 3.5\n', (self.tmp_dir / 'doe' / 'run_0002.adm').read_text())
+
+    def test_run_submits(self):
+        """Tests that every variant is submitted to the scheduler with the given arguments"""
+        self.sweep.add_grid('run', {MASS: [1.0, 2.0]})
+        scheduler = mock.Mock(spec=JobScheduler)
+
+        futures = self.sweep.run(scheduler, timeout=60, retries=1)
+
+        self.assertListEqual(list(futures), ['run_0000', 'run_0001'])
+        self.assertListEqual(scheduler.submit.call_args_list,
+                             [mock.call(self.tmp_dir / 'doe' / f'{name}.acf', timeout=60, retries=1)
+                              for name in futures])
+
+    @unittest.skipIf(platform.system() == 'Windows', 'The fake solver is a posix script')
+    def test_run(self):
+        """Tests solving all variants in parallel"""
+        self.sweep.add_grid('run', {MASS: [1.0, 2.0, 3.0]})
+        with mock.patch.dict(os.environ, {'TOPDIR': str(fake_solver.install(self.tmp_dir))}):
+            futures = self.sweep.run(max_workers=2)
+            results = {name: future.result(timeout=60) for name, future in futures.items()}
+
+        self.assertTrue(all(result.succeeded for result in results.values()))
+        self.assertEqual(results['run_0001'].res_file, self.tmp_dir / 'doe' / 'run_0001.res')
+        self.assertListEqual(sorted((self.tmp_dir / 'doe' / 'solved.log').read_text().split()),
+                             ['run_0000', 'run_0001', 'run_0002'])
+
+    def test_from_simulation(self):
+        """Tests that the base files are written once to the working directory"""
+        doe_dir = self.tmp_dir / 'from_sim'
+
+        def write_simulation_files(sim, file_prefix, working_dir, aux_files):
+            (working_dir / f'{file_prefix}.adm').write_text(TEST_ADM)
+            (working_dir / f'{file_prefix}.acf').write_text(TEST_ACF)
+
+        sim = mock.Mock()
+        with mock.patch('aviewpy.sweep.write_simulation_files', side_effect=write_simulation_files) as write:
+            sweep = ParameterSweep.from_simulation(sim, 'base', working_dir=doe_dir, aux_files=['spline.csv'])
+
+        write.assert_called_once_with(sim, 'base', working_dir=doe_dir, aux_files=['spline.csv'])
+        self.assertEqual(sweep.adm_file, doe_dir / 'base.adm')
+        self.assertEqual(sweep.acf_file, doe_dir / 'base.acf')
+        self.assertEqual(sweep.working_dir, doe_dir)
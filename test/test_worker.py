@@ -0,0 +1,94 @@
+import os
+import platform
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from aviewpy.jobs import JobQueue
+from aviewpy.solver import JobResult
+from test.fake_solver import install
+
+
+@unittest.skipIf(platform.system() == 'Windows', 'The fake solver is a posix script')
+class Test_JobQueue(unittest.TestCase):
+    """Tests running queued jobs with several worker processes"""
+
+    def setUp(self):
+        self._tmp_dir = TemporaryDirectory()
+        self.tmp_dir = Path(self._tmp_dir.name)
+        self.env = {**os.environ, 'TOPDIR': str(install(self.tmp_dir))}
+        self.queue = JobQueue(self.tmp_dir / 'queue')
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _acf(self, name: str, *lines: str) -> Path:
+        acf_file = self.tmp_dir / f'{name}.acf'
+        acf_file.write_text('\n'.join([f'{name}.adm', name, 'sleep=0.2', *lines, 'STOP']) + '\n')
+        return acf_file
+
+    def _start_workers(self, count: int, *args: str):
+        return [subprocess.Popen([sys.executable, '-m', 'aviewpy.worker', str(self.queue.root),
+                                  '--poll-interval', '0.1', '--idle-timeout', '2', *args],
+                                 cwd=Path(__file__).parent.parent,
+                                 env=self.env)
+                for _ in range(count)]
+
+    def test_workers(self):
+        """Tests that every job is solved exactly once by a pool of workers"""
+        job_ids = [self.queue.put(self._acf(f'run_{i}')) for i in range(12)]
+        job_ids.append(self.queue.put(self._acf('failing', 'fail'), retries=1))
+
+        workers = self._start_workers(3)
+        results = self.queue.wait(job_ids, timeout=60, poll_interval=0.1)
+        for worker in workers:
+            worker.wait(timeout=30)
+
+        self.assertEqual(len(results), len(job_ids))
+        self.assertTrue(all(results[job_id].succeeded for job_id in job_ids[:-1]))
+        self.assertEqual(results[job_ids[-1]].attempts, 2)
+        self.assertEqual(self.queue.status(job_ids[-1]), 'failed')
+        solvers = {(self.tmp_dir / f'run_{i}.msg').read_text().splitlines()[0] for i in range(12)}
+        self.assertGreater(len(solvers), 1)
+        self.assertEqual(list((self.queue.root / 'running').iterdir()), [])
+
+    def test_recover(self):
+        """Tests that a job claimed by a dead worker is requeued and solved"""
+        job_id = self.queue.put(self._acf('orphan'), retries=1)
+        self.queue.claim('dead-worker')
+        self.assertEqual(self.queue.status(job_id), 'running')
+
+        workers = self._start_workers(1, '--stale-after', '0.5')
+        result = self.queue.wait([job_id], timeout=30, poll_interval=0.1).get(job_id)
+        workers[0].wait(timeout=30)
+
+        self.assertIsNotNone(result)
+        self.assertTrue(result.succeeded)
+        self.assertEqual(result.attempts, 2)
+        self.assertEqual(self.queue.status(job_id), 'done')
+
+    def test_recover_without_retries(self):
+        """Tests that a job whose worker died on every attempt is moved to failed"""
+        job_id = self.queue.put(self._acf('crash'), retries=1)
+        for attempt in range(2):
+            self.queue.claim(f'dead-worker-{attempt}')
+            self.queue.recover(stale_after=0.0)  # Sees the missing heartbeat
+            self.assertListEqual(self.queue.recover(stale_after=0.0), [job_id])
+
+        self.assertEqual(self.queue.status(job_id), 'failed')
+        self.assertEqual(self.queue.result(job_id).attempts, 2)
+        self.assertIsNone(self.queue.result(job_id).returncode)
+
+    def test_complete_after_recover(self):
+        """Tests that a worker that was presumed dead does not record the result of a recovered job"""
+        job_id = self.queue.put(self._acf('slow'), retries=1)
+        job = self.queue.claim('slow-worker')
+        self.queue.recover(stale_after=0.0)
+        self.queue.recover(stale_after=0.0)
+
+        self.queue.complete(job, JobResult(job.acf_file, 0, 1.0, []), 'slow-worker')
+        self.assertEqual(self.queue.status(job_id), 'pending')
+        self.assertIsNone(self.queue.result(job_id))
+        self.assertEqual(self.queue.claim('other-worker').spec['attempts'], 1)